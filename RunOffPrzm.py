@@ -1,7 +1,9 @@
 """Class definition for the RunOffPrzm component."""
-from osgeo import gdal, ogr, osr
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
 import datetime
-import glob
 import numpy as np
 import os
 import shutil
@@ -9,6 +11,55 @@ import attrib
 import base
 import xml.etree.ElementTree
 import math
+import hashlib
+import importlib
+import json
+import collections
+import sqlite3
+import zlib
+import queue
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+
+class DeferredModule:
+    """
+    A module that is only imported when one of its attributes is first accessed. Loading GDAL takes considerably
+    longer than constructing a component, and it is not needed for documenting or parameterizing components.
+    """
+
+    def __init__(self, name):
+        """
+        Initializes a DeferredModule.
+
+        Args:
+            name: The fully qualified name of the module.
+        """
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, name):
+        """
+        Gets an attribute of the module and imports the module if necessary.
+
+        Args:
+            name: The name of the attribute.
+
+        Returns:
+            The attribute of the module.
+        """
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, name)
+
+
+gdal = DeferredModule("osgeo.gdal")
+ogr = DeferredModule("osgeo.ogr")
+osr = DeferredModule("osgeo.osr")
 
 
 class RunOffPrzm(base.Component):
@@ -23,6 +74,7 @@ class RunOffPrzm(base.Component):
     """
     # RELEASES
     VERSION = base.VersionCollection(
+        base.VersionInfo("2.1.1", None),
         base.VersionInfo("2.1.0", "2022-01-05"),
         base.VersionInfo("2.0.13", "2021-12-30"),
         base.VersionInfo("2.0.12", "2021-10-22"),
@@ -125,8 +177,845 @@ class RunOffPrzm(base.Component):
     VERSION.changed("2.0.12", "Replaced GDAL constants by numerical values")
     VERSION.changed("2.0.13", "Output scale order (y,x,t instead of t,x,y)")
     VERSION.changed("2.1.0", "Updated module to version 1.47")
+    VERSION.added("2.1.1", "Benchmark with synthetic landscapes and a stand-in for the module executables")
+    VERSION.changed("2.1.1", "Split `run` into separately callable stages")
+    VERSION.added("2.1.1", "Progress and throughput reporting while the module runs")
+    VERSION.added("2.1.1", "Warning on stalled module runs")
+    VERSION.added("2.1.1", "Resumable runs based on a manifest of completed stages")
+    VERSION.added("2.1.1", "Configurable chunk layout of the `Exposure` output")
+    VERSION.changed("2.1.1", "Merging of module outputs writes batches aligned to the chunk layout")
+    VERSION.changed("2.1.1", "Days are merged in a bounded buffer and written in chunk-aligned batches")
+    VERSION.changed("2.1.1", "Maximum of the `Exposure` output is tracked incrementally")
+    VERSION.changed("2.1.1", "Module outputs are merged in spatial tiles within a memory limit")
+    VERSION.added("2.1.1", "Per-day summary outputs and index of exposed days")
+    VERSION.added("2.1.1", "Lazy `Exposure` output calculated from module output rasters on demand")
+    VERSION.added("2.1.1", "Optional pre-screening of applications that cannot produce reportable run-off")
+    VERSION.added("2.1.1", "Optional exclusion of fields whose run-off cannot reach untreated cells")
+    VERSION.added("2.1.1", "Incremental runs that reuse module results of unchanged fields from a previous run")
+    VERSION.added("2.1.1", "Optional per-field contribution store for source attribution and recombination")
+    VERSION.added("2.1.1", "Configurable resolution of the `Exposure` output with mass-conserving aggregation")
+    VERSION.added(
+        "2.1.1", "Threshold-filtered and log-quantized storage of the `Exposure` output with a mass-balance report")
+    VERSION.added(
+        "2.1.1", "Asynchronous execution API and `run_components` scheduler to overlap runs of several components")
+    VERSION.added("2.1.1", "Optional node-local staging directory for module inputs")
+    VERSION.added(
+        "2.1.1", "Preflight stage that reports all detectable misconfigurations at once before the module runs")
+    VERSION.added(
+        "2.1.1", "Disk budget with per-stage disk usage reports, peak usage and volume-aware start of concurrent runs")
+    VERSION.added("2.1.1", "Option to delete module exposure rasters as soon as their day has been merged")
+    VERSION.added("2.1.1", "Work units that split the simulated fields into self-contained module runs")
+    VERSION.added("2.1.1", "SQLite work queue with a worker entry point for executing work units on several nodes")
+    VERSION.added("2.1.1", "Year blocks that simulate parts of the period as parallel work units with a warm-up")
+    VERSION.added("2.1.1", "Validation of year blocks against a serial simulation of the deposited mass")
+    VERSION.added("2.1.1", "Typed index of module output rasters and an optional single-file archive")
+    VERSION.changed("2.1.1", "Merging, lazy exposure and cleanup read indexed raster windows instead of globbing")
+    VERSION.added("2.1.1", "Options_ScratchCubePath assembles the Exposure in a memory-mapped scratch file")
+    VERSION.changed("2.1.1", "Exposure chunks are loaded from the scratch file in one chunk-aligned pass")
+    VERSION.added("2.1.1", "Startup case of the benchmark timing the import and construction of components")
+    VERSION.changed("2.1.1", "Inputs are defined by a class-level schema shared by all component instances")
+    VERSION.changed("2.1.1", "GDAL is imported on first use instead of when loading the module")
+    VERSION.fixed("2.1.1", "Indexing reads module rasters in block-aligned strips instead of whole landscapes")
+    VERSION.fixed("2.1.1", "Merging stages tiles smaller than a chunk instead of failing on large daily maps")
+    VERSION.fixed(
+        "2.1.1", "Lazily calculated days are aggregated per module output instead of from a full-resolution slab")
+    VERSION.fixed("2.1.1", "Preflight accepts weather series longer than the simulated period and reports shortfalls")
+    VERSION.fixed(
+        "2.1.1", "The module field raster only covers simulated fields, matching field parameters and calendar")
+    VERSION.fixed("2.1.1", "The options introduced since 2.1.0 are optional and default to the behavior of 2.1.0")
+    VERSION.added(
+        "2.1.1", "Module commands can be passed to the constructor, e.g., to run the benchmark with a stand-in module")
+
+    # Inputs that do not affect simulation results and are, therefore, not considered when resuming a run
+    NON_RESULT_INPUTS = frozenset((
+        "Options_ProgressInterval",
+        "Options_StallWarningTime",
+        "Options_ResumeRun",
+        "Options_LazyCacheDays",
+        "Options_StagingPath",
+        "Options_DiskBudget",
+        "Options_DeleteMergedRasters",
+        "Options_WorkQueue",
+        "Options_LocalWorkers",
+        "Options_RepackModuleOutput",
+        "Options_ScratchCubePath"
+    ))
+
+    # The maximum length of the temporary output path that the module supports, including the sub-folder that the
+    # module appends for its process
+    TEMPORARY_PATH_LIMIT = 45
+
+    # The maximum number of digits of the process ID that names the sub-folder of the temporary output path
+    PROCESS_ID_WIDTH = 10
+
+    # Inputs that are compared per field when reusing the results of a previous run
+    FIELD_INPUTS = frozenset((
+        "Fields_Geometries",
+        "Fields_Ids",
+        "Ppm_AppliedFields",
+        "Ppm_ApplicationDates",
+        "Ppm_ApplicationRates",
+        "Ppm_AppliedAreas"
+    ))
+
+    # Inputs that locate the files of a run and differ between the runs whose results are reused
+    RUN_LOCAL_INPUTS = frozenset((
+        "ProcessingPath",
+        "Options_TemporaryOutputPath",
+        "Options_PreviousRun"
+    ))
+
+    # The inputs of the component as tuples of name, attributes, description and, for optional inputs, a tuple of the
+    # default value and its physical unit. The schema is shared by all instances, so that constructing a component
+    # only binds the inputs to its observer
+    INPUTS = (
+        (
+            "ProcessingPath",
+            (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
+            """The working directory for the module. It is used for all files prepared as module inputs
+            or generated as module outputs. This excludes the files of the actual PRZM run whose path. See the 
+            [Options_TemporaryOutputPath](#Options_TemporaryOutputPath) input for the according parameterization. 
+            the `ProcessingPath` are considered temporary and can be safely deleted after a successful simulation 
+            run. Make sure that the `ProcessingPath` is configured in such a way that it does not collide with
+            other simulation runs (of different experiments or Monte Carlo runs)."""
+        ),
+        (
+            "Model_AdsorptionMethod",
+            (
+                attrib.Class(str),
+                attrib.Scales("global"),
+                attrib.Unit(None),
+                attrib.InList(("linear", "Freundlich", "aged"))
+            ),
+            """Specifies how PRZM simulates adsorption. Three methods are available: `linear` 
+            calculates adsorption based on a linear regression, `Freundlich` based on a normalized Freundlich 
+            equation and `aged` uses an aged adsorption function."""
+        ),
+        (
+            "Model_SoilTemperatureSimulation",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies whether to simulate soil temperature or not. Enabled soil temperature 
+            simulation does not consider nitrogen transport."""
+        ),
+        (
+            "SubstanceName",
+            (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
+            """Substances differ in their properties and, thus, for every substance simulated a 
+            different set of values has to be specified. The current `RunOffPrzm` component does, however, allow to 
+            simulate a single substance only. This might change in the future, as the module is conceptually and 
+            technically prepared to handle multiple substances simultaneously. The `SubstanceName` has currently
+            no technical relevance."""
+        ),
+        (
+            "Substance_PlantUptakeFactor",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("1/d")),
+            "The substance-specific PRZM plant uptake factor."
+        ),
+        (
+            "Substance_PesticideDissipationRateOfFoliage",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("1/d")),
+            "The substance-specific PRZM pesticide dissipation rate on foliage."
+        ),
+        (
+            "Substance_FoliarWashOffCoefficient",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("1/cm")),
+            "The substance-specific PRZM foliar wash-off coefficient."
+        ),
+        (
+            "Substance_HenryConstant",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("1")),
+            """The substance-specific Henry constant. You can also set this input to the special value
+            of `nan` to let the module derive the Henry constant from the input values of
+            [Substance_VapourPressure](#Substance_VapourPressure),
+            [Substance_MolecularWeight](#Substance_MolecularWeight), 
+            [Substance_WaterSolubility](#Substance_WaterSolubility) and 
+            [Substance_TemperatureAtWhichMeasured](#Substance_TemperatureAtWhichMeasured)."""
+        ),
+        (
+            "Substance_VapourPressure",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("mPa")),
+            "The substance-specific vapor pressure."
+        ),
+        (
+            "Substance_MolecularWeight",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("g/mol")),
+            "The substance-specific molecular weight."
+        ),
+        (
+            "Substance_WaterSolubility",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("mg/L")),
+            "The substance-specific water solubility."
+        ),
+        (
+            "Substance_TemperatureAtWhichMeasured",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("K")),
+            "The reference temperature for the physical and chemical properties of the substance."
+        ),
+        (
+            "Substance_FreundlichExponent",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("1")),
+            "The substance-specific Freundlich exponent."
+        ),
+        (
+            "Substance_ReferenceMoistureForDT50Soil",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("%")),
+            "The substance-specific reference moisture for the soil DT50 in percent of field capacity."
+        ),
+        (
+            "Substance_SoilDT50",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("d")),
+            "The substance-specific soil half-life time."
+        ),
+        (
+            "Substance_KocSoil",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("cm³/g")),
+            "The substance-specific KOC in soil."
+        ),
+        (
+            "SprayApplication_PrzmApplicationMethod",
+            (
+                attrib.Class(str),
+                attrib.Scales("global"),
+                attrib.Unit(None),
+                attrib.InList(("soil", "canopy", "foliar"))
+            ),
+            """The PRZM chemical application method that is assumed for all spray applications. `soil`
+            indicates direct spraying of the soil surface, `canopy` of the crop canopy and `foliar` a foliar
+            application."""
+        ),
+        (
+            "SprayApplication_IncorporationDepth",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("cm")),
+            "The PRZM incorporation depth of spray applications."
+        ),
+        (
+            "Options_StartDate",
+            (attrib.Class(datetime.date, 1), attrib.Scales("global"), attrib.Unit(None)),
+            "The first simulated date. All temporal input parameters must start at this date."
+        ),
+        (
+            "Options_EndDate",
+            (attrib.Class(datetime.date, 1), attrib.Scales("global"), attrib.Unit(None)),
+            "The last simulated date. All temporal input parameters must end at this date."
+        ),
+        (
+            "Options_TemporaryOutputPath",
+            (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
+            """PRZM cannot run in paths with long names. The [ProcessingPath](#ProcessingPath), due to 
+            its requirement to be unique for each simulation run, is normally too long to be used here. Instead, 
+            PRZM simulations run in the directory specified by the `Options_TemporaryOutputPath` input. The module
+            appends a sub-folder named by its process ID, and the resulting path must not exceed 45 characters, so
+            the `Options_TemporaryOutputPath` can have at most 34 characters, or fewer if
+            [Options_WorkUnits](#Options_WorkUnits) or year blocks add numbered sub-folders."""
+        ),
+        (
+            "Options_DeleteTemporaryGrids",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """`RunOffPrzm` creates an output grid for each field in the landscape before it merges 
+            them. If the temporary output of each field should be deleted as early as possible, set this option to `
+            true`. `False` is the right option if you need to keep the temporary grids, e.g., for debugging."""
+        ),
+        (
+            "Options_TimeoutSecPrzm",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit("s")),
+            """The time after which an idle PRZM instance timeouts. Tweak this option to prevent locks
+                        in some rare circumstances."""
+        ),
+        (
+            "Options_ReportingThreshold",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("mg")),
+            """The minimum mass that is required to trigger continuation of the water and substance 
+            flow simulation. Smaller masses remain at the current cell and are not further transported. Set this
+            option to a sensible value that allows to capture all relevant depositions while reducing the processing
+            time."""
+        ),
+        (
+            "Options_DeleteAllInterimResults",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies whether to delete all intermediary files after a successful simulation run.
+            Enable this option to save disk space (intermediary files may accumulate to a considerable amount) or
+            disable it if you need to keep intermediary files, e.g., for debugging."""
+        ),
+        (
+            "Weather_Precipitation",
+            (attrib.Class(np.ndarray), attrib.Scales("time/day"), attrib.Unit("mm/d")),
+            """A series of daily precipitation values. The series must cover the entire range between
+            [Options_StartDate](#Options_StartDate) and [Options_EndDate](#Options_EndDate) in consecutive order."""
+        ),
+        (
+            "Weather_ET0",
+            (attrib.Class(np.ndarray), attrib.Scales("time/day"), attrib.Unit("mm/d")),
+            """A series of daily evapotranspiration values. The series must cover the entire range 
+            between [Options_StartDate](#Options_StartDate) and [Options_EndDate](#Options_EndDate) in consecutive
+            order."""
+        ),
+        (
+            "Weather_Temperature",
+            (attrib.Class(np.ndarray), attrib.Scales("time/day"), attrib.Unit("°C")),
+            """A series of daily temperature values. The series must cover the entire range between
+            [Options_StartDate](#Options_StartDate) and [Options_EndDate](#Options_EndDate) in consecutive order."""
+        ),
+        (
+            "Weather_WindSpeed",
+            (attrib.Class(np.ndarray), attrib.Scales("time/day"), attrib.Unit("m/s")),
+            """A series of daily wind speed values. The series must cover the entire range between
+            [Options_StartDate](#Options_StartDate) and [Options_EndDate](#Options_EndDate) in consecutive order."""
+        ),
+        (
+            "Weather_SolarRadiation",
+            (attrib.Class(np.ndarray), attrib.Scales("time/day"), attrib.Unit("kJ/(m²*d)")),
+            """A series of daily solar radiation values. The series must cover the entire range between
+            [Options_StartDate](#Options_StartDate) and [Options_EndDate](#Options_EndDate) in consecutive order."""
+        ),
+        (
+            "Fields_Slope",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("%")),
+            """The average slope of all fields in the landscape. This slope is feeds PRZM run-off
+            calculations and is independent of the slopes underlying the [Fields_FlowGrid](#Fields_FlowGrid). 
+            Please make sure that representation of slopes is somewhat consistent between landscape scenario and 
+            `RunOffPrzm` parameterization. A later version may allow specifying slopes on a per-field basis instead
+            of globally."""
+        ),
+        (
+            "Fields_SoilHorizonThicknesses",
+            (attrib.Class(list[float], 1), attrib.Scales("other/soil_horizon"), attrib.Unit("cm")),
+            """A sequence of soil horizon depths from top to bottom. This sequence defines how many
+            soil horizons there are and how they are distributed along the z-axis."""
+        ),
+        (
+            "Fields_SoilHorizonBulkDensities",
+            (attrib.Class(list[float], 1), attrib.Scales("other/soil_horizon"), attrib.Unit("g/cm³")),
+            """A sequence of soil horizon bulk densities from top to bottom. This sequence must have the
+            same number of elements as the [Fields_SoilHorizonThicknesses](#Fields_SoilHorizonThicknesses) sequence.
+            Elements refer to the same soil horizon (in the same order) as the soil horizons specified there."""
+        ),
+        (
+            "Fields_SoilHorizonOrganicMaterialContents",
+            (attrib.Class(list[float], 1), attrib.Scales("other/soil_horizon"), attrib.Unit("%")),
+            """A sequence of soil horizon organic material contents from top to bottom. This sequence 
+            must have the same number of elements as the 
+            [Fields_SoilHorizonThicknesses](#Fields_SoilHorizonThicknesses) sequence. Elements refer to the same 
+            soil horizon (in the same order) as the soil horizons specified there."""
+        ),
+        (
+            "Fields_SoilHorizonSandFractions",
+            (attrib.Class(list[float], 1), attrib.Scales("other/soil_horizon"), attrib.Unit("%")),
+            """A sequence of soil horizon sand fractions from top to bottom. This sequence must have the
+            same number of elements as the [Fields_SoilHorizonThicknesses](#Fields_SoilHorizonThicknesses) sequence.
+            Elements refer to the same soil horizon (in the same order) as the soil horizons specified there."""
+        ),
+        (
+            "Fields_SoilHorizonSiltFractions",
+            (attrib.Class(list[float], 1), attrib.Scales("other/soil_horizon"), attrib.Unit("%")),
+            """A sequence of soil horizon silk fractions from top to bottom. This sequence must have the
+            same number of elements as the [Fields_SoilHorizonThicknesses](#Fields_SoilHorizonThicknesses) sequence.
+            Elements refer to the same soil horizon (in the same order) as the soil horizons specified there."""
+        ),
+        (
+            "Fields_Geometries",
+            (attrib.Class(list[bytes]), attrib.Scales("space/base_geometry"), attrib.Unit(None)),
+            """The geometries of in-field areas in WKB representation. Each element refers to a field
+            with its according identifier from the list of [Fields_Ids](#Fields_Ids)."""
+        ),
+        (
+            "Fields_Ids",
+            (attrib.Class(list[int]), attrib.Scales("space/base_geometry"), attrib.Unit(None)),
+            """The simulation-wide unique identifiers of fields within the landscape. These identifiers
+            stem from the landscape scenario and are shared among components."""
+        ),
+        (
+            "Fields_Crs",
+            (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
+            """The coordinate reference system in which the [Fields_Geometries](#Fields_Geometries) 
+            are projected. The coordinate reference system needs to be in Proj4 notation."""
+        ),
+        (
+            "Fields_Extent",
+            (attrib.Class(tuple[float]), attrib.Scales("space/extent"), attrib.Unit("metre")),
+            """The extent of the simulated landscape. This value has to be consistent with the 
+            [Fields_Geometries](#Fields_Geometries) and the [Fields_FlowGrid](#Fields_FlowGrid) and is projected
+            in the [Fields_Crs](#Fields_Crs). The landscape scenario normally takes care of that."""
+        ),
+        (
+            "Fields_FlowGrid",
+            (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
+            """The file path to a raster file that contains information about the flow direction 
+            between individual raster cells. Flow directions follow the [ESRI standard](
+            https://desktop.arcgis.com/de/arcmap/10.3/tools/spatial-analyst-toolbox/flow-direction.htm) encoding 
+            for flow directions."""
+        ),
+        (
+            "Fields_InFieldMargin",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("m")),
+            """A width of an inner margin along field boundaries that is not covered with crop but with
+            other herbaceous vegetation. This value applies to all fields in the landscape and does not change over
+            time, but a future version of the component may allow for spatio-temporal variation."""
+        ),
+        (
+            "Ppm_AppliedFields",
+            (attrib.Class(np.ndarray), attrib.Scales("other/application"), attrib.Unit(None)),
+            """The identifiers of applied fields (according to the [Fields_Ids](#Fields_Ids)) per 
+            application. The number of elements defines how many applications there are in total, and the values
+            link applications to individual fields."""
+        ),
+        (
+            "Ppm_ApplicationDates",
+            (attrib.Class(np.ndarray), attrib.Scales("other/application"), attrib.Unit(None)),
+            """The dates of application. This specifies for each application indicated by the 
+            [Ppm_AppliedFields](#Ppm_AppliedFields), on which day the application took place."""
+        ),
+        (
+            "Ppm_ApplicationRates",
+            (attrib.Class(np.ndarray), attrib.Scales("other/application"), attrib.Unit("g/ha")),
+            """This indicates for each application indicated by the 
+            [Ppm_AppliedFields](#Ppm_AppliedFields) at which rate the substance with the name of 
+            [SubstanceName](#SubstanceName) was applied."""
+        ),
+        (
+            "Ppm_AppliedAreas",
+            (attrib.Class(list[bytes]), attrib.Scales("other/application"), attrib.Unit(None)),
+            """For each application indicated by the [Ppm_AppliedFields](#Ppm_AppliedFields), this gives
+            the geometry of the actual applied area in WKB representation. This geometry might be equal to or 
+            smaller and located within the field geometry given by the [Fields_Geometries](#Fields_Geometries). Only
+            the area indicated by the `Ppm_AppliedAreas` is actually applied, allowing to leave in-crop buffers or
+            depict spatial variation of the application relative to the field geometry."""
+        ),
+        (
+            "Options_ShowExtendedErrorInformation",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            "Specifies whether the module prompts extended information on errors or not."
+        ),
+        (
+            "Options_MethodOfRunoffGeneration",
+            (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None), attrib.InList(("PRZM", "FOCUS"))),
+            """Specifies the method used to simulate the amount of run-off. `PRZM` specifies to use PRZM
+            runs for run-off generation, `FOCUS` to use FOCUS Step2 run-off simulations."""
+        ),
+        (
+            "Options_UsePreSimulatedPrzmResults",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies using pre-simulated PRZM runs for run-off simulation instead of new PRZM 
+            runs."""
+        ),
+        (
+            "Options_UseOnePrzmModelPerGridCell",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies to start an individual PRZM run for every cell to calculate run-off. Enabling 
+            this parameter results in many PRZM runs, resulting in considerably longer simulation runs. Usage of 
+            PRZM for the purpose of run-off generation in off-crop cells should also be seen as experimental."""
+        ),
+        (
+            "Options_UseVfsMod",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies whether to use crop-specific VfsMOD lookup tables to simulate run-off 
+            filtering. The [CropParameters_VfsModLookupTables](#CropParameters_VfsModLookupTables) input 
+            parameterizes which lookup table to use for which crop."""
+        ),
+        (
+            "CropParameters_Crops",
+            (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
+            """A list of crop names. Each crop has its own set of crop-specific parameters. One 'crop'
+            that should normally be specified is 'OffCrop'. Parameters for 'OffCrop' apply to all areas outside 
+            fields as they are specified by the [Fields_Geometries](#Fields_Geometries)."""
+        ),
+        (
+            "CropParameters_PanEvaporationFactors",
+            (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
+            """The PAN evaporation factor of a crop. Each element of the list refers to the crop at the
+            same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_CanopyInterceptions",
+            (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("cm")),
+            """The canopy intersection of a crop. Each element of the list refers to the crop at the
+            same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_MaximumCoverages",
+            (attrib.Class(list[int]), attrib.Scales("other/crop"), attrib.Unit("%")),
+            """The maximum soil coverage of a crop. Each element of the list refers to the crop at the
+            same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_MaximumHeights",
+            (attrib.Class(list[int]), attrib.Scales("other/crop"), attrib.Unit("cm")),
+            """The maximum height of a crop. Each element of the list refers to the crop at the same 
+            position in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_MaximumRootingDepths",
+            (attrib.Class(list[int]), attrib.Scales("other/crop"), attrib.Unit("cm")),
+            """The maximum rooting depth of a crop. Each element of the list refers to the crop at the
+            same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_Fallows",
+            (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
+            """The fallow parameter of a crop. Each element of the list refers to the crop at the same 
+            position in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_Cropping",
+            (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
+            """The cropping parameter of a crop. Each element of the list refers to the crop at the 
+            same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_Residues",
+            (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
+            """The residues of a crop. Each element of the list refers to the crop at the same position
+            in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_EmergenceDates",
+            (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
+            """The date of a year when a crop emerges. Each element of the list refers to the crop at 
+            the same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_MaturationDates",
+            (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
+            """The date of a year when a crop matures. Each element of the list refers to the crop at 
+            the same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_HarvestDates",
+            (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
+            """The date of a year of crop harvest. Each element of the list refers to the crop at the 
+            same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_FallowDates",
+            (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
+            """The date of a year when a crop fallows. Each element of the list refers to the crop at 
+            the same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_WaterMitigations",
+            (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
+            """Specifies the rate of water mitigation per crop. This factor feeds an exponential 
+            decay function to calculate the run-off reduction from cell to cell. Hence, they should be calibrated to
+            the cell size of the output grid. Each element of the list refers to the crop at the same position in 
+            the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_SedimentMitigations",
+            (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
+            """Specifies the rate of sediment mitigation per crop. This factor feeds an exponential 
+            decay function to calculate the run-off reduction from cell to cell. Hence, they should be calibrated 
+            to the cell size of the output grid. Each element of the list refers to the crop at the same position 
+            in the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "CropParameters_VfsModLookupTables",
+            (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
+            """The file path to a VfsMOD lookup table. Specify `none` if you want to disable the use of 
+            a lookup table for a specific crop. Each element of the list refers to the crop at the same position in 
+            the [CropParameters_Crops](#CropParameters_Crops) input."""
+        ),
+        (
+            "Options_ProgressInterval",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit("s")),
+            """The minimum time between two progress reports while the module runs. Progress reports
+            state the number of completed fields, the number of exposure rasters written so far, the throughput
+            and an estimate of the remaining time. They are derived from the console output of the module and
+            from the growth of the module output folder, which is scanned at most once per interval.""",
+            (60, "s")
+        ),
+        (
+            "Options_StallWarningTime",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit("s")),
+            """The time without any progress of the module after which a warning is issued. This
+            allows detecting stalled module runs long before the
+            [Options_TimeoutSecPrzm](#Options_TimeoutSecPrzm) applies. Set this option to `0` to disable stall
+            warnings.""",
+            (0, "s")
+        ),
+        (
+            "Options_ResumeRun",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies whether to resume a previous run in the [ProcessingPath](#ProcessingPath)
+            instead of failing because the path already exists. The component records the completed stages of a
+            run together with a fingerprint of its inputs in a manifest within the `ProcessingPath`. A resumed run
+            skips all completed stages and merges only those days into the [Exposure](#Exposure) output that were
+            not yet merged. Resuming requires the inputs to be unchanged and the `Exposure` output to be kept in a
+            persistent store.""",
+            (False, None)
+        ),
+        (
+            "Options_ExposureChunking",
+            (
+                attrib.Class(str),
+                attrib.Scales("global"),
+                attrib.Unit(None),
+                attrib.InList(("maps", "tiles", "time_series"))
+            ),
+            """Specifies the chunk layout of the [Exposure](#Exposure) output according to the
+            dominant access pattern of downstream components. `maps` stores a full-landscape chunk per day, which 
+            suits components that process daily maps. `time_series` stores the entire simulated period of a
+            small spatial tile per chunk, which suits components that read the time series of single cells or
+            reaches. `tiles` stores spatial tiles over the number of days specified by
+            [Options_ExposureChunkDays](#Options_ExposureChunkDays) as a compromise between both patterns. The 
+            merging of module outputs writes batches that are aligned to the chunk layout.""",
+            ("maps", None)
+        ),
+        (
+            "Options_ExposureChunkDays",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit("d")),
+            """The number of days per chunk of the [Exposure](#Exposure) output if the
+            [Options_ExposureChunking](#Options_ExposureChunking) is `tiles`. The value is ignored for other chunk
+            layouts.""",
+            (32, "d")
+        ),
+        (
+            "Options_MergeMemoryLimit",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit("MB")),
+            """The memory available for merging module outputs into the [Exposure](#Exposure) output.
+            The component merges module outputs in spatial tiles and collects several days per tile before it
+            writes them in a single, chunk-aligned operation. Larger limits reduce the number of write operations
+            for long simulations, while the peak memory usage of the merge stays independent of the size of the 
+            landscape. If the limit is too small to merge a single chunk at once, chunks are merged in smaller
+            tiles that are staged in a memory-mapped file within the
+            [Options_ScratchCubePath](#Options_ScratchCubePath), or the [ProcessingPath](#ProcessingPath) if no
+            scratch path is set, and each chunk is written once it is complete.""",
+            (1024, "MB")
+        ),
+        (
+            "Options_LazyExposure",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies whether to calculate the [Exposure](#Exposure) output on demand instead of
+            merging all module output rasters into the store. If enabled, the component only indexes the module
+            output rasters per day and sums the rasters of a day when values of that day are read. This makes the
+            post-processing time proportional to the queried days, which suits exploratory runs that only inspect
+            a few days. Calculated chunks are written to the store when they are first read. Values can only be
+            calculated by consumers within the same process as the component, while other processes or later runs
+            only find the chunks in the store that were already read, and all other values are empty. The module
+            output rasters within the [ProcessingPath](#ProcessingPath) have to be kept as long as the `Exposure`
+            output is read. The daily summary outputs are not available in this mode.""",
+            (False, None)
+        ),
+        (
+            "Options_LazyCacheDays",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit("d")),
+            """The number of merged days that are kept in memory for repeated reads if the
+            [Options_LazyExposure](#Options_LazyExposure) input is enabled. Least recently read days are evicted 
+            first.""",
+            (16, "d")
+        ),
+        (
+            "Options_PreScreenApplications",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies whether to exclude applications from the simulation that cannot produce
+            run-off above the [Options_ReportingThreshold](#Options_ReportingThreshold). An application is
+            excluded if no day with precipitation above the
+            [Options_PreScreenPrecipitationThreshold](#Options_PreScreenPrecipitationThreshold) occurs before the
+            applied mass, degrading according to the [Substance_SoilDT50](#Substance_SoilDT50) and ignoring all
+            other losses, falls below the reporting threshold. Fields without remaining applications are not
+            simulated at all, which considerably shortens runs in scenarios with sparse precipitation.""",
+            (False, None)
+        ),
+        (
+            "Options_PreScreenPrecipitationThreshold",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("mm/d")),
+            """The daily precipitation that has to be exceeded for a day to be considered a potential
+            run-off event by the pre-screening of applications. See the
+            [Options_PreScreenApplications](#Options_PreScreenApplications) input. Set this value to `0` to
+            consider every day with precipitation.""",
+            (1.0, "mm/d")
+        ),
+        (
+            "Options_PruneUnreachableFields",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies whether to exclude fields from the simulation whose run-off cannot reach any
+            cell outside of treated fields within the landscape. As the module does not report exposure on
+            treated fields, the run-off of a field is only relevant if its flow path, according to the
+            [Fields_FlowGrid](#Fields_FlowGrid), reaches an untreated cell before it leaves the
+            [Fields_Extent](#Fields_Extent). Cells with undefined flow directions are assumed to pass run-off
+            to untreated cells.""",
+            (False, None)
+        ),
+        (
+            "Options_PreviousRun",
+            (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
+            """The [ProcessingPath](#ProcessingPath) of a previous, successfully completed run whose
+            module results are reused, or an empty string to simulate all fields. If all inputs that apply to the
+            entire landscape are unchanged, only fields whose geometry or applications changed, and fields whose
+            flow paths cross cells that changed their field assignment, are simulated again. The module results of
+            all other fields are linked or copied from the previous run. The previous run has to keep its module
+            results, i.e., it must not have been run with
+            [Options_DeleteAllInterimResults](#Options_DeleteAllInterimResults) enabled.""",
+            ("", None)
+        ),
+        (
+            "Options_ContributionStore",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies whether to keep the contribution of each field to the
+            [Exposure](#Exposure) output. If enabled, the component records the non-zero window of each
+            module output raster per field and day in the `contributions.sqlite` database within the
+            [ProcessingPath](#ProcessingPath) while merging. The database is indexed by field and by cell and can
+            be queried with the `ContributionStore` class of this component, e.g., to attribute exposure to the
+            fields that cause it or to recombine the exposure after scaling the contributions of individual
+            fields. Contributions are not recorded if the [Options_LazyExposure](#Options_LazyExposure) input is
+            enabled.""",
+            (False, None)
+        ),
+        (
+            "Options_OutputResolution",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit("m")),
+            """The edge length of the cells of the [Exposure](#Exposure) output. Module outputs are
+            aggregated to cells of this size by averaging the deposition of all square meters that a cell covers,
+            which conserves the deposited mass. Aggregation takes place while merging, so that the module outputs
+            are never held in memory at full resolution for an entire day. Use a value of `1` to keep the full
+            resolution or, e.g., `10` or `25` for landscape-scale screening.""",
+            (1, "m")
+        ),
+        (
+            "Options_ExposureThreshold",
+            (attrib.Class(float), attrib.Scales("global"), attrib.Unit("g/ha")),
+            """The deposition below which cells of the [Exposure](#Exposure) output are stored as
+            zero. Dropping the small tails of the deposition around exposed areas considerably reduces the size of
+            the stored output. The mass that is lost in this way is reported after merging. Use a value of `0` to
+            store all deposition. The threshold does not apply if the
+            [Options_LazyExposure](#Options_LazyExposure) input is enabled.""",
+            (0.0, "g/ha")
+        ),
+        (
+            "Options_ExposureQuantization",
+            (
+                attrib.Class(str),
+                attrib.Scales("global"),
+                attrib.Unit(None),
+                attrib.InList(("none", "log_uint16"))
+            ),
+            """Specifies how values of the [Exposure](#Exposure) output are stored. `none` stores
+            values as 32-bit floating point numbers. `log_uint16` stores values as 16-bit codes on a logarithmic
+            scale that spans from the [Options_ExposureThreshold](#Options_ExposureThreshold), or 1e-6 g/ha if
+            no threshold is set, to 1e6 g/ha. Code `0` represents no exposure and a code `c` represents a value of
+            `exp(offset + (c - 1) * scale)`, with the offset and scale given by the
+            [ExposureEncoding](#ExposureEncoding) output. The relative error of a quantized value is below 0.03%
+            and the mass-balance error introduced by the quantization is reported after merging. Values below
+            1e-6 g/ha are stored as zero. Quantization does not apply if the
+            [Options_LazyExposure](#Options_LazyExposure) input is enabled.""",
+            ("none", None)
+        ),
+        (
+            "Options_StagingPath",
+            (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
+            """A node-local directory, ideally on a memory-backed file system like `/dev/shm`, in
+            which the module inputs are prepared, or an empty string to prepare them within the
+            [ProcessingPath](#ProcessingPath). Preparing the many small module input files on a local file system
+            avoids their metadata-heavy input and output on shared network file systems. The module inputs are
+            removed from the staging path after the module completed. Module outputs are still written to the
+            `ProcessingPath`.""",
+            ("", None)
+        ),
+        (
+            "Options_DiskBudget",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit("MB")),
+            """The disk space that a run may occupy within its [ProcessingPath](#ProcessingPath) and its
+            folder within the [Options_StagingPath](#Options_StagingPath), or `0` for no limit. The temporary output
+            of the module within the [Options_TemporaryOutputPath](#Options_TemporaryOutputPath) is not accounted,
+            as it may be shared with other runs. The component measures the disk usage after each stage and reports
+            the disk space written by the stage and the peak usage of the run. The run fails before starting a
+            module stage or the merging if it exceeds its budget or if the scratch volume lacks free space for the
+            rest of the budget. Runs started concurrently by `run_components` instead wait for free space before
+            starting their module executables. A running stage is not interrupted and can exceed the budget.""",
+            (0, "MB")
+        ),
+        (
+            "Options_DeleteMergedRasters",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies whether the exposure rasters of the module are deleted as soon as their day
+            has been merged into the [Exposure](#Exposure). This keeps the disk space of a run small while merging,
+            but the run cannot serve as [Options_PreviousRun](#Options_PreviousRun) of an incremental run. The
+            option has no effect if [Options_LazyExposure](#Options_LazyExposure) is enabled, because the lazy
+            `Exposure` is calculated from the module outputs.""",
+            (False, None)
+        ),
+        (
+            "Options_WorkUnits",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit(None)),
+            """The number of work units into which the simulated fields are split, or `0` to run the
+            module as a single local process. Each work unit is a self-contained module run with its own inputs,
+            outputs and console log within the [ProcessingPath](#ProcessingPath) and is executed by workers of the
+            [Options_WorkQueue](#Options_WorkQueue). The field folders of all work units are gathered before they
+            are merged into the [Exposure](#Exposure). Work units ignore the
+            [Options_StagingPath](#Options_StagingPath), because workers on other nodes have to access their
+            inputs.""",
+            (0, None)
+        ),
+        (
+            "Options_WorkQueue",
+            (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
+            """The file path of the SQLite database of the work queue through which
+            [Options_WorkUnits](#Options_WorkUnits) are executed, or an empty string to use a queue within the
+            [ProcessingPath](#ProcessingPath). A queue on a shared file system can be served by workers on any
+            node that can access the `ProcessingPath` under the same path, started by
+            `python RunOffPrzm.py <queue file>` within a Landscape Model environment.""",
+            ("", None)
+        ),
+        (
+            "Options_LocalWorkers",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit(None)),
+            """The number of worker processes that the component starts on its own node to execute
+            [Options_WorkUnits](#Options_WorkUnits). Local workers exit once the
+            [Options_WorkQueue](#Options_WorkQueue) holds no more work. Use `0` if only workers on other nodes
+            serve the queue.""",
+            (1, None)
+        ),
+        (
+            "Options_YearBlockLength",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit("a")),
+            """The number of calendar years that are simulated by a separate module run, or `0` to
+            simulate the entire period at once. Year blocks run in parallel as
+            [Options_WorkUnits](#Options_WorkUnits) and each block only outputs run-off within its years. Module
+            results of year blocks cannot be reused by subsequent runs through
+            [Options_PreviousRun](#Options_PreviousRun).""",
+            (0, "a")
+        ),
+        (
+            "Options_YearBlockWarmUp",
+            (attrib.Class(int), attrib.Scales("global"), attrib.Unit("d")),
+            """The number of days that the module run of a year block additionally simulates before
+            the block starts, so that residues of applications before the block contribute to its run-off. Use a
+            warm-up that covers the decay of relevant residues.""",
+            (365, "d")
+        ),
+        (
+            "Options_YearBlockValidation",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies whether the entire period is additionally simulated at once to report the
+            difference in deposited mass between year blocks and a serial simulation. The serial simulation
+            doubles the module workload and is meant for choosing an appropriate
+            [Options_YearBlockWarmUp](#Options_YearBlockWarmUp).""",
+            (False, None)
+        ),
+        (
+            "Options_RepackModuleOutput",
+            (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
+            """Specifies whether the exposure rasters of the module are consolidated into a single
+            compressed archive within the [ProcessingPath](#ProcessingPath) once the module completed. The archive
+            only holds the windows of rasters that contain exposure, and the rasters are deleted after they have
+            been archived. The run cannot serve as [Options_PreviousRun](#Options_PreviousRun) of an incremental
+            run if its module outputs are repacked.""",
+            (False, None)
+        ),
+        (
+            "Options_ScratchCubePath",
+            (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
+            """A node-local directory in which the [Exposure](#Exposure) is assembled in a
+            memory-mapped scratch file before it is loaded into the store, or an empty string to merge the
+            `Exposure` in batches of days within the [Options_MergeMemoryLimit](#Options_MergeMemoryLimit). The
+            scratch file holds the chunks of all chunk periods with run-off in the chunk layout of the
+            `Exposure`. Module outputs are accumulated into it in parallel, and each chunk is then written to the
+            store exactly once and in storage order. The scratch file requires four bytes per cell and day of
+            each chunk period with run-off and is deleted afterwards. Resumed runs that already merged days
+            continue merging in batches.""",
+            ("", None)
+        )
+    )
 
-    def __init__(self, name, observer, store):
+    def __init__(self, name, observer, store, module_commands=None):
         """
         Initializes a RunOffPrzm component.
 
@@ -134,538 +1023,133 @@ class RunOffPrzm(base.Component):
             name: The name of the component.
             observer: The default observer of the component.
             store: The default store of the component.
+            module_commands: An optional tuple of the command lines that run PRZM and HydroFilter, to which the
+                arguments of a simulation are appended. Defaults to the executables of the module.
         """
         super(RunOffPrzm, self).__init__(name, observer, store)
         self._module = base.Module("PRZM_Runoff", "1.47", "Release 1.4\\Changelog.txt")
-        self._inputs = base.InputContainer(self, (
-            base.Input(
-                "ProcessingPath",
-                (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The working directory for the module. It is used for all files prepared as module inputs
-                or generated as module outputs. This excludes the files of the actual PRZM run whose path. See the 
-                [Options_TemporaryOutputPath](#Options_TemporaryOutputPath) input for the according parameterization. 
-                the `ProcessingPath` are considered temporary and can be safely deleted after a successful simulation 
-                run. Make sure that the `ProcessingPath` is configured in such a way that it does not collide with
-                other simulation runs (of different experiments or Monte Carlo runs)."""
-            ),
-            base.Input(
-                "Model_AdsorptionMethod",
-                (
-                    attrib.Class(str),
-                    attrib.Scales("global"),
-                    attrib.Unit(None),
-                    attrib.InList(("linear", "Freundlich", "aged"))
-                ),
-                self.default_observer,
-                description="""Specifies how PRZM simulates adsorption. Three methods are available: `linear` 
-                calculates adsorption based on a linear regression, `Freundlich` based on a normalized Freundlich 
-                equation and `aged` uses an aged adsorption function."""
-            ),
-            base.Input(
-                "Model_SoilTemperatureSimulation",
-                (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="""Specifies whether to simulate soil temperature or not. Enabled soil temperature 
-                simulation does not consider nitrogen transport."""
-            ),
-            base.Input(
-                "SubstanceName",
-                (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="""Substances differ in their properties and, thus, for every substance simulated a 
-                different set of values has to be specified. The current `RunOffPrzm` component does, however, allow to 
-                simulate a single substance only. This might change in the future, as the module is conceptually and 
-                technically prepared to handle multiple substances simultaneously. The `SubstanceName` has currently
-                no technical relevance."""
-            ),
-            base.Input(
-                "Substance_PlantUptakeFactor",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("1/d")),
-                self.default_observer,
-                description="The substance-specific PRZM plant uptake factor."
-            ),
-            base.Input(
-                "Substance_PesticideDissipationRateOfFoliage",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("1/d")),
-                self.default_observer,
-                description="The substance-specific PRZM pesticide dissipation rate on foliage."
-            ),
-            base.Input(
-                "Substance_FoliarWashOffCoefficient",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("1/cm")),
-                self.default_observer,
-                description="The substance-specific PRZM foliar wash-off coefficient."
-            ),
-            base.Input(
-                "Substance_HenryConstant",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("1")),
-                self.default_observer,
-                description="""The substance-specific Henry constant. You can also set this input to the special value
-                of `nan` to let the module derive the Henry constant from the input values of
-                [Substance_VapourPressure](#Substance_VapourPressure),
-                [Substance_MolecularWeight](#Substance_MolecularWeight), 
-                [Substance_WaterSolubility](#Substance_WaterSolubility) and 
-                [Substance_TemperatureAtWhichMeasured](#Substance_TemperatureAtWhichMeasured)."""
-            ),
-            base.Input(
-                "Substance_VapourPressure",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("mPa")),
-                self.default_observer,
-                description="The substance-specific vapor pressure."
-            ),
-            base.Input(
-                "Substance_MolecularWeight",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("g/mol")),
-                self.default_observer,
-                description="The substance-specific molecular weight."
-            ),
-            base.Input(
-                "Substance_WaterSolubility",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("mg/L")),
-                self.default_observer,
-                description="The substance-specific water solubility."
-            ),
-            base.Input(
-                "Substance_TemperatureAtWhichMeasured",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("K")),
-                self.default_observer,
-                description="The reference temperature for the physical and chemical properties of the substance."
-            ),
-            base.Input(
-                "Substance_FreundlichExponent",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("1")),
-                self.default_observer,
-                description="The substance-specific Freundlich exponent."
-            ),
-            base.Input(
-                "Substance_ReferenceMoistureForDT50Soil",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("%")),
-                self.default_observer,
-                description="The substance-specific reference moisture for the soil DT50 in percent of field capacity."
-            ),
-            base.Input(
-                "Substance_SoilDT50",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("d")),
-                self.default_observer,
-                description="The substance-specific soil half-life time."
-            ),
-            base.Input(
-                "Substance_KocSoil",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("cm³/g")),
-                self.default_observer,
-                description="The substance-specific KOC in soil."
-            ),
-            base.Input(
-                "SprayApplication_PrzmApplicationMethod",
-                (
-                    attrib.Class(str),
-                    attrib.Scales("global"),
-                    attrib.Unit(None),
-                    attrib.InList(("soil", "canopy", "foliar"))
-                ),
-                self.default_observer,
-                description="""The PRZM chemical application method that is assumed for all spray applications. `soil`
-                indicates direct spraying of the soil surface, `canopy` of the crop canopy and `foliar` a foliar
-                application."""
-            ),
-            base.Input(
-                "SprayApplication_IncorporationDepth",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("cm")),
-                self.default_observer,
-                description="The PRZM incorporation depth of spray applications."
-            ),
-            base.Input(
-                "Options_StartDate",
-                (attrib.Class(datetime.date, 1), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="The first simulated date. All temporal input parameters must start at this date."
-            ),
-            base.Input(
-                "Options_EndDate",
-                (attrib.Class(datetime.date, 1), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="The last simulated date. All temporal input parameters must end at this date."
-            ),
-            base.Input(
-                "Options_TemporaryOutputPath",
-                (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="""PRZM cannot run in paths with long names. The [ProcessingPath](#ProcessingPath), due to 
-                its requirement to be unique for each simulation run, is normally too long to be used here. Instead, 
-                PRZM simulations run in the directory specified by the `Options_TemporaryOutputPath` input."""
-            ),
-            base.Input(
-                "Options_DeleteTemporaryGrids",
-                (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="""`RunOffPrzm` creates an output grid for each field in the landscape before it merges 
-                them. If the temporary output of each field should be deleted as early as possible, set this option to `
-                true`. `False` is the right option if you need to keep the temporary grids, e.g., for debugging."""
-            ),
-            base.Input(
-                "Options_TimeoutSecPrzm",
-                (attrib.Class(int), attrib.Scales("global"), attrib.Unit("s")),
-                self.default_observer,
-                description="""The time after which an idle PRZM instance timeouts. Tweak this option to prevent locks
-                            in some rare circumstances."""
-            ),
-            base.Input(
-                "Options_ReportingThreshold",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("mg")),
-                self.default_observer,
-                description="""The minimum mass that is required to trigger continuation of the water and substance 
-                flow simulation. Smaller masses remain at the current cell and are not further transported. Set this
-                option to a sensible value that allows to capture all relevant depositions while reducing the processing
-                time."""
-            ),
-            base.Input(
-                "Options_DeleteAllInterimResults",
-                (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="""Specifies whether to delete all intermediary files after a successful simulation run.
-                Enable this option to save disk space (intermediary files may accumulate to a considerable amount) or
-                disable it if you need to keep intermediary files, e.g., for debugging."""
-            ),
-            base.Input(
-                "Weather_Precipitation",
-                (attrib.Class(np.ndarray), attrib.Scales("time/day"), attrib.Unit("mm/d")),
-                self.default_observer,
-                description="""A series of daily precipitation values. The series must cover the entire range between
-                [Options_StartDate](#Options_StartDate) and [Options_EndDate](#Options_EndDate) in consecutive order."""
-            ),
-            base.Input(
-                "Weather_ET0",
-                (attrib.Class(np.ndarray), attrib.Scales("time/day"), attrib.Unit("mm/d")),
-                self.default_observer,
-                description="""A series of daily evapotranspiration values. The series must cover the entire range 
-                between [Options_StartDate](#Options_StartDate) and [Options_EndDate](#Options_EndDate) in consecutive
-                order."""
-            ),
-            base.Input(
-                "Weather_Temperature",
-                (attrib.Class(np.ndarray), attrib.Scales("time/day"), attrib.Unit("°C")),
-                self.default_observer,
-                description="""A series of daily temperature values. The series must cover the entire range between
-                [Options_StartDate](#Options_StartDate) and [Options_EndDate](#Options_EndDate) in consecutive order."""
-            ),
-            base.Input(
-                "Weather_WindSpeed",
-                (attrib.Class(np.ndarray), attrib.Scales("time/day"), attrib.Unit("m/s")),
-                self.default_observer,
-                description="""A series of daily wind speed values. The series must cover the entire range between
-                [Options_StartDate](#Options_StartDate) and [Options_EndDate](#Options_EndDate) in consecutive order."""
-            ),
-            base.Input(
-                "Weather_SolarRadiation",
-                (attrib.Class(np.ndarray), attrib.Scales("time/day"), attrib.Unit("kJ/(m²*d)")),
-                self.default_observer,
-                description="""A series of daily solar radiation values. The series must cover the entire range between
-                [Options_StartDate](#Options_StartDate) and [Options_EndDate](#Options_EndDate) in consecutive order."""
-            ),
-            base.Input(
-                "Fields_Slope",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("%")),
-                self.default_observer,
-                description="""The average slope of all fields in the landscape. This slope is feeds PRZM run-off
-                calculations and is independent of the slopes underlying the [Fields_FlowGrid](#Fields_FlowGrid). 
-                Please make sure that representation of slopes is somewhat consistent between landscape scenario and 
-                `RunOffPrzm` parameterization. A later version may allow specifying slopes on a per-field basis instead
-                of globally."""
-            ),
-            base.Input(
-                "Fields_SoilHorizonThicknesses",
-                (attrib.Class(list[float], 1), attrib.Scales("other/soil_horizon"), attrib.Unit("cm")),
-                self.default_observer,
-                description="""A sequence of soil horizon depths from top to bottom. This sequence defines how many
-                soil horizons there are and how they are distributed along the z-axis."""
-            ),
-            base.Input(
-                "Fields_SoilHorizonBulkDensities",
-                (attrib.Class(list[float], 1), attrib.Scales("other/soil_horizon"), attrib.Unit("g/cm³")),
-                self.default_observer,
-                description="""A sequence of soil horizon bulk densities from top to bottom. This sequence must have the
-                same number of elements as the [Fields_SoilHorizonThicknesses](#Fields_SoilHorizonThicknesses) sequence.
-                Elements refer to the same soil horizon (in the same order) as the soil horizons specified there."""
-            ),
-            base.Input(
-                "Fields_SoilHorizonOrganicMaterialContents",
-                (attrib.Class(list[float], 1), attrib.Scales("other/soil_horizon"), attrib.Unit("%")),
-                self.default_observer,
-                description="""A sequence of soil horizon organic material contents from top to bottom. This sequence 
-                must have the same number of elements as the 
-                [Fields_SoilHorizonThicknesses](#Fields_SoilHorizonThicknesses) sequence. Elements refer to the same 
-                soil horizon (in the same order) as the soil horizons specified there."""
-            ),
-            base.Input(
-                "Fields_SoilHorizonSandFractions",
-                (attrib.Class(list[float], 1), attrib.Scales("other/soil_horizon"), attrib.Unit("%")),
-                self.default_observer,
-                description="""A sequence of soil horizon sand fractions from top to bottom. This sequence must have the
-                same number of elements as the [Fields_SoilHorizonThicknesses](#Fields_SoilHorizonThicknesses) sequence.
-                Elements refer to the same soil horizon (in the same order) as the soil horizons specified there."""
-            ),
-            base.Input(
-                "Fields_SoilHorizonSiltFractions",
-                (attrib.Class(list[float], 1), attrib.Scales("other/soil_horizon"), attrib.Unit("%")),
-                self.default_observer,
-                description="""A sequence of soil horizon silk fractions from top to bottom. This sequence must have the
-                same number of elements as the [Fields_SoilHorizonThicknesses](#Fields_SoilHorizonThicknesses) sequence.
-                Elements refer to the same soil horizon (in the same order) as the soil horizons specified there."""
-            ),
-            base.Input(
-                "Fields_Geometries",
-                (attrib.Class(list[bytes]), attrib.Scales("space/base_geometry"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The geometries of in-field areas in WKB representation. Each element refers to a field
-                with its according identifier from the list of [Fields_Ids](#Fields_Ids)."""
-            ),
-            base.Input(
-                "Fields_Ids",
-                (attrib.Class(list[int]), attrib.Scales("space/base_geometry"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The simulation-wide unique identifiers of fields within the landscape. These identifiers
-                stem from the landscape scenario and are shared among components."""
-            ),
-            base.Input(
-                "Fields_Crs",
-                (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The coordinate reference system in which the [Fields_Geometries](#Fields_Geometries) 
-                are projected. The coordinate reference system needs to be in Proj4 notation."""
-            ),
-            base.Input(
-                "Fields_Extent",
-                (attrib.Class(tuple[float]), attrib.Scales("space/extent"), attrib.Unit("metre")),
-                self.default_observer,
-                description="""The extent of the simulated landscape. This value has to be consistent with the 
-                [Fields_Geometries](#Fields_Geometries) and the [Fields_FlowGrid](#Fields_FlowGrid) and is projected
-                in the [Fields_Crs](#Fields_Crs). The landscape scenario normally takes care of that."""
-            ),
-            base.Input(
-                "Fields_FlowGrid",
-                (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The file path to a raster file that contains information about the flow direction 
-                between individual raster cells. Flow directions follow the [ESRI standard](
-                https://desktop.arcgis.com/de/arcmap/10.3/tools/spatial-analyst-toolbox/flow-direction.htm) encoding 
-                for flow directions."""
-            ),
-            base.Input(
-                "Fields_InFieldMargin",
-                (attrib.Class(float), attrib.Scales("global"), attrib.Unit("m")),
-                self.default_observer,
-                description="""A width of an inner margin along field boundaries that is not covered with crop but with
-                other herbaceous vegetation. This value applies to all fields in the landscape and does not change over
-                time, but a future version of the component may allow for spatio-temporal variation."""
-            ),
-            base.Input(
-                "Ppm_AppliedFields",
-                (attrib.Class(np.ndarray), attrib.Scales("other/application"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The identifiers of applied fields (according to the [Fields_Ids](#Fields_Ids)) per 
-                application. The number of elements defines how many applications there are in total, and the values
-                link applications to individual fields."""
-            ),
-            base.Input(
-                "Ppm_ApplicationDates",
-                (attrib.Class(np.ndarray), attrib.Scales("other/application"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The dates of application. This specifies for each application indicated by the 
-                [Ppm_AppliedFields](#Ppm_AppliedFields), on which day the application took place."""
-            ),
-            base.Input(
-                "Ppm_ApplicationRates",
-                (attrib.Class(np.ndarray), attrib.Scales("other/application"), attrib.Unit("g/ha")),
-                self.default_observer,
-                description="""This indicates for each application indicated by the 
-                [Ppm_AppliedFields](#Ppm_AppliedFields) at which rate the substance with the name of 
-                [SubstanceName](#SubstanceName) was applied."""
-            ),
-            base.Input(
-                "Ppm_AppliedAreas",
-                (attrib.Class(list[bytes]), attrib.Scales("other/application"), attrib.Unit(None)),
-                self.default_observer,
-                description="""For each application indicated by the [Ppm_AppliedFields](#Ppm_AppliedFields), this gives
-                the geometry of the actual applied area in WKB representation. This geometry might be equal to or 
-                smaller and located within the field geometry given by the [Fields_Geometries](#Fields_Geometries). Only
-                the area indicated by the `Ppm_AppliedAreas` is actually applied, allowing to leave in-crop buffers or
-                depict spatial variation of the application relative to the field geometry."""
-            ),
-            base.Input(
-                "Options_ShowExtendedErrorInformation",
-                (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="Specifies whether the module prompts extended information on errors or not."
-            ),
-            base.Input(
-                "Options_MethodOfRunoffGeneration",
-                (attrib.Class(str), attrib.Scales("global"), attrib.Unit(None), attrib.InList(("PRZM", "FOCUS"))),
-                self.default_observer,
-                description="""Specifies the method used to simulate the amount of run-off. `PRZM` specifies to use PRZM
-                runs for run-off generation, `FOCUS` to use FOCUS Step2 run-off simulations."""
-            ),
-            base.Input(
-                "Options_UsePreSimulatedPrzmResults",
-                (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="""Specifies using pre-simulated PRZM runs for run-off simulation instead of new PRZM 
-                runs."""
-            ),
-            base.Input(
-                "Options_UseOnePrzmModelPerGridCell",
-                (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="""Specifies to start an individual PRZM run for every cell to calculate run-off. Enabling 
-                this parameter results in many PRZM runs, resulting in considerably longer simulation runs. Usage of 
-                PRZM for the purpose of run-off generation in off-crop cells should also be seen as experimental."""
-            ),
-            base.Input(
-                "Options_UseVfsMod",
-                (attrib.Class(bool), attrib.Scales("global"), attrib.Unit(None)),
-                self.default_observer,
-                description="""Specifies whether to use crop-specific VfsMOD lookup tables to simulate run-off 
-                filtering. The [CropParameters_VfsModLookupTables](#CropParameters_VfsModLookupTables) input 
-                parameterizes which lookup table to use for which crop."""
-            ),
-            base.Input(
-                "CropParameters_Crops",
-                (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
-                self.default_observer,
-                description="""A list of crop names. Each crop has its own set of crop-specific parameters. One 'crop'
-                that should normally be specified is 'OffCrop'. Parameters for 'OffCrop' apply to all areas outside 
-                fields as they are specified by the [Fields_Geometries](#Fields_Geometries)."""
-            ),
-            base.Input(
-                "CropParameters_PanEvaporationFactors",
-                (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
-                self.default_observer,
-                description="""The PAN evaporation factor of a crop. Each element of the list refers to the crop at the
-                same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_CanopyInterceptions",
-                (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("cm")),
-                self.default_observer,
-                description="""The canopy intersection of a crop. Each element of the list refers to the crop at the
-                same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_MaximumCoverages",
-                (attrib.Class(list[int]), attrib.Scales("other/crop"), attrib.Unit("%")),
-                self.default_observer,
-                description="""The maximum soil coverage of a crop. Each element of the list refers to the crop at the
-                same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_MaximumHeights",
-                (attrib.Class(list[int]), attrib.Scales("other/crop"), attrib.Unit("cm")),
-                self.default_observer,
-                description="""The maximum height of a crop. Each element of the list refers to the crop at the same 
-                position in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_MaximumRootingDepths",
-                (attrib.Class(list[int]), attrib.Scales("other/crop"), attrib.Unit("cm")),
-                self.default_observer,
-                description="""The maximum rooting depth of a crop. Each element of the list refers to the crop at the
-                same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_Fallows",
-                (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
-                self.default_observer,
-                description="""The fallow parameter of a crop. Each element of the list refers to the crop at the same 
-                position in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_Cropping",
-                (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
-                self.default_observer,
-                description="""The cropping parameter of a crop. Each element of the list refers to the crop at the 
-                same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_Residues",
-                (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
-                self.default_observer,
-                description="""The residues of a crop. Each element of the list refers to the crop at the same position
-                in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_EmergenceDates",
-                (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The date of a year when a crop emerges. Each element of the list refers to the crop at 
-                the same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_MaturationDates",
-                (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The date of a year when a crop matures. Each element of the list refers to the crop at 
-                the same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_HarvestDates",
-                (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The date of a year of crop harvest. Each element of the list refers to the crop at the 
-                same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_FallowDates",
-                (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The date of a year when a crop fallows. Each element of the list refers to the crop at 
-                the same position in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_WaterMitigations",
-                (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
-                self.default_observer,
-                description="""Specifies the rate of water mitigation per crop. This factor feeds an exponential 
-                decay function to calculate the run-off reduction from cell to cell. Hence, they should be calibrated to
-                the cell size of the output grid. Each element of the list refers to the crop at the same position in 
-                the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_SedimentMitigations",
-                (attrib.Class(list[float]), attrib.Scales("other/crop"), attrib.Unit("1")),
-                self.default_observer,
-                description="""Specifies the rate of sediment mitigation per crop. This factor feeds an exponential 
-                decay function to calculate the run-off reduction from cell to cell. Hence, they should be calibrated 
-                to the cell size of the output grid. Each element of the list refers to the crop at the same position 
-                in the [CropParameters_Crops](#CropParameters_Crops) input."""
-            ),
-            base.Input(
-                "CropParameters_VfsModLookupTables",
-                (attrib.Class(list[str]), attrib.Scales("other/crop"), attrib.Unit(None)),
-                self.default_observer,
-                description="""The file path to a VfsMOD lookup table. Specify `none` if you want to disable the use of 
-                a lookup table for a specific crop. Each element of the list refers to the crop at the same position in 
-                the [CropParameters_Crops](#CropParameters_Crops) input."""
+        if module_commands is None:
+            module_path = os.path.join(os.path.dirname(__file__), "Release 1.4")
+            module_commands = (
+                (os.path.join(module_path, "PRZM_Runoff.exe"),),
+                (os.path.join(module_path, "HydroFilter_Runoff.exe"),)
             )
+        self._przm_command, self._hydro_filter_command = (tuple(command) for command in module_commands)
+        self._inputs = base.InputContainer(self, tuple(
+            OptionalInput(name, attributes, self.default_observer, default[0], description=description) if default
+            else base.Input(name, attributes, self.default_observer, description=description)
+            for name, attributes, description, *default in self.INPUTS
         ))
         self._outputs = base.OutputContainer(self, (
-            base.Output(
+            ExposureOutput(
                 "Exposure",
                 store,
                 self,
                 {"data_type": np.float32, "scales": "space_y/1sqm, space_x/1sqm, time/day", "unit": "g/ha"},
                 """Details run-off deposition as generated by PRZM runs per application of a field and after combining
-                the spatially distributed run-off from all applications at the same day.""",
+                the spatially distributed run-off from all applications at the same day. The spatial scales of the
+                output depend on the [Options_OutputResolution](#Options_OutputResolution) input, e.g., 
+                `space_y/100sqm, space_x/100sqm` for a resolution of 10 m. If the
+                [Options_LazyExposure](#Options_LazyExposure) input is enabled, values are calculated from the module
+                output rasters when they are first read within the process of the component and then stored.""",
                 {
                     "type": np.ndarray,
                     "shape": (
                         """the number of days covered by [Options_StartDate](#Options_StartDate) and 
                         [Options_EndDate](#Options_EndDate)""",
-                        "the number of meters covered by the [Fields_Extent](#Fields_Extent) in x-direction",
-                        "the number of meters covered by the [Fields_Extent](#Fields_Extent) in y-direction"
+                        """the number of cells covered by the [Fields_Extent](#Fields_Extent) in x-direction at the
+                        [Options_OutputResolution](#Options_OutputResolution)""",
+                        """the number of cells covered by the [Fields_Extent](#Fields_Extent) in y-direction at the
+                        [Options_OutputResolution](#Options_OutputResolution)"""
                     ),
-                    "chunks": "for fast retrieval of spatial patterns"
+                    "chunks": "according to the [Options_ExposureChunking](#Options_ExposureChunking) input"
+                }
+            ),
+            base.Output(
+                "DailyDepositedMass",
+                store,
+                self,
+                {"data_type": np.float64, "scales": "time/day", "unit": "g"},
+                """The total run-off mass deposited within the landscape per day. This output is not available if the
+                [Options_LazyExposure](#Options_LazyExposure) input is enabled.""",
+                {
+                    "type": np.ndarray,
+                    "shape": (
+                        """the number of days covered by [Options_StartDate](#Options_StartDate) and 
+                        [Options_EndDate](#Options_EndDate)""",
+                    )
+                }
+            ),
+            base.Output(
+                "DailyMaximumExposure",
+                store,
+                self,
+                {"data_type": np.float32, "scales": "time/day", "unit": "g/ha"},
+                """The maximum value of the [Exposure](#Exposure) output per day. This output is not available if the
+                [Options_LazyExposure](#Options_LazyExposure) input is enabled.""",
+                {
+                    "type": np.ndarray,
+                    "shape": (
+                        """the number of days covered by [Options_StartDate](#Options_StartDate) and 
+                        [Options_EndDate](#Options_EndDate)""",
+                    )
+                }
+            ),
+            base.Output(
+                "DailyExposedCells",
+                store,
+                self,
+                {"data_type": np.int64, "scales": "time/day", "unit": None},
+                """The number of cells of the [Exposure](#Exposure) output with a value greater than zero per day. This
+                output is not available if the [Options_LazyExposure](#Options_LazyExposure) input is enabled.""",
+                {
+                    "type": np.ndarray,
+                    "shape": (
+                        """the number of days covered by [Options_StartDate](#Options_StartDate) and 
+                        [Options_EndDate](#Options_EndDate)""",
+                    )
+                }
+            ),
+            base.Output(
+                "DailyExposureExtent",
+                store,
+                self,
+                {"data_type": np.int32, "scales": "time/day, other/bounding_box", "unit": None},
+                """The bounding box of exposed cells per day as slice boundaries of the [Exposure](#Exposure) output,
+                i.e., as first row, last row plus one, first column and last column plus one. Days without exposure
+                have an empty bounding box of zeros. Consumers can restrict reads of the `Exposure` output to this
+                bounding box. This output is not available if the [Options_LazyExposure](#Options_LazyExposure) input
+                is enabled.""",
+                {
+                    "type": np.ndarray,
+                    "shape": (
+                        """the number of days covered by [Options_StartDate](#Options_StartDate) and 
+                        [Options_EndDate](#Options_EndDate)""",
+                        "the four slice boundaries"
+                    )
                 }
             ),
+            base.Output(
+                "ExposedDays",
+                store,
+                self,
+                {"data_type": np.int32, "scales": "other/exposed_day", "unit": None},
+                """The sorted indices of days along the time axis of the [Exposure](#Exposure) output that have any
+                exposure. Consumers can skip all other days without reading the `Exposure` output. If the
+                [Options_LazyExposure](#Options_LazyExposure) input is enabled, the index lists all days for which the
+                module wrote output rasters.""",
+                {"type": np.ndarray, "shape": ("the number of days with exposure",)}
+            ),
+            base.Output(
+                "ExposureEncoding",
+                store,
+                self,
+                {"data_type": np.float64, "scales": "other/encoding_parameter", "unit": None},
+                """The offset and the scale of the logarithmic codes of the [Exposure](#Exposure) output. This output
+                is only available if the [Options_ExposureQuantization](#Options_ExposureQuantization) input is set to
+                `log_uint16`.""",
+                {"type": np.ndarray, "shape": ("the two encoding parameters offset and scale",)}
+            )
         ))
 
     def convert_to_przm_date(self, date, max_date):
@@ -707,478 +1191,3517 @@ class RunOffPrzm(base.Component):
         Returns:
             Nothing.
         """
-        exe = os.path.join(os.path.dirname(__file__), "Release 1.4", "PRZM_Runoff.exe")
-        exe2 = os.path.join(os.path.dirname(__file__), "Release 1.4", "HydroFilter_Runoff.exe")
+        state = self.prepare_run()
+        if state.work_units:
+            self.run_work_units(state.work_units, state.przm_folder, state.manifest, state.disk_usage)
+        else:
+            self.run_module(
+                state.przm_config, state.przm_folder, state.processing_path, state.manifest, state.simulated,
+                state.disk_usage)
+        self.finish_run(state)
+
+    async def run_async(self, module_slots=None, stage_slots=None):
+        """
+        Runs the component without blocking the event loop. The preparation of module inputs and the merging of module
+        outputs run in worker threads, and the module executables run as asynchronous subprocesses. This allows
+        running several components concurrently, see the `run_components` function.
+
+        Args:
+            module_slots: An optional semaphore that limits the number of concurrently running module executables.
+            stage_slots: An optional semaphore that limits the number of concurrent preparation and merging stages.
+
+        Returns:
+            Nothing.
+        """
+        loop = asyncio.get_running_loop()
+        async with stage_slots or unlimited_slot():
+            state = await loop.run_in_executor(None, self.prepare_run)
+        if state.work_units:
+            await self.wait_for_disk_space(state.disk_usage, "Work units")
+            async with module_slots or unlimited_slot():
+                await loop.run_in_executor(
+                    None, self.run_work_units, state.work_units, state.przm_folder, state.manifest, state.disk_usage)
+            stages = []
+        else:
+            stages = self.module_stages(state.przm_config, state.przm_folder, state.manifest, state.simulated)
+        if stages:
+            await self.wait_for_disk_space(state.disk_usage, stages[0][0])
+        async with module_slots or unlimited_slot():
+            for stage, command, total_fields in stages:
+                await self.wait_for_disk_space(state.disk_usage, stage)
+                state.disk_usage.enforce(stage)
+                await self.run_module_process_async(
+                    command, state.processing_path, state.przm_folder, stage, total_fields)
+                self.complete_module_stage(stage, state.przm_folder, state.manifest, state.disk_usage)
+        await self.wait_for_disk_space(state.disk_usage, "Merging")
+        async with stage_slots or unlimited_slot():
+            await loop.run_in_executor(None, self.finish_run, state)
+
+    def prepare_run(self):
+        """
+        Prepares a run up to the point where the module executables can be started.
+
+        Returns:
+            The state of the run.
+        """
+        self.preflight()
         processing_path = self.inputs["ProcessingPath"].read().values
-        source_flow_grid = self._inputs["Fields_FlowGrid"].read().values
         przm_folder = os.path.join(processing_path, "przm")
-        przm_config = os.path.join(processing_path, "parameters.xml")
-        ppp_repository = os.path.join(processing_path, "PPP.xml")
-        cropping_statistic_przm = os.path.join(processing_path, "CroppingStatistics_PRZM.xml")
-        ppm_calendar_przm = os.path.join(processing_path, "PPM_CALENDAR_PRZM.xml")
-        crop_parameterization = os.path.join(processing_path, "CropParameters.xml")
-        run_off_field_discrete = os.path.join(processing_path, "Fields.tif")
-        run_off_field_parameters = os.path.join(processing_path, "field_parameterization.xml")
-        flow_grid = os.path.join(processing_path, "flow.tif")
-        # noinspection SpellCheckingInspection
-        przm_weather = os.path.join(processing_path, "focusprzm_weather.met")
-        # noinspection SpellCheckingInspection
-        applied_areas_path = os.path.join(processing_path, "appl")
-        try:
-            os.makedirs(przm_folder)
-        except FileExistsError:
-            raise FileExistsError("Cannot run PRZM in a path that already exists: " + processing_path)
-        shutil.copyfile(source_flow_grid, flow_grid)
-        self.write_configuration_xml(ppp_repository,
-                                     cropping_statistic_przm,
-                                     ppm_calendar_przm,
-                                     crop_parameterization,
-                                     run_off_field_discrete,
-                                     run_off_field_parameters,
-                                     flow_grid,
-                                     przm_weather,
-                                     przm_config)
-        self.write_przm_weather_file(przm_weather)
-        self.write_field_parameters_file(run_off_field_parameters)
-        self.write_field_raster(run_off_field_discrete)
-        self.write_cropping_statistics(cropping_statistic_przm)
-        self.write_ppp_repository(ppp_repository)
-        spatial_info = self.collect_spatial_application_info()
-        self.write_ppm_calendar(ppm_calendar_przm, applied_areas_path, spatial_info[0])
-        self.write_applied_area_raster(applied_areas_path, spatial_info[1])
-        self.write_crop_parameters(crop_parameterization)
-        # noinspection SpellCheckingInspection
-        base.run_process((exe, "-ifile", przm_config, przm_folder), processing_path, self.default_observer)
-        # noinspection SpellCheckingInspection
-        base.run_process((exe2, "-ifile", przm_config, przm_folder), processing_path, self.default_observer)
-        if not os.path.exists(os.path.join(przm_folder, "successful.txt")):
-            raise Exception("Run-off run was not successful")
+        merge_plan = self.plan_merge()
+        manifest = self.open_run_manifest(processing_path, przm_folder)
+        selection = self.select_applications()
+        fingerprints = self.field_fingerprints(selection)
+        simulated, reused_fields = self.plan_incremental_run(selection, fingerprints)
+        work_units = self.plan_work_units(processing_path, simulated)
+        if work_units:
+            input_path = processing_path
+            # the inputs of the last work unit are written last
+            przm_config = os.path.join(work_units[-1][0].input_path, "parameters.xml")
+        else:
+            input_path = self.module_input_path(processing_path)
+            przm_config = os.path.join(input_path, "parameters.xml")
+        # the temporary output path is not accounted, as it may be shared with other runs
+        disk_usage = DiskUsage((processing_path, input_path), self.inputs["Options_DiskBudget"].read().values * 2 ** 20)
+        # staged module inputs do not persist if a run is resumed on another node
+        if not manifest.completed("module inputs") or not os.path.exists(przm_config):
+            os.makedirs(input_path, exist_ok=True)
+            # the raster of all fields of the landscape is compared by subsequent incremental runs, while the module
+            # only receives the fields that it simulates
+            landscape_fields = os.path.join(processing_path, "landscape_fields.tif")
+            if work_units or not np.array_equal(simulated, selection):
+                self.write_field_raster(landscape_fields, selection)
+            if work_units:
+                for work_unit, unit_simulated in work_units:
+                    os.makedirs(work_unit.input_path, exist_ok=True)
+                    self.write_module_inputs(
+                        work_unit.input_path, unit_simulated, work_unit.temporary_output_path, work_unit.window)
+            else:
+                self.write_module_inputs(input_path, simulated)
+                if np.array_equal(simulated, selection):
+                    shutil.copyfile(os.path.join(input_path, "Fields.tif"), landscape_fields)
+            manifest.complete("module inputs")
+        for level, message in disk_usage.account("Module input preparation"):
+            self.default_observer.write_message(level, message)
+        return RunState(
+            processing_path,
+            input_path,
+            przm_folder,
+            przm_config,
+            merge_plan,
+            manifest,
+            simulated,
+            reused_fields,
+            fingerprints,
+            disk_usage,
+            [work_unit for work_unit, _ in work_units]
+        )
+
+    def preflight(self):
+        """
+        Checks the inputs for misconfigurations that would otherwise only surface while or after the module runs.
+        All checks only consider input values and file metadata, and all found problems are reported at once.
+
+        Returns:
+            Nothing.
+        """
+        problems = []
+        extent = self.inputs["Fields_Extent"].read().values
+        flow_grid = self.inputs["Fields_FlowGrid"].read().values
+        flow_grid_data_set = gdal.Open(flow_grid, 0) if os.path.isfile(flow_grid) else None
+        if flow_grid_data_set is None:
+            problems.append("Fields_FlowGrid {} cannot be opened".format(flow_grid))
+        else:
+            raster_size = (flow_grid_data_set.RasterXSize, flow_grid_data_set.RasterYSize)
+            field_raster_size = (int(round(extent[1] - extent[0])), int(round(extent[3] - extent[2])))
+            if raster_size != field_raster_size:
+                problems.append("Fields_FlowGrid has {}x{} cells but the Fields_Extent covers {}x{} cells".format(
+                    *raster_size, *field_raster_size))
+            geo_transform = flow_grid_data_set.GetGeoTransform()
+            if not np.allclose(
+                    (geo_transform[0], geo_transform[3], geo_transform[1], geo_transform[5]),
+                    (extent[0], extent[3], 1, -1)):
+                problems.append("Fields_FlowGrid with origin {}, {} and cell size {}, {} is not aligned with the "
+                                "Fields_Extent at 1 m resolution".format(
+                                    geo_transform[0], geo_transform[3], geo_transform[1], geo_transform[5]))
+            del flow_grid_data_set
+        temporary_output_path = self.inputs["Options_TemporaryOutputPath"].read().values
+        year_blocks = len(self.year_blocks())
+        work_units = max(self.inputs["Options_WorkUnits"].read().values, 1) * (
+            year_blocks + (year_blocks > 1 and self.inputs["Options_YearBlockValidation"].read().values))
+        if work_units > 1 or self.inputs["Options_WorkUnits"].read().values > 0:
+            # work units run in numbered sub-folders of the temporary output path
+            temporary_output_path = os.path.join(temporary_output_path, str(work_units - 1))
+        # the module runs in a sub-folder named by its process ID, which is separated by a backslash
+        if len(temporary_output_path.rstrip("\\/")) + 1 + self.PROCESS_ID_WIDTH > self.TEMPORARY_PATH_LIMIT:
+            problems.append(
+                "Options_TemporaryOutputPath {} exceeds the limit of {} characters including the sub-folder of up to "
+                "{} characters for the process ID of the module".format(
+                    temporary_output_path,
+                    self.TEMPORARY_PATH_LIMIT,
+                    1 + self.PROCESS_ID_WIDTH
+                )
+            )
         simulation_start = self.inputs["Options_StartDate"].read().values
         simulation_end = self.inputs["Options_EndDate"].read().values
-        simulation_length = (simulation_end - simulation_start).days + 1
-        extent = self.inputs["Fields_Extent"].read().values
-        raster_cols = int(round(extent[1] - extent[0]))
-        raster_rows = int(round(extent[3] - extent[2]))
-        self.outputs["Exposure"].set_values(
-            np.ndarray,
-            shape=(raster_rows, raster_cols, simulation_length),
-            chunks=base.chunk_size((None, None, 1), (raster_rows, raster_cols, simulation_length)),
-            offset=(extent[2], extent[0], simulation_start)
-        )
-        input_raster = {}
-        for raster in glob.iglob(przm_folder + "/**/output/*.tif", recursive=True):
-            day_string = os.path.basename(raster)[-9:-4]
-            if day_string != "f_grd":
-                if day_string in input_raster:
-                    input_raster[day_string] += [raster]
+        simulation_days = (simulation_end - simulation_start).days + 1
+        for name in ("Weather_Precipitation", "Weather_ET0", "Weather_Temperature", "Weather_WindSpeed",
+                     "Weather_SolarRadiation"):
+            # longer series are accepted, the weather file only uses the values of the simulated days
+            weather_days = len(self.inputs[name].read().values)
+            if weather_days < simulation_days:
+                problems.append("{} has {} values for {} simulated days, {} values are missing".format(
+                    name, weather_days, simulation_days, simulation_days - weather_days))
+        applied_fields = self.inputs["Ppm_AppliedFields"].read().values
+        for name in ("Ppm_ApplicationDates", "Ppm_ApplicationRates", "Ppm_AppliedAreas"):
+            if len(self.inputs[name].read().values) != len(applied_fields):
+                problems.append("{} has {} values for {} applications".format(
+                    name, len(self.inputs[name].read().values), len(applied_fields)))
+        application_dates = np.asarray(self.inputs["Ppm_ApplicationDates"].read().values)
+        outside = np.flatnonzero(
+            (application_dates < simulation_start.toordinal()) | (application_dates > simulation_end.toordinal()))
+        if outside.size > 0:
+            problems.append("{} applications lie outside the simulated period, e.g., application {} at {}".format(
+                outside.size, outside[0], datetime.date.fromordinal(int(application_dates[outside[0]]))))
+        unknown_fields = np.setdiff1d(applied_fields, self.inputs["Fields_Ids"].read().values)
+        if unknown_fields.size > 0:
+            problems.append("Ppm_AppliedFields references {} fields not listed in Fields_Ids, e.g., field {}".format(
+                unknown_fields.size, unknown_fields[0]))
+        crops = self.inputs["CropParameters_Crops"].read().values
+        for component_input in self.inputs:
+            if component_input.name.startswith("CropParameters_") and component_input.name != "CropParameters_Crops":
+                if len(component_input.read().values) != len(crops):
+                    problems.append("{} has {} values for {} crops".format(
+                        component_input.name, len(component_input.read().values), len(crops)))
+        if self.inputs["Options_UseVfsMod"].read().values:
+            for crop, lookup_table in zip(crops, self.inputs["CropParameters_VfsModLookupTables"].read().values):
+                if lookup_table != "none" and not os.path.isfile(lookup_table):
+                    problems.append("VfsMOD lookup table {} of crop {} does not exist".format(lookup_table, crop))
+        if problems:
+            raise ValueError("Preflight found {} problems:\n".format(len(problems)) + "\n".join(
+                "- " + problem for problem in problems))
+        self.default_observer.write_message(3, "Preflight found no problems")
+
+    def year_blocks(self):
+        """
+        Splits the simulated period into blocks of calendar years.
+
+        Returns:
+            A list of tuples of the first and the last date of each block. The list contains the entire simulated
+            period as single block if year blocks are disabled.
+        """
+        simulation_start = self.inputs["Options_StartDate"].read().values
+        simulation_end = self.inputs["Options_EndDate"].read().values
+        block_length = self.inputs["Options_YearBlockLength"].read().values
+        if block_length <= 0:
+            return [(simulation_start, simulation_end)]
+        return [
+            (max(datetime.date(year, 1, 1), simulation_start),
+             min(datetime.date(year + block_length - 1, 12, 31), simulation_end))
+            for year in range(simulation_start.year, simulation_end.year + 1, block_length)
+        ]
+
+    def plan_work_units(self, processing_path, simulated):
+        """
+        Splits the simulation into work units. Fields are distributed by descending number of applications, so
+        that work units simulate similar numbers of applications, and the simulated period is split into year blocks
+        with a preceding warm-up. A year block only simulates the applications within its warm-up and its years.
+
+        Args:
+            processing_path: The working directory of the module.
+            simulated: A boolean array that indicates for each application whether it is simulated by the module.
+
+        Returns:
+            A list of tuples of a work unit and a boolean array that indicates for each application whether the work
+            unit simulates it. The list is empty if the module runs as a single local process.
+        """
+        applied_fields = self.inputs["Ppm_AppliedFields"].read().values
+        application_dates = self.inputs["Ppm_ApplicationDates"].read().values
+        simulation_start = self.inputs["Options_StartDate"].read().values
+        simulation_end = self.inputs["Options_EndDate"].read().values
+        warm_up = self.inputs["Options_YearBlockWarmUp"].read().values
+        year_blocks = self.year_blocks()
+        fields, applications = np.unique(applied_fields[simulated], return_counts=True)
+        unit_count = min(self.inputs["Options_WorkUnits"].read().values, fields.size)
+        if len(year_blocks) > 1:
+            unit_count = max(unit_count, min(1, fields.size))
+            if self.inputs["Options_YearBlockValidation"].read().values:
+                # the serial reference spans the entire period without warm-up
+                year_blocks.append(None)
+        if unit_count == 0:
+            return []
+        run_name = hashlib.sha256(os.path.abspath(processing_path).encode()).hexdigest()[:16]
+        temporary_output_path = self.inputs["Options_TemporaryOutputPath"].read().values
+        work_units = []
+        for i in range(unit_count):
+            unit_fields = fields[np.argsort(-applications, kind="stable")[i::unit_count]]
+            for j, year_block in enumerate(year_blocks):
+                unit_name = "{}_{}".format(unit_count, i)
+                if year_block is None:
+                    unit_name += "_serial"
+                    year_block = simulation_start, simulation_end
+                    window_start = simulation_start
+                elif len(year_blocks) > 1:
+                    unit_name += "_{}".format(year_block[0].year)
+                    window_start = max(year_block[0] - datetime.timedelta(warm_up), simulation_start)
                 else:
-                    input_raster[day_string] = [raster]
-        for day, raster_inputs in input_raster.items():
-            runoff_day = int(day)
-            exposure = np.zeros((raster_rows, raster_cols, 1))
-            data_slice = (slice(0, raster_rows), slice(0, raster_cols), slice(runoff_day, runoff_day + 1))
-            for raster in raster_inputs:
-                exposure_raster = gdal.Open(raster, 0)
-                exposure_raster_band = exposure_raster.GetRasterBand(1)
-                exposure_array = exposure_raster_band.ReadAsArray().clip(0)
-                del exposure_raster
-                exposure_array.shape += (1,)
-                exposure += exposure_array
-            self.outputs["Exposure"].set_values(exposure, slices=data_slice, create=False, calculate_max=True)
+                    window_start = year_block[0]
+                unit_simulated = simulated & np.isin(applied_fields, unit_fields) & (
+                    application_dates >= window_start.toordinal()) & (application_dates <= year_block[1].toordinal())
+                if not unit_simulated.any():
+                    continue
+                unit_path = os.path.join(processing_path, "work_units", unit_name)
+                input_path = os.path.join(unit_path, "input")
+                output_folder = os.path.join(unit_path, "przm")
+                przm_config = os.path.join(input_path, "parameters.xml")
+                work_unit = WorkUnit(
+                    "{}/{}".format(run_name, unit_name),
+                    input_path,
+                    output_folder,
+                    os.path.join(temporary_output_path, str(i * len(year_blocks) + j)),
+                    os.path.join(unit_path, "module.log"),
+                    (
+                        self._przm_command + ("-ifile", przm_config, output_folder),
+                        self._hydro_filter_command + ("-ifile", przm_config, output_folder)
+                    ),
+                    (window_start, year_block[1]),
+                    (year_block[0] - window_start).days,
+                    unit_name.endswith("_serial"),
+                    tuple(str(field) for field in np.unique(applied_fields[unit_simulated]))
+                )
+                work_units.append((work_unit, unit_simulated))
+        return work_units
 
-    def write_configuration_xml(self, ppp_repository, cropping_calendar, ppm_calendar, crop_parameterization,
-                                field_discrete, field_parameters, flow_grid, przm_weather, output_file):
+    def create_executor(self):
         """
-        Writes the input parameterization for the module.
+        Creates the executor of work units. An executor provides a `submit` method that accepts a list of work units
+        and a `statuses` method that returns a dictionary of the status and the last return code per work unit name.
+        Subclasses may override this method to execute work units through other backends.
+
+        Returns:
+            The executor.
+        """
+        queue_file = self.inputs["Options_WorkQueue"].read().values
+        return WorkQueue(queue_file or os.path.join(self.inputs["ProcessingPath"].read().values, "work_queue.sqlite"))
+
+    def run_work_units(self, work_units, przm_folder, manifest, disk_usage=None):
+        """
+        Runs the module as work units through the executor and gathers their outputs in the module output folder.
 
         Args:
-            ppp_repository: The file path of the PPP repository.
-            cropping_calendar: The file path of the cropping calendar.
-            ppm_calendar: The file path of the PPM calendar.
-            crop_parameterization: The file path of the crop parameterization.
-            field_discrete: The file path of the fields.
-            field_parameters: The file path of the field parameters.
-            flow_grid: The file path of the flow grid.
-            przm_weather: The file path of the weather.
-            output_file: The file path of the module output.
+            work_units: The work units of the run.
+            przm_folder: The output folder of the module.
+            manifest: The manifest of the run, which is used to skip work units that already completed.
+            disk_usage: The disk usage of the run, or `None` to not track it.
 
         Returns:
             Nothing.
         """
-        parameters = xml.etree.ElementTree.Element("parameters")
-        model = xml.etree.ElementTree.SubElement(parameters, "model")
-        henry_constant = self.inputs["Substance_HenryConstant"].read().values
-        xml.etree.ElementTree.SubElement(model, "adsorption_method").text = {
-            "linear": "1", "Freundlich": "2", "aged": "3"}[self.inputs["Model_AdsorptionMethod"].read().values]
-        xml.etree.ElementTree.SubElement(model, "soil_temperature_simulation").text = "2" if self.inputs[
-            "Model_SoilTemperatureSimulation"].read().values else "0"
-        substances = xml.etree.ElementTree.SubElement(parameters, "substances")
-        substance = xml.etree.ElementTree.SubElement(
-            substances, "substance", {"name": self.inputs["SubstanceName"].read().values})
-        xml.etree.ElementTree.SubElement(substance, "plant_uptake_factor").text = str(self.inputs[
-            "Substance_PlantUptakeFactor"].read().values)
-        xml.etree.ElementTree.SubElement(substance, "pesticide_dissipation_rate_of_foliage").text = str(self.inputs[
-            "Substance_PesticideDissipationRateOfFoliage"].read().values)
-        xml.etree.ElementTree.SubElement(substance, "foliar_wash_off_coefficient").text = str(self.inputs[
-            "Substance_FoliarWashOffCoefficient"].read().values)
-        if not math.isnan(henry_constant):
-            xml.etree.ElementTree.SubElement(substance, "henry_constant").text = str(henry_constant)
-        xml.etree.ElementTree.SubElement(substance, "vapour_pressure").text = str(self.inputs[
-            "Substance_VapourPressure"].read().values)
-        xml.etree.ElementTree.SubElement(substance, "molecular_weight").text = str(self.inputs[
-            "Substance_MolecularWeight"].read().values)
-        xml.etree.ElementTree.SubElement(substance, "water_solubility").text = str(self.inputs[
-            "Substance_WaterSolubility"].read().values)
-        xml.etree.ElementTree.SubElement(substance, "temperature_at_which_measured").text = str(self.inputs[
-            "Substance_TemperatureAtWhichMeasured"].read().values)
-        xml.etree.ElementTree.SubElement(substance, "freundlich_exponent").text = str(self.inputs[
-            "Substance_FreundlichExponent"].read().values)
-        xml.etree.ElementTree.SubElement(substance, "reference_moisture_for_dt50_soil").text = str(self.inputs[
-            "Substance_ReferenceMoistureForDT50Soil"].read().values)
-        xml.etree.ElementTree.SubElement(substance, "soil_dt50").text = str(
-            self.inputs["Substance_SoilDT50"].read().values)
-        xml.etree.ElementTree.SubElement(substance, "koc_soil").text = str(
-            self.inputs["Substance_KocSoil"].read().values)
-        ppp = xml.etree.ElementTree.SubElement(parameters, "ppp")
-        xml.etree.ElementTree.SubElement(ppp, "ppp_repository").text = ppp_repository
-        cropping = xml.etree.ElementTree.SubElement(parameters, "cropping")
-        xml.etree.ElementTree.SubElement(cropping, "cropping_calendar").text = cropping_calendar
-        xml.etree.ElementTree.SubElement(cropping, "ppm_calendar").text = ppm_calendar
-        chemical_application_methods = xml.etree.ElementTree.SubElement(cropping, "chemical_application_methods")
-        chemical_application_method_spray_application = xml.etree.ElementTree.SubElement(
-            chemical_application_methods, "chemical_application_method", {"name": "SprayApplication"})
-        xml.etree.ElementTree.SubElement(
-            chemical_application_method_spray_application, "przm_application_method").text = {
-            "soil": "0",
-            "canopy": "1",
-            "foliar": "2"}[
-            self.inputs["SprayApplication_PrzmApplicationMethod"].read().values]
-        xml.etree.ElementTree.SubElement(
-            chemical_application_method_spray_application, "incorporation_depth").text = str(
-            self.inputs["SprayApplication_IncorporationDepth"].read().values)
-        # noinspection SpellCheckingInspection
-        xml.etree.ElementTree.SubElement(cropping, "crop_parameterisation").text = crop_parameterization
-        landscape = xml.etree.ElementTree.SubElement(parameters, "landscape")
-        # noinspection SpellCheckingInspection
-        xml.etree.ElementTree.SubElement(landscape, "field_discretisation").text = field_discrete
-        xml.etree.ElementTree.SubElement(landscape, "parameters_as_xml").text = field_parameters
-        xml.etree.ElementTree.SubElement(landscape, "flow").text = flow_grid
-        weather = xml.etree.ElementTree.SubElement(parameters, "weather")
-        xml.etree.ElementTree.SubElement(weather, "przm_weather_file").text = przm_weather
-        options = xml.etree.ElementTree.SubElement(parameters, "options")
-        simulation_end = self.inputs["Options_EndDate"].read().values
-        xml.etree.ElementTree.SubElement(options, "start_date").text = str(
-            self.convert_to_przm_date(self.inputs["Options_StartDate"].read().values, simulation_end))
-        xml.etree.ElementTree.SubElement(options, "end_date").text = str(
-            self.convert_to_przm_date(simulation_end, simulation_end))
-        xml.etree.ElementTree.SubElement(options, "temporary_output_path").text = self.inputs[
-            "Options_TemporaryOutputPath"].read().values
-        xml.etree.ElementTree.SubElement(options, "delete_temporary_grids").text = "1" if self.inputs[
-            "Options_DeleteTemporaryGrids"].read().values else "0"
-        xml.etree.ElementTree.SubElement(options, "TimeoutSecPRZM").text = str(
-            self.inputs["Options_TimeoutSecPrzm"].read().values)
+        if manifest.completed("work units"):
+            return
+        if disk_usage:
+            disk_usage.enforce("Work units")
+        executor = self.create_executor()
+        # work units of an interrupted run are resubmitted unless they already completed
+        executor.submit(
+            [work_unit for work_unit in work_units
+             if not os.path.exists(os.path.join(work_unit.output_folder, "successful.txt"))])
+        local_workers = self.inputs["Options_LocalWorkers"].read().values
+        if local_workers == 0:
+            self.default_observer.write_message(3, "Waiting for workers to execute {} work units".format(
+                len(work_units)))
+        interval = self.inputs["Options_ProgressInterval"].read().values
+        start = time.monotonic()
+        last_report = start
+        workers = []
+        try:
+            while True:
+                # work units that are not queued completed in an earlier attempt
+                statuses = executor.statuses([work_unit.name for work_unit in work_units])
+                completed = sum(
+                    1 for work_unit in work_units if statuses.get(work_unit.name, ("done", None))[0] == "done")
+                if completed == len(work_units):
+                    break
+                for worker in workers:
+                    if worker.poll() not in (None, 0):
+                        raise Exception("Local worker exited with code {}".format(worker.returncode))
+                workers = [worker for worker in workers if worker.poll() is None]
+                pending = sum(1 for status, _ in statuses.values() if status == "pending")
+                if len(workers) < min(local_workers, pending):
+                    workers += [self.start_local_worker(executor) for _ in range(
+                        min(local_workers, pending) - len(workers))]
+                now = time.monotonic()
+                if now - last_report >= interval:
+                    last_report = now
+                    self.default_observer.write_message(
+                        3, "Work unit progress: {}/{} completed, {} running, {:.0f}s elapsed".format(
+                            completed,
+                            len(work_units),
+                            sum(1 for status, _ in statuses.values() if status == "running"),
+                            now - start))
+                time.sleep(1)
+        except BaseException:
+            for worker in workers:
+                worker.terminate()
+            raise
+        for worker in workers:
+            worker.wait()
+        for work_unit in work_units:
+            if not os.path.exists(os.path.join(work_unit.output_folder, "successful.txt")):
+                raise Exception("Work unit {} was not successful (return code {}), see {}".format(
+                    work_unit.name, statuses.get(work_unit.name, ("done", None))[1], work_unit.log_file))
+        simulation_start = self.inputs["Options_StartDate"].read().values
+        for work_unit in work_units:
+            if work_unit.reference:
+                continue
+            day_offset = (work_unit.window[0] - simulation_start).days
+            if day_offset == 0 and work_unit.warm_up_days == 0:
+                # only the field folders of the work unit are gathered, other files of the module stay in place
+                for field in work_unit.fields:
+                    source = os.path.join(work_unit.output_folder, field)
+                    if not os.path.isdir(source):
+                        # the field folder was gathered before the run was interrupted
+                        continue
+                    destination = os.path.join(przm_folder, field)
+                    if os.path.exists(destination):
+                        raise Exception("Cannot gather field {} of work unit {}, {} already exists".format(
+                            field, work_unit.name, destination))
+                    os.replace(source, destination)
+            else:
+                self.gather_year_block(work_unit, przm_folder, day_offset)
+        manifest.complete("work units")
+        if disk_usage:
+            for level, message in disk_usage.account("Work units"):
+                self.default_observer.write_message(level, message)
+
+    @staticmethod
+    def gather_year_block(work_unit, przm_folder, day_offset):
+        """
+        Moves the field folders of a year block into a sub-folder of the module output folder. Exposure rasters are
+        renamed to the days of the entire simulated period and rasters of the warm-up are discarded. Files are moved
+        one by one, so that an interrupted gathering can be continued.
+
+        Args:
+            work_unit: The work unit of the year block.
+            przm_folder: The output folder of the module.
+            day_offset: The number of days between the simulation start and the first date simulated by the block.
+
+        Returns:
+            Nothing.
+        """
+        block_folder = year_block_folder(work_unit, przm_folder)
+        for field in work_unit.fields:
+            for directory, _, files in os.walk(os.path.join(work_unit.output_folder, field)):
+                destination = os.path.join(block_folder, os.path.relpath(directory, work_unit.output_folder))
+                os.makedirs(destination, exist_ok=True)
+                for file in files:
+                    source = os.path.join(directory, file)
+                    day_string = file[-9:-4]
+                    if os.path.basename(directory) == "output" and file.endswith(".tif") and day_string.isdigit():
+                        if int(day_string) < work_unit.warm_up_days:
+                            os.remove(source)
+                            continue
+                        file = "{}{:05d}.tif".format(file[:-9], int(day_string) + day_offset)
+                    os.replace(source, os.path.join(destination, file))
+
+    def report_year_block_deviation(self, work_units, fields, output_index):
+        """
+        Reports the difference in deposited mass between the year blocks and the serial reference simulation.
+
+        Args:
+            work_units: The work units of the run.
+            fields: The identifiers of the fields whose module outputs are indexed.
+            output_index: The index of the gathered module outputs of the year blocks.
+
+        Returns:
+            Nothing.
+        """
+        simulation_start = self.inputs["Options_StartDate"].read().values
+        days = (self.inputs["Options_EndDate"].read().values - simulation_start).days + 1
+        block_mass = output_index.daily_mass(days)
+        reference_index = ModuleOutputIndex.build(
+            [(field, os.path.join(work_unit.output_folder, field, "output"))
+             for work_unit in work_units if work_unit.reference for field in fields])
+        serial_mass = reference_index.daily_mass(days)
+        deviation = block_mass - serial_mass
+        day = int(np.argmax(np.abs(deviation)))
+        self.default_observer.write_message(
+            3, "Year blocks deposit {:.6g} g compared to {:.6g} g of the serial simulation ({:+.4%}), the largest "
+               "daily difference is {:+.6g} g at {}".format(
+                block_mass.sum(),
+                serial_mass.sum(),
+                deviation.sum() / serial_mass.sum() if serial_mass.sum() > 0 else 0,
+                deviation[day],
+                simulation_start + datetime.timedelta(day)))
+
+    @staticmethod
+    def start_local_worker(executor):
+        """
+        Starts a worker process on the local node that exits once the work queue holds no more work.
+
+        Args:
+            executor: The work queue that the worker serves.
+
+        Returns:
+            The worker process.
+        """
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        return subprocess.Popen(
+            (sys.executable, os.path.abspath(__file__), executor.database_file, "--exit-when-empty"),
+            env=environment,
+            stdout=subprocess.DEVNULL
+        )
+
+    def module_input_path(self, processing_path):
+        """
+        Determines the directory in which the module inputs are prepared.
+
+        Args:
+            processing_path: The working directory of the module.
+
+        Returns:
+            The directory path of the module inputs.
+        """
+        staging_path = self.inputs["Options_StagingPath"].read().values
+        if not staging_path:
+            return processing_path
+        return os.path.join(
+            staging_path, "RunOffPrzm_" + hashlib.sha256(os.path.abspath(processing_path).encode()).hexdigest()[:16])
+
+    async def wait_for_disk_space(self, disk_usage, stage):
+        """
+        Waits until the scratch volume has enough free space for the remaining disk budget of a run. Concurrently
+        running components free disk space while merging if they delete merged rasters or once they complete.
+
+        Args:
+            disk_usage: The disk usage of the run.
+            stage: The name of the stage that waits for free space.
+
+        Returns:
+            Nothing.
+        """
+        interval = self.inputs["Options_ProgressInterval"].read().values
+        missing = disk_usage.free_space_missing()
+        if missing > 0:
+            self.default_observer.write_message(
+                3, "Waiting for {:.0f} MB of free space before starting {}".format(missing / 2 ** 20, stage))
+            while missing > 0:
+                await asyncio.sleep(interval)
+                missing = disk_usage.free_space_missing()
+            self.default_observer.write_message(3, "Sufficient free space available, starting " + stage)
+
+    def finish_run(self, state):
+        """
+        Provides the outputs of a run after the module executables completed.
+
+        Args:
+            state: The state of the run.
+
+        Returns:
+            Nothing.
+        """
+        if state.input_path != state.processing_path:
+            shutil.rmtree(state.input_path, ignore_errors=True)
+        if not state.manifest.completed("previous run reused"):
+            previous_przm_folder = os.path.join(self.inputs["Options_PreviousRun"].read().values, "przm")
+            for field in state.reused_fields:
+                shutil.copytree(os.path.join(previous_przm_folder, field), os.path.join(state.przm_folder, field),
+                                copy_function=link_or_copy, dirs_exist_ok=True)
+            state.manifest.complete("previous run reused")
+        field_fingerprints = state.fingerprints[1]
+        output_index = self.index_module_output(state)
+        if output_index.archive_file or len(self.year_blocks()) > 1:
+            # fields without module outputs, or with outputs split into year blocks, cannot be reused by incremental
+            # runs
+            field_fingerprints = {}
+        if any(work_unit.reference for work_unit in state.work_units):
+            self.report_year_block_deviation(state.work_units, state.fingerprints[1], output_index)
+        if self.inputs["Options_LazyExposure"].read().values:
+            self.serve_exposure_lazily(output_index, state.manifest, state.merge_plan)
+        else:
+            delete_merged = self.inputs["Options_DeleteMergedRasters"].read().values
+            state.disk_usage.enforce("Merging")
+            self.write_exposure(output_index, state.manifest, state.merge_plan, delete_merged)
+            if delete_merged:
+                field_fingerprints = {}
+        for level, message in state.disk_usage.account("Merging"):
+            self.default_observer.write_message(level, message)
+        self.default_observer.write_message(
+            3, "Peak disk usage of the run after a stage: {:.1f} MB".format(state.disk_usage.peak / 2 ** 20))
+        with open(os.path.join(state.processing_path, "field_fingerprints.json"), "w") as f:
+            json.dump({"landscape": state.fingerprints[0], "fields": field_fingerprints}, f)
+
+    def open_run_manifest(self, processing_path, przm_folder):
+        """
+        Opens the manifest that records the completed stages of a run. If resuming is enabled and the processing path
+        contains the manifest of a previous run with the same inputs, the previous manifest is continued.
+
+        Args:
+            processing_path: The working directory of the module.
+            przm_folder: The output folder of the module.
+
+        Returns:
+            The manifest of the run.
+        """
+        manifest_file = os.path.join(processing_path, "run_manifest.json")
+        fingerprint = self.input_fingerprint()
+        if self.inputs["Options_ResumeRun"].read().values and os.path.exists(manifest_file):
+            manifest = RunManifest.load(manifest_file)
+            if manifest.fingerprint != fingerprint:
+                raise ValueError("Cannot resume run in " + processing_path + " because inputs changed")
+            self.default_observer.write_message(
+                3, "Resuming run after stages: " + ", ".join(manifest.stages) +
+                   " and {} merged days".format(len(manifest.merged_days)))
+            return manifest
+        try:
+            os.makedirs(przm_folder)
+        except FileExistsError:
+            raise FileExistsError("Cannot run PRZM in a path that already exists: " + processing_path)
+        return RunManifest(manifest_file, fingerprint)
+
+    def input_fingerprint(self, excluded_inputs=frozenset()):
+        """
+        Calculates a fingerprint of all input values that affect the simulation results.
+
+        Args:
+            excluded_inputs: The names of further inputs that are not considered.
+
+        Returns:
+            The fingerprint as hexadecimal string.
+        """
+        fingerprint = hashlib.sha256()
+        for component_input in self.inputs:
+            if component_input.name not in self.NON_RESULT_INPUTS and component_input.name not in excluded_inputs:
+                fingerprint.update(component_input.name.encode())
+                update_fingerprint(fingerprint, component_input.read().values)
+        flow_grid = os.stat(self.inputs["Fields_FlowGrid"].read().values)
+        update_fingerprint(fingerprint, (flow_grid.st_size, flow_grid.st_mtime_ns))
+        return fingerprint.hexdigest()
+
+    def select_applications(self):
+        """
+        Selects the applications that are simulated by the module according to the configured pruning of applications
+        and fields.
+
+        Returns:
+            A boolean array that indicates for each application whether it is simulated.
+        """
+        applied_fields = self.inputs["Ppm_AppliedFields"].read().values
+        selection = np.ones(len(applied_fields), bool)
+        if self.inputs["Options_PreScreenApplications"].read().values:
+            selection &= self.pre_screen_applications()
+            self.default_observer.write_message(
+                3, "Pre-screening excluded {} of {} applications".format(
+                    len(selection) - np.count_nonzero(selection), len(selection)))
+        if self.inputs["Options_PruneUnreachableFields"].read().values:
+            pre_selection = np.count_nonzero(selection)
+            selection &= self.reachable_applications(selection)
+            self.default_observer.write_message(
+                3, "Flow path analysis excluded {} of {} applications".format(
+                    pre_selection - np.count_nonzero(selection), pre_selection))
+        if not selection.all():
+            all_fields = set(applied_fields)
+            excluded_fields = all_fields - set(applied_fields[selection])
+            self.default_observer.write_message(
+                3, "Excluded {} of {} applications and {} of {} fields, saving an estimated {:.0%} of the module run "
+                   "time".format(
+                    len(selection) - np.count_nonzero(selection), len(selection), len(excluded_fields),
+                    len(all_fields), len(excluded_fields) / len(all_fields)))
+            if excluded_fields:
+                self.default_observer.write_message(
+                    3, "Excluded fields: " + ", ".join(str(field) for field in sorted(excluded_fields)))
+        return selection
+
+    def pre_screen_applications(self):
+        """
+        Pre-screens applications for run-off above the reporting threshold. The applied mass is a conservative bound
+        of the mass available for run-off that only decreases by degradation, and an application is kept if a day with
+        precipitation above the pre-screening threshold occurs while this bound is not below the reporting threshold.
+
+        Returns:
+            A boolean array that indicates for each application whether it can result in reportable run-off.
+        """
+        simulation_start = self.inputs["Options_StartDate"].read().values
+        precipitation = self.inputs["Weather_Precipitation"].read().values
+        precipitation_threshold = self.inputs["Options_PreScreenPrecipitationThreshold"].read().values
+        reporting_threshold = self.inputs["Options_ReportingThreshold"].read().values
+        soil_dt50 = self.inputs["Substance_SoilDT50"].read().values
+        application_days = self.inputs["Ppm_ApplicationDates"].read().values - simulation_start.toordinal()
+        application_rates = self.inputs["Ppm_ApplicationRates"].read().values
+        applied_areas = np.array(
+            [ogr.CreateGeometryFromWkb(area).GetArea() for area in self.inputs["Ppm_AppliedAreas"].read().values])
+        # g/ha * m² / 10000 m²/ha * 1000 mg/g
+        applied_mass = application_rates * applied_areas / 10
+        reportable = applied_mass >= reporting_threshold
+        with np.errstate(divide="ignore", invalid="ignore"):
+            horizon = soil_dt50 * np.log2(applied_mass / reporting_threshold)
+        horizon = np.nan_to_num(horizon, nan=0, posinf=len(precipitation), neginf=0)
+        first_day = np.clip(application_days, 0, len(precipitation))
+        last_day = np.clip(application_days + np.floor(np.clip(horizon, 0, len(precipitation))) + 1, 0,
+                           len(precipitation)).astype(int)
+        rain_days = np.concatenate(((0,), np.cumsum(precipitation > precipitation_threshold)))
+        return reportable & (last_day > first_day) & (rain_days[last_day] > rain_days[first_day])
+
+    def reachable_applications(self, selection):
+        """
+        Determines the applications onto fields whose run-off can reach cells outside treated fields within the
+        landscape. Fields are repeatedly analyzed against the remaining fields, as excluding a field makes its cells
+        available for the deposition of run-off from other fields.
+
+        Args:
+            selection: A boolean array that indicates for each application whether it is simulated.
+
+        Returns:
+            A boolean array that indicates for each application whether its field can deposit run-off.
+        """
+        applied_fields = self.inputs["Ppm_AppliedFields"].read().values
+        extent = self.inputs["Fields_Extent"].read().values
+        raster_cols = int(round(extent[1] - extent[0]))
+        raster_rows = int(round(extent[3] - extent[2]))
+        flow_grid_data_set = gdal.Open(self.inputs["Fields_FlowGrid"].read().values, 0)
+        flow_directions = flow_grid_data_set.GetRasterBand(1).ReadAsArray()
+        del flow_grid_data_set
+        if flow_directions.shape != (raster_rows, raster_cols):
+            self.default_observer.write_message(
+                2, "Flow grid does not match the Fields_Extent, skipping the flow path analysis")
+            return np.ones(len(applied_fields), bool)
+        remaining_fields = set(applied_fields[selection])
+        field_raster = self.field_raster(remaining_fields, 65535)
+        while True:
+            reachable_fields = reaching_fields(field_raster, flow_directions, remaining_fields)
+            if reachable_fields == remaining_fields:
+                break
+            remaining_fields = reachable_fields
+        return np.isin(applied_fields, list(remaining_fields))
+
+    def field_fingerprints(self, selection):
+        """
+        Calculates the fingerprints that decide which module results of a previous run can be reused.
+
+        Args:
+            selection: A boolean array that indicates for each application whether it is simulated.
+
+        Returns:
+            A tuple of the fingerprint of all inputs that apply to the entire landscape, except for inputs that locate
+            the files of the run, and a dictionary of fingerprints of the geometry and the applications per field.
+        """
+        applied_fields = self.inputs["Ppm_AppliedFields"].read().values
+        application_dates = self.inputs["Ppm_ApplicationDates"].read().values
+        application_rates = self.inputs["Ppm_ApplicationRates"].read().values
+        applied_areas = self.inputs["Ppm_AppliedAreas"].read().values
+        field_geometries = dict(zip(
+            self.inputs["Fields_Ids"].read().values, self.inputs["Fields_Geometries"].read().values))
+        fields = {}
+        for field in set(applied_fields[selection]):
+            fingerprint = hashlib.sha256()
+            update_fingerprint(fingerprint, field_geometries.get(field))
+            for i in np.flatnonzero(selection & (applied_fields == field)):
+                update_fingerprint(fingerprint, (application_dates[i], application_rates[i], applied_areas[i]))
+            fields[str(field)] = fingerprint.hexdigest()
+        return self.input_fingerprint(self.FIELD_INPUTS | self.RUN_LOCAL_INPUTS), fields
+
+    def plan_incremental_run(self, selection, fingerprints):
+        """
+        Determines which fields have to be simulated and which module results can be reused from a previous run.
+
+        Args:
+            selection: A boolean array that indicates for each application whether it is simulated.
+            fingerprints: The fingerprints of the landscape-wide inputs and of the individual fields.
+
+        Returns:
+            A tuple of a boolean array that indicates for each application whether it is passed to the module and the
+            set of fields whose module results are reused.
+        """
+        previous_run = self.inputs["Options_PreviousRun"].read().values
+        if not previous_run:
+            return selection, set()
+        try:
+            with open(os.path.join(previous_run, "field_fingerprints.json")) as f:
+                previous_fingerprints = json.load(f)
+        except FileNotFoundError:
+            self.default_observer.write_message(
+                2, "Cannot reuse " + previous_run + " because it is not a completed run, simulating all fields")
+            return selection, set()
+        if previous_fingerprints["landscape"] != fingerprints[0]:
+            self.default_observer.write_message(
+                2, "Cannot reuse " + previous_run + " because landscape-wide inputs changed, simulating all fields")
+            return selection, set()
+        applied_fields = self.inputs["Ppm_AppliedFields"].read().values
+        flow_grid_data_set = gdal.Open(self.inputs["Fields_FlowGrid"].read().values, 0)
+        flow_directions = flow_grid_data_set.GetRasterBand(1).ReadAsArray()
+        del flow_grid_data_set
+        previous_fields_data_set = gdal.Open(os.path.join(previous_run, "landscape_fields.tif"), 0)
+        previous_fields = previous_fields_data_set.GetRasterBand(1).ReadAsArray()
+        del previous_fields_data_set
+        current_fields = self.field_raster(set(applied_fields[selection]))
+        changed_fields = {
+            field for field, fingerprint in fingerprints[1].items()
+            if previous_fingerprints["fields"].get(field) != fingerprint
+        }
+        # run-off passing cells whose field assignment changed is routed differently
+        changed_cells = previous_fields != current_fields
+        if changed_cells.any():
+            changed_fields.update(
+                str(field) for field in np.unique(current_fields[upstream_cells(changed_cells, flow_directions)]))
+        # only fields for which the HydroFilter stage wrote an output folder completed in the previous run
+        reused_fields = {
+            field for field in fingerprints[1]
+            if field not in changed_fields and os.path.isdir(os.path.join(previous_run, "przm", field, "output"))
+        }
+        self.default_observer.write_message(
+            3, "Reusing module results of {} of {} fields from {}".format(
+                len(reused_fields), len(fingerprints[1]), previous_run))
+        return selection & ~np.isin(applied_fields.astype(str), list(reused_fields)), reused_fields
+
+    def write_module_inputs(self, input_path, simulated, temporary_output_path=None, window=None):
+        """
+        Prepares all module inputs. The field raster, the field parameters and the cropping calendar all cover the
+        fields that the module simulates.
+
+        Args:
+            input_path: The directory in which the module inputs are prepared.
+            simulated: A boolean array that indicates for each application whether it is simulated by the module.
+            temporary_output_path: The temporary output path of the module, or `None` to use the
+                `Options_TemporaryOutputPath`.
+            window: A tuple of the first and the last date simulated by the module, or `None` to simulate the entire
+                period.
+
+        Returns:
+            The file path of the module parameterization.
+        """
+        source_flow_grid = self._inputs["Fields_FlowGrid"].read().values
+        przm_config = os.path.join(input_path, "parameters.xml")
+        ppp_repository = os.path.join(input_path, "PPP.xml")
+        cropping_statistic_przm = os.path.join(input_path, "CroppingStatistics_PRZM.xml")
+        ppm_calendar_przm = os.path.join(input_path, "PPM_CALENDAR_PRZM.xml")
+        crop_parameterization = os.path.join(input_path, "CropParameters.xml")
+        run_off_field_discrete = os.path.join(input_path, "Fields.tif")
+        run_off_field_parameters = os.path.join(input_path, "field_parameterization.xml")
+        flow_grid = os.path.join(input_path, "flow.tif")
         # noinspection SpellCheckingInspection
-        xml.etree.ElementTree.SubElement(options, "reporting_threashold").text = str(
-            self.inputs["Options_ReportingThreshold"].read().values)
-        xml.etree.ElementTree.SubElement(options, "method_of_runoff_generation").text = {
-            "PRZM": "1", "FOCUS": "0"}[self.inputs["Options_MethodOfRunoffGeneration"].read().values]
-        xml.etree.ElementTree.SubElement(options, "delete_all_interim_results").text = "1" if self.inputs[
-            "Options_DeleteAllInterimResults"].read().values else "0"
+        przm_weather = os.path.join(input_path, "focusprzm_weather.met")
         # noinspection SpellCheckingInspection
-        xml.etree.ElementTree.SubElement(options, "show_extended_error_infos").text = "1" if self.inputs[
-            "Options_ShowExtendedErrorInformation"].read().values else "0"
+        applied_areas_path = os.path.join(input_path, "appl")
+        shutil.copyfile(source_flow_grid, flow_grid)
+        self.write_configuration_xml(ppp_repository,
+                                     cropping_statistic_przm,
+                                     ppm_calendar_przm,
+                                     crop_parameterization,
+                                     run_off_field_discrete,
+                                     run_off_field_parameters,
+                                     flow_grid,
+                                     przm_weather,
+                                     przm_config,
+                                     temporary_output_path,
+                                     window)
+        self.write_przm_weather_file(przm_weather, window)
+        self.write_field_parameters_file(run_off_field_parameters, simulated)
+        self.write_field_raster(run_off_field_discrete, simulated)
+        self.write_cropping_statistics(cropping_statistic_przm, simulated)
+        self.write_ppp_repository(ppp_repository)
+        spatial_info = self.collect_spatial_application_info(simulated)
+        self.write_ppm_calendar(ppm_calendar_przm, applied_areas_path, spatial_info[0], simulated, window)
+        self.write_applied_area_raster(applied_areas_path, spatial_info[1])
+        self.write_crop_parameters(crop_parameterization)
+        return przm_config
+
+    def run_module(self, przm_config, przm_folder, processing_path, manifest, selection, disk_usage=None):
+        """
+        Runs the PRZM and the HydroFilter executables of the module.
+
+        Args:
+            przm_config: The file path of the module parameterization.
+            przm_folder: The output folder of the module.
+            processing_path: The working directory of the module.
+            manifest: The manifest of the run, which is used to skip stages that already completed.
+            selection: A boolean array that indicates for each application whether it is simulated.
+            disk_usage: The disk usage of the run, or `None` to not track it.
+
+        Returns:
+            Nothing.
+        """
+        for stage, command, total_fields in self.module_stages(przm_config, przm_folder, manifest, selection):
+            if disk_usage:
+                disk_usage.enforce(stage)
+            self.run_module_process(command, processing_path, przm_folder, stage, total_fields)
+            self.complete_module_stage(stage, przm_folder, manifest, disk_usage)
+
+    def module_stages(self, przm_config, przm_folder, manifest, selection):
+        """
+        Determines the module stages that still have to run.
+
+        Args:
+            przm_config: The file path of the module parameterization.
+            przm_folder: The output folder of the module.
+            manifest: The manifest of the run, which is used to skip stages that already completed.
+            selection: A boolean array that indicates for each application whether it is simulated.
+
+        Returns:
+            A list of tuples of the stage name, the command line of the executable and the number of simulated fields.
+        """
+        total_fields = len(set(self.inputs["Ppm_AppliedFields"].read().values[selection]))
+        if total_fields == 0:
+            self.default_observer.write_message(3, "No applications left to simulate, skipping module run")
+            return []
         # noinspection SpellCheckingInspection
-        xml.etree.ElementTree.SubElement(options, "use_presimulated_przm_results").text = "1" if self.inputs[
-            "Options_UsePreSimulatedPrzmResults"].read().values else "0"
-        xml.etree.ElementTree.SubElement(options, "use_one_przm_model_per_grid_cell").text = "1" if self.inputs[
-            "Options_UseOnePrzmModelPerGridCell"].read().values else "0"
-        xml.etree.ElementTree.SubElement(options, "use_vfs_mod").text = "1" if self.inputs[
-            "Options_UseVfsMod"].read().values else "0"
-        xml.etree.ElementTree.ElementTree(parameters).write(output_file, encoding="utf-8", xml_declaration=True)
+        stages = (
+            ("PRZM", self._przm_command + ("-ifile", przm_config, przm_folder)),
+            ("HydroFilter", self._hydro_filter_command + ("-ifile", przm_config, przm_folder))
+        )
+        return [(stage, command, total_fields) for stage, command in stages if not manifest.completed(stage)]
+
+    def complete_module_stage(self, stage, przm_folder, manifest, disk_usage=None):
+        """
+        Checks the outcome of a module stage and records it as completed.
+
+        Args:
+            stage: The name of the module stage.
+            przm_folder: The output folder of the module.
+            manifest: The manifest of the run.
+            disk_usage: The disk usage of the run, or `None` to not track it.
+
+        Returns:
+            Nothing.
+        """
+        if stage == "HydroFilter" and not os.path.exists(os.path.join(przm_folder, "successful.txt")):
+            raise Exception("Run-off run was not successful")
+        manifest.complete(stage)
+        if disk_usage:
+            for level, message in disk_usage.account(stage):
+                self.default_observer.write_message(level, message)
+
+    def run_module_process(self, command, processing_path, przm_folder, stage, total_fields):
+        """
+        Runs a module executable and reports its progress to the default observer. The console output of the
+        executable is additionally appended to the `module.log` in the working directory.
+
+        Args:
+            command: The command line of the executable.
+            processing_path: The working directory of the module.
+            przm_folder: The output folder of the module.
+            stage: The name of the module stage used in progress reports.
+            total_fields: The number of fields that the module simulates.
+
+        Returns:
+            Nothing.
+        """
+        monitor = ProgressMonitor(
+            stage,
+            przm_folder,
+            total_fields,
+            self.inputs["Options_ProgressInterval"].read().values,
+            self.inputs["Options_StallWarningTime"].read().values
+        )
+        process = subprocess.Popen(
+            command,
+            cwd=processing_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            errors="replace"
+        )
+        lines = queue.Queue()
+
+        def read_lines():
+            for output_line in process.stdout:
+                lines.put(output_line)
+
+        reader = threading.Thread(target=read_lines, daemon=True)
+        reader.start()
+        log_file = os.path.join(processing_path, "module.log")
+        with open(log_file, "a") as log:
+            while True:
+                try:
+                    process.wait(1)
+                except subprocess.TimeoutExpired:
+                    pass
+                while not lines.empty():
+                    line = lines.get().rstrip()
+                    log.write(line + "\n")
+                    self.default_observer.write_message(5, line)
+                    monitor.parse(line)
+                if process.returncode is not None and not reader.is_alive() and lines.empty():
+                    break
+                for level, message in monitor.poll():
+                    self.default_observer.write_message(level, message)
+        for level, message in monitor.poll(final=True):
+            self.default_observer.write_message(level, message)
+        if process.returncode != 0:
+            raise Exception("{} run failed with return code {}, see {}".format(stage, process.returncode, log_file))
+
+    async def run_module_process_async(self, command, processing_path, przm_folder, stage, total_fields):
+        """
+        Runs a module executable as asynchronous subprocess and reports its progress to the default observer. The
+        console output of the executable is additionally appended to the `module.log` in the working directory.
+
+        Args:
+            command: The command line of the executable.
+            processing_path: The working directory of the module.
+            przm_folder: The output folder of the module.
+            stage: The name of the module stage used in progress reports.
+            total_fields: The number of fields that the module simulates.
+
+        Returns:
+            Nothing.
+        """
+        monitor = ProgressMonitor(
+            stage,
+            przm_folder,
+            total_fields,
+            self.inputs["Options_ProgressInterval"].read().values,
+            self.inputs["Options_StallWarningTime"].read().values
+        )
+        process = await asyncio.create_subprocess_exec(
+            *command, cwd=processing_path, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        log_file = os.path.join(processing_path, "module.log")
+        with open(log_file, "a") as log:
+            while True:
+                try:
+                    output_line = await asyncio.wait_for(process.stdout.readline(), 1)
+                except asyncio.TimeoutError:
+                    output_line = None
+                if output_line == b"":
+                    break
+                if output_line:
+                    line = output_line.decode(errors="replace").rstrip()
+                    log.write(line + "\n")
+                    self.default_observer.write_message(5, line)
+                    monitor.parse(line)
+                for level, message in monitor.poll():
+                    self.default_observer.write_message(level, message)
+        await process.wait()
+        for level, message in monitor.poll(final=True):
+            self.default_observer.write_message(level, message)
+        if process.returncode != 0:
+            raise Exception("{} run failed with return code {}, see {}".format(stage, process.returncode, log_file))
+
+    def index_module_output(self, state):
+        """
+        Indexes the exposure rasters written by the module and, if enabled, repacks them into a single archive. Only
+        the output folders of the simulated fields are listed, and the index is persisted, so that later stages and
+        resumed runs do not scan the module output folder.
+
+        Args:
+            state: The state of the run.
+
+        Returns:
+            The index of the module outputs.
+        """
+        index_file = os.path.join(state.processing_path, "module_output_index.npz")
+        if state.manifest.completed("module output indexed"):
+            output_index = ModuleOutputIndex.load(index_file)
+        else:
+            folders = [state.przm_folder] + list(dict.fromkeys(
+                year_block_folder(work_unit, state.przm_folder) for work_unit in state.work_units
+                if not work_unit.reference and os.path.isdir(year_block_folder(work_unit, state.przm_folder))))
+            output_index = ModuleOutputIndex.build(
+                [(field, os.path.join(folder, field, "output"))
+                 for folder in folders for field in state.fingerprints[1]],
+                os.path.join(state.processing_path, "module_output.bin")
+                if self.inputs["Options_RepackModuleOutput"].read().values else None
+            )
+            output_index.save(index_file)
+            state.manifest.complete("module output indexed")
+        if output_index.archive_file:
+            # archived rasters are only deleted once the index that refers to the archive is persisted
+            output_index.remove_rasters()
+        self.default_observer.write_message(
+            3, "Indexed {} exposure rasters of {} days{}".format(
+                len(output_index.entries),
+                len(output_index.days()),
+                " in " + output_index.archive_file if output_index.archive_file else ""))
+        return output_index
+
+    def plan_merge(self):
+        """
+        Plans the merging of module outputs into spatial tiles and batches of days that fit into the configured memory
+        limit. Tiles and batches are aligned to the chunks of the `Exposure` output whenever the memory limit allows.
+        Otherwise, tiles are parts of a chunk and the batches span the days of a chunk, so that the chunks can be
+        staged and written once they are complete.
+
+        Returns:
+            The merge plan.
+        """
+        simulation_start = self.inputs["Options_StartDate"].read().values
+        simulation_end = self.inputs["Options_EndDate"].read().values
+        extent = self.inputs["Fields_Extent"].read().values
+        resolution = self.inputs["Options_OutputResolution"].read().values
+        if resolution < 1:
+            raise ValueError("Options_OutputResolution must be at least 1 m")
+        shape = (
+            -(-int(round(extent[3] - extent[2])) // resolution),
+            -(-int(round(extent[1] - extent[0])) // resolution),
+            (simulation_end - simulation_start).days + 1
+        )
+        chunks = self.exposure_chunks(shape)
+        chunk_rows, chunk_cols = min(chunks[0], shape[0]), min(chunks[1], shape[1])
+        memory_limit = self.inputs["Options_MergeMemoryLimit"].read().values * 2 ** 20
+        # the buffer holds a tile for each day of a batch plus the module outputs of a tile at full resolution and,
+        # if outputs are aggregated, their aggregate
+        cells = memory_limit // np.dtype(np.float32).itemsize
+        if self.inputs["Options_ExposureQuantization"].read().values != "none":
+            # quantized exposure additionally requires its codes
+            cells = cells * np.dtype(np.float32).itemsize // (
+                np.dtype(np.float32).itemsize + np.dtype(np.uint16).itemsize)
+        read_depth = resolution ** 2 + (1 if resolution > 1 else 0)
+        depth = min(chunks[2], shape[2]) + read_depth
+        if shape[0] * shape[1] * depth <= cells:
+            tile_rows, tile_cols = shape[0], shape[1]
+        elif cells // depth // shape[1] >= chunk_rows:
+            tile_rows, tile_cols = cells // depth // shape[1] // chunk_rows * chunk_rows, shape[1]
+        elif cells // depth // chunk_rows >= chunk_cols:
+            tile_rows, tile_cols = chunk_rows, cells // depth // chunk_rows // chunk_cols * chunk_cols
+        elif chunk_rows * chunk_cols * (1 + read_depth) <= cells:
+            tile_rows, tile_cols = chunk_rows, chunk_cols
+        else:
+            # tiles within a chunk hold all days of the chunk, so that staged chunks are complete after one batch
+            depth = min(chunks[2], shape[2]) + read_depth
+            if depth > cells:
+                raise ValueError(
+                    "Options_MergeMemoryLimit of {} MB is insufficient: merging requires at least {:.0f} MB".format(
+                        memory_limit // 2 ** 20, math.ceil(depth * np.dtype(np.float32).itemsize / 2 ** 20)))
+            if cells // depth >= chunk_cols:
+                tile_rows, tile_cols = cells // depth // chunk_cols, chunk_cols
+            else:
+                tile_rows, tile_cols = 1, cells // depth
+            return MergePlan(shape, chunks, tile_rows, tile_cols, min(chunks[2], shape[2]), resolution)
+        buffer_days = min(cells // (tile_rows * tile_cols) - read_depth, shape[2])
+        if buffer_days >= chunks[2]:
+            buffer_days -= buffer_days % chunks[2]
+        return MergePlan(shape, chunks, tile_rows, tile_cols, buffer_days, resolution)
+
+    def write_exposure(self, output_index, manifest, merge_plan, delete_merged=False):
+        """
+        Merges the exposure rasters of the module per day and writes them to the `Exposure` output. Only the indexed
+        windows of rasters that contain exposure are read.
+
+        Args:
+            output_index: The index of the module outputs.
+            manifest: The manifest of the run, which is used to skip days that were already merged.
+            merge_plan: The plan of spatial tiles and batches of days for merging.
+            delete_merged: Specifies whether the exposure rasters of a batch are deleted once it is merged.
+
+        Returns:
+            Nothing.
+        """
+        simulation_start = self.inputs["Options_StartDate"].read().values
+        extent = self.inputs["Fields_Extent"].read().values
+        shape, chunks, tile_rows, tile_cols, buffer_days, resolution = merge_plan
+        full_rows, full_cols = int(round(extent[3] - extent[2])), int(round(extent[1] - extent[0]))
+        encoding = StorageEncoding(
+            self.inputs["Options_ExposureThreshold"].read().values,
+            self.inputs["Options_ExposureQuantization"].read().values
+        )
+        if not manifest.completed("Exposure created"):
+            self.create_exposure(merge_plan, encoding)
+            manifest.complete("Exposure created")
+        window_days = max(buffer_days, chunks[2])
+        batches = {}
+        for runoff_day in output_index.days():
+            if runoff_day not in manifest.merged_days:
+                window_start = runoff_day - runoff_day % window_days
+                batch_start = window_start + (runoff_day - window_start) // buffer_days * buffer_days
+                batch_end = min(batch_start + buffer_days, window_start + window_days, shape[2])
+                batches.setdefault((batch_start, batch_end), []).append(runoff_day)
+        summary = DailySummary(
+            os.path.join(self.inputs["ProcessingPath"].read().values, "daily_summary.npz"), shape, resolution)
+        if manifest.merged_days:
+            summary.load(manifest.merged_days)
+        contributions = None
+        if self.inputs["Options_ContributionStore"].read().values:
+            contributions = ContributionStore(
+                os.path.join(self.inputs["ProcessingPath"].read().values, "contributions.sqlite"))
+        scratch_path = self.inputs["Options_ScratchCubePath"].read().values
+        if scratch_path and batches and not manifest.merged_days:
+            self.assemble_exposure(output_index, manifest, merge_plan, encoding, summary, contributions, scratch_path)
+            if delete_merged:
+                output_index.remove_rasters()
+            batches = {}
+        exposure_buffer = np.empty((tile_rows, tile_cols, buffer_days), np.float32)
+        read_buffer = np.empty((tile_rows * resolution + resolution, tile_cols * resolution + resolution), np.float32)
+        aggregate_buffer = np.empty((tile_rows, tile_cols), np.float32)
+        # tiles smaller than a chunk are staged in a memory-mapped file until their chunk is complete
+        block_rows, block_cols = tile_rows, tile_cols
+        staging = None
+        if batches and (tile_rows < min(chunks[0], shape[0]) or tile_cols < min(chunks[1], shape[1])):
+            block_rows, block_cols = min(chunks[0], shape[0]), min(chunks[1], shape[1])
+            staging_file = os.path.join(
+                scratch_path or self.inputs["ProcessingPath"].read().values, "exposure_staging.dat")
+            os.makedirs(os.path.dirname(staging_file), exist_ok=True)
+            staging = np.memmap(
+                staging_file, np.uint16 if encoding.quantized else np.float32, "w+",
+                shape=(block_rows, block_cols, buffer_days))
+        for (batch_start, batch_end), days in sorted(batches.items()):
+            if buffer_days >= chunks[2]:
+                # only write the chunks that actually contain days with run-off
+                first_day = min(days)
+                last_day = max(days)
+                batch_start = first_day - first_day % chunks[2]
+                batch_end = min(last_day - last_day % chunks[2] + chunks[2], shape[2])
+            if contributions:
+                # contributions of an interrupted batch are recorded again
+                contributions.discard(days)
+            for block_row in range(0, shape[0], block_rows):
+                for block_col in range(0, shape[1], block_cols):
+                    block_end_row = min(block_row + block_rows, shape[0])
+                    block_end_col = min(block_col + block_cols, shape[1])
+                    for row in range(block_row, block_end_row, tile_rows):
+                        for col in range(block_col, block_end_col, tile_cols):
+                            rows = min(tile_rows, block_end_row - row)
+                            cols = min(tile_cols, block_end_col - col)
+                            exposure = exposure_buffer[:rows, :cols, :batch_end - batch_start]
+                            exposure.fill(0)
+                            tile_window = (
+                                row * resolution,
+                                min((row + rows) * resolution, full_rows),
+                                col * resolution,
+                                min((col + cols) * resolution, full_cols)
+                            )
+                            for day in days:
+                                for entry, values, first_row, first_col in output_index.read_day(day, tile_window):
+                                    if resolution > 1:
+                                        # the values are aligned to the aggregated cells they fall into
+                                        row_shift = first_row % resolution
+                                        col_shift = first_col % resolution
+                                        block = read_buffer[
+                                            :row_shift + values.shape[0], :col_shift + values.shape[1]]
+                                        block.fill(0)
+                                        block[row_shift:, col_shift:] = values
+                                        contribution = aggregate_blocks(
+                                            block,
+                                            resolution,
+                                            aggregate_buffer[
+                                                :-(-block.shape[0] // resolution), :-(-block.shape[1] // resolution)]
+                                        )
+                                    else:
+                                        contribution = values
+                                    contribution_row = first_row // resolution - row
+                                    contribution_col = first_col // resolution - col
+                                    exposure[
+                                        contribution_row:contribution_row + contribution.shape[0],
+                                        contribution_col:contribution_col + contribution.shape[1],
+                                        day - batch_start
+                                    ] += contribution
+                                    if contributions:
+                                        contributions.add(
+                                            entry["field"],
+                                            day,
+                                            row + contribution_row,
+                                            col + contribution_col,
+                                            contribution
+                                        )
+                            summary.account_unencoded(exposure, batch_start)
+                            if staging is None:
+                                self.outputs["Exposure"].set_values(
+                                    encoding.encode(exposure),
+                                    slices=(
+                                        slice(row, row + rows), slice(col, col + cols), slice(batch_start, batch_end)),
+                                    create=False
+                                )
+                            else:
+                                staging[
+                                    row - block_row:row - block_row + rows,
+                                    col - block_col:col - block_col + cols,
+                                    :batch_end - batch_start
+                                ] = encoding.encode(exposure)
+                            position = np.unravel_index(np.argmax(exposure), exposure.shape)
+                            manifest.update_maximum(
+                                float(exposure[position]),
+                                (int(position[0]) + row, int(position[1]) + col, int(position[2]) + batch_start)
+                            )
+                            summary.update(exposure, row, col, batch_start)
+                    if staging is not None:
+                        self.outputs["Exposure"].set_values(
+                            staging[:block_end_row - block_row, :block_end_col - block_col, :batch_end - batch_start],
+                            slices=(
+                                slice(block_row, block_end_row),
+                                slice(block_col, block_end_col),
+                                slice(batch_start, batch_end)
+                            ),
+                            create=False
+                        )
+            summary.save()
+            if contributions:
+                contributions.commit()
+            manifest.merge(days)
+            if delete_merged:
+                # rasters are only deleted after the manifest recorded their days, so that a resumed run skips them
+                output_index.remove_rasters(days)
+        if staging is not None:
+            del staging
+            os.remove(staging_file)
+        if manifest.maximum[0] > 0:
+            # the maximum is tracked incrementally while merging and stored once by rewriting its cell
+            y, x, t = manifest.maximum[1]
+            self.outputs["Exposure"].set_values(
+                encoding.encode(np.full((1, 1, 1), manifest.maximum[0], np.float32)),
+                slices=(slice(y, y + 1), slice(x, x + 1), slice(t, t + 1)),
+                create=False,
+                calculate_max=True
+            )
+        self.write_daily_summary(summary, simulation_start)
+        if encoding.quantized:
+            self.outputs["ExposureEncoding"].set_values(np.array((encoding.offset, encoding.scale)))
+        if encoding.threshold > 0 or encoding.quantized:
+            unencoded_mass = summary.unencoded_mass.sum()
+            self.default_observer.write_message(
+                3, "Storage encoding of the Exposure changed the deposited mass by {:.6g} g ({:.4%}){}".format(
+                    summary.mass.sum() - unencoded_mass,
+                    (summary.mass.sum() - unencoded_mass) / unencoded_mass if unencoded_mass > 0 else 0,
+                    ", quantized values deviate by at most {:.4%}".format(encoding.relative_error)
+                    if encoding.quantized else ""))
+        if contributions:
+            contributions.close()
+
+    def assemble_exposure(self, output_index, manifest, merge_plan, encoding, summary, contributions, scratch_path):
+        """
+        Assembles the `Exposure` in a memory-mapped scratch file and loads it into the store chunk by chunk. The
+        scratch file holds the chunks of each chunk period with run-off contiguously, so that module outputs can be
+        accumulated in any order and every chunk is written once.
+
+        Args:
+            output_index: The index of the module outputs.
+            manifest: The manifest of the run.
+            merge_plan: The plan of spatial tiles and batches of days for merging.
+            encoding: The storage encoding of the exposure values.
+            summary: The daily summary of the exposure.
+            contributions: The store of field contributions or `None`.
+            scratch_path: The directory of the scratch file.
+
+        Returns:
+            Nothing.
+        """
+        shape, (chunk_rows, chunk_cols, chunk_days), _, _, _, resolution = merge_plan
+        chunk_rows, chunk_cols, chunk_days = min(chunk_rows, shape[0]), min(chunk_cols, shape[1]), min(
+            chunk_days, shape[2])
+        days = output_index.days()
+        periods = {period: i for i, period in enumerate(sorted({day // chunk_days for day in days}))}
+        cube_shape = (len(periods), -(-shape[0] // chunk_rows), -(-shape[1] // chunk_cols), chunk_rows, chunk_cols,
+                      chunk_days)
+        os.makedirs(scratch_path, exist_ok=True)
+        scratch_file = os.path.join(scratch_path, "RunOffPrzm_{}_exposure.dat".format(
+            hashlib.sha256(os.path.abspath(self.inputs["ProcessingPath"].read().values).encode()).hexdigest()[:16]))
+        self.default_observer.write_message(
+            3, "Assembling the Exposure in {} ({:.1f} MB for {} chunk periods)".format(
+                scratch_file, np.prod(cube_shape) * np.dtype(np.float32).itemsize / 2 ** 20, len(periods)))
+        cube = np.memmap(scratch_file, np.float32, "w+", shape=cube_shape)
+        try:
+            def accumulate(day):
+                accumulated = []
+                for entry, values, first_row, first_col in output_index.read_day(day):
+                    if resolution > 1:
+                        # the values are aligned to the aggregated cells they fall into
+                        block = np.zeros(
+                            (first_row % resolution + values.shape[0], first_col % resolution + values.shape[1]),
+                            np.float32)
+                        block[first_row % resolution:, first_col % resolution:] = values
+                        values = aggregate_blocks(block, resolution)
+                    row, col = first_row // resolution, first_col // resolution
+                    end_row, end_col = row + values.shape[0], col + values.shape[1]
+                    for tile_row in range(row // chunk_rows, -(-end_row // chunk_rows)):
+                        for tile_col in range(col // chunk_cols, -(-end_col // chunk_cols)):
+                            tile_first_row, tile_first_col = tile_row * chunk_rows, tile_col * chunk_cols
+                            rows = slice(max(row, tile_first_row), min(end_row, tile_first_row + chunk_rows))
+                            cols = slice(max(col, tile_first_col), min(end_col, tile_first_col + chunk_cols))
+                            cube[
+                                periods[day // chunk_days],
+                                tile_row,
+                                tile_col,
+                                rows.start - tile_first_row:rows.stop - tile_first_row,
+                                cols.start - tile_first_col:cols.stop - tile_first_col,
+                                day % chunk_days
+                            ] += values[rows.start - row:rows.stop - row, cols.start - col:cols.stop - col]
+                    if contributions:
+                        accumulated.append((entry["field"], row, col, values))
+                return day, accumulated
+
+            # each day occupies its own cells of the scratch file, so that days are accumulated in parallel
+            with concurrent.futures.ThreadPoolExecutor(os.cpu_count()) as executor:
+                for day, accumulated in executor.map(accumulate, days):
+                    for field, row, col, values in accumulated:
+                        contributions.add(field, day, row, col, values)
+            for period, i in sorted(periods.items()):
+                first_day = period * chunk_days
+                period_days = min(chunk_days, shape[2] - first_day)
+                for tile_row in range(cube_shape[1]):
+                    for tile_col in range(cube_shape[2]):
+                        row, col = tile_row * chunk_rows, tile_col * chunk_cols
+                        exposure = np.asarray(cube[
+                            i,
+                            tile_row,
+                            tile_col,
+                            :min(chunk_rows, shape[0] - row),
+                            :min(chunk_cols, shape[1] - col),
+                            :period_days
+                        ])
+                        summary.account_unencoded(exposure, first_day)
+                        self.outputs["Exposure"].set_values(
+                            encoding.encode(exposure),
+                            slices=(
+                                slice(row, row + exposure.shape[0]),
+                                slice(col, col + exposure.shape[1]),
+                                slice(first_day, first_day + period_days)
+                            ),
+                            create=False
+                        )
+                        position = np.unravel_index(np.argmax(exposure), exposure.shape)
+                        manifest.update_maximum(
+                            float(exposure[position]),
+                            (int(position[0]) + row, int(position[1]) + col, int(position[2]) + first_day)
+                        )
+                        summary.update(exposure, row, col, first_day)
+            summary.save()
+            if contributions:
+                contributions.commit()
+            manifest.merge(days)
+        finally:
+            del cube
+            os.remove(scratch_file)
+
+    def serve_exposure_lazily(self, output_index, manifest, merge_plan):
+        """
+        Sets up the `Exposure` output to be calculated from the module output rasters on demand instead of merging
+        all rasters into the store.
+
+        Args:
+            output_index: The index of the module outputs.
+            manifest: The manifest of the run.
+            merge_plan: The plan of spatial tiles and batches of days for merging.
+
+        Returns:
+            Nothing.
+        """
+        if not manifest.completed("Exposure created"):
+            self.create_exposure(merge_plan)
+            manifest.complete("Exposure created")
+        self.outputs["Exposure"].lazy_source = LazyExposure(
+            output_index,
+            merge_plan.shape,
+            self.inputs["Options_LazyCacheDays"].read().values,
+            merge_plan.resolution,
+            merge_plan.chunks
+        )
+        self.outputs["ExposedDays"].set_values(np.array(output_index.days(), np.int32))
+
+    def create_exposure(self, merge_plan, encoding=None):
+        """
+        Creates the `Exposure` output without values.
+
+        Args:
+            merge_plan: The plan of spatial tiles and batches of days for merging.
+            encoding: The storage encoding of the exposure values or `None` to store plain values.
+
+        Returns:
+            Nothing.
+        """
+        simulation_start = self.inputs["Options_StartDate"].read().values
+        extent = self.inputs["Fields_Extent"].read().values
+        cell_area = "{}sqm".format(merge_plan.resolution ** 2)
+        attributes = {}
+        if encoding is not None and encoding.quantized:
+            attributes = {"data_type": np.uint16, "unit": None}
+        self.outputs["Exposure"].set_values(
+            np.ndarray,
+            shape=merge_plan.shape,
+            chunks=merge_plan.chunks,
+            offset=(extent[2], extent[0], simulation_start),
+            scales="space_y/{0}, space_x/{0}, time/day".format(cell_area),
+            **attributes
+        )
+
+    def write_daily_summary(self, summary, simulation_start):
+        """
+        Writes the per-day summary of the exposure to the according outputs.
+
+        Args:
+            summary: The summary of the merged exposure.
+            simulation_start: The first simulated date.
+
+        Returns:
+            Nothing.
+        """
+        self.outputs["DailyDepositedMass"].set_values(summary.mass, offset=(simulation_start,))
+        self.outputs["DailyMaximumExposure"].set_values(summary.maximum, offset=(simulation_start,))
+        self.outputs["DailyExposedCells"].set_values(summary.cells, offset=(simulation_start,))
+        self.outputs["DailyExposureExtent"].set_values(summary.extent(), offset=(simulation_start, 0))
+        self.outputs["ExposedDays"].set_values(np.flatnonzero(summary.cells).astype(np.int32))
+
+    def exposure_chunks(self, shape):
+        """
+        Determines the chunk size of the `Exposure` output according to the configured chunking strategy.
+
+        Args:
+            shape: The shape of the `Exposure` output.
+
+        Returns:
+            A tuple of chunk sizes along the y-, x- and time-axis.
+        """
+        chunking = self.inputs["Options_ExposureChunking"].read().values
+        if chunking == "maps":
+            chunk_days = 1
+        elif chunking == "tiles":
+            chunk_days = min(self.inputs["Options_ExposureChunkDays"].read().values, shape[2])
+        else:
+            chunk_days = shape[2]
+        return base.chunk_size((None, None, chunk_days), shape)
+
+    def write_configuration_xml(self, ppp_repository, cropping_calendar, ppm_calendar, crop_parameterization,
+                                field_discrete, field_parameters, flow_grid, przm_weather, output_file,
+                                temporary_output_path=None, window=None):
+        """
+        Writes the input parameterization for the module.
+
+        Args:
+            ppp_repository: The file path of the PPP repository.
+            cropping_calendar: The file path of the cropping calendar.
+            ppm_calendar: The file path of the PPM calendar.
+            crop_parameterization: The file path of the crop parameterization.
+            field_discrete: The file path of the fields.
+            field_parameters: The file path of the field parameters.
+            flow_grid: The file path of the flow grid.
+            przm_weather: The file path of the weather.
+            output_file: The file path of the module output.
+            temporary_output_path: The temporary output path of the module, or `None` to use the
+                `Options_TemporaryOutputPath`.
+            window: A tuple of the first and the last date simulated by the module, or `None` to simulate the entire
+                period.
+
+        Returns:
+            Nothing.
+        """
+        parameters = xml.etree.ElementTree.Element("parameters")
+        model = xml.etree.ElementTree.SubElement(parameters, "model")
+        henry_constant = self.inputs["Substance_HenryConstant"].read().values
+        xml.etree.ElementTree.SubElement(model, "adsorption_method").text = {
+            "linear": "1", "Freundlich": "2", "aged": "3"}[self.inputs["Model_AdsorptionMethod"].read().values]
+        xml.etree.ElementTree.SubElement(model, "soil_temperature_simulation").text = "2" if self.inputs[
+            "Model_SoilTemperatureSimulation"].read().values else "0"
+        substances = xml.etree.ElementTree.SubElement(parameters, "substances")
+        substance = xml.etree.ElementTree.SubElement(
+            substances, "substance", {"name": self.inputs["SubstanceName"].read().values})
+        xml.etree.ElementTree.SubElement(substance, "plant_uptake_factor").text = str(self.inputs[
+            "Substance_PlantUptakeFactor"].read().values)
+        xml.etree.ElementTree.SubElement(substance, "pesticide_dissipation_rate_of_foliage").text = str(self.inputs[
+            "Substance_PesticideDissipationRateOfFoliage"].read().values)
+        xml.etree.ElementTree.SubElement(substance, "foliar_wash_off_coefficient").text = str(self.inputs[
+            "Substance_FoliarWashOffCoefficient"].read().values)
+        if not math.isnan(henry_constant):
+            xml.etree.ElementTree.SubElement(substance, "henry_constant").text = str(henry_constant)
+        xml.etree.ElementTree.SubElement(substance, "vapour_pressure").text = str(self.inputs[
+            "Substance_VapourPressure"].read().values)
+        xml.etree.ElementTree.SubElement(substance, "molecular_weight").text = str(self.inputs[
+            "Substance_MolecularWeight"].read().values)
+        xml.etree.ElementTree.SubElement(substance, "water_solubility").text = str(self.inputs[
+            "Substance_WaterSolubility"].read().values)
+        xml.etree.ElementTree.SubElement(substance, "temperature_at_which_measured").text = str(self.inputs[
+            "Substance_TemperatureAtWhichMeasured"].read().values)
+        xml.etree.ElementTree.SubElement(substance, "freundlich_exponent").text = str(self.inputs[
+            "Substance_FreundlichExponent"].read().values)
+        xml.etree.ElementTree.SubElement(substance, "reference_moisture_for_dt50_soil").text = str(self.inputs[
+            "Substance_ReferenceMoistureForDT50Soil"].read().values)
+        xml.etree.ElementTree.SubElement(substance, "soil_dt50").text = str(
+            self.inputs["Substance_SoilDT50"].read().values)
+        xml.etree.ElementTree.SubElement(substance, "koc_soil").text = str(
+            self.inputs["Substance_KocSoil"].read().values)
+        ppp = xml.etree.ElementTree.SubElement(parameters, "ppp")
+        xml.etree.ElementTree.SubElement(ppp, "ppp_repository").text = ppp_repository
+        cropping = xml.etree.ElementTree.SubElement(parameters, "cropping")
+        xml.etree.ElementTree.SubElement(cropping, "cropping_calendar").text = cropping_calendar
+        xml.etree.ElementTree.SubElement(cropping, "ppm_calendar").text = ppm_calendar
+        chemical_application_methods = xml.etree.ElementTree.SubElement(cropping, "chemical_application_methods")
+        chemical_application_method_spray_application = xml.etree.ElementTree.SubElement(
+            chemical_application_methods, "chemical_application_method", {"name": "SprayApplication"})
+        xml.etree.ElementTree.SubElement(
+            chemical_application_method_spray_application, "przm_application_method").text = {
+            "soil": "0",
+            "canopy": "1",
+            "foliar": "2"}[
+            self.inputs["SprayApplication_PrzmApplicationMethod"].read().values]
+        xml.etree.ElementTree.SubElement(
+            chemical_application_method_spray_application, "incorporation_depth").text = str(
+            self.inputs["SprayApplication_IncorporationDepth"].read().values)
+        # noinspection SpellCheckingInspection
+        xml.etree.ElementTree.SubElement(cropping, "crop_parameterisation").text = crop_parameterization
+        landscape = xml.etree.ElementTree.SubElement(parameters, "landscape")
+        # noinspection SpellCheckingInspection
+        xml.etree.ElementTree.SubElement(landscape, "field_discretisation").text = field_discrete
+        xml.etree.ElementTree.SubElement(landscape, "parameters_as_xml").text = field_parameters
+        xml.etree.ElementTree.SubElement(landscape, "flow").text = flow_grid
+        weather = xml.etree.ElementTree.SubElement(parameters, "weather")
+        xml.etree.ElementTree.SubElement(weather, "przm_weather_file").text = przm_weather
+        options = xml.etree.ElementTree.SubElement(parameters, "options")
+        simulation_start, simulation_end = window or (
+            self.inputs["Options_StartDate"].read().values, self.inputs["Options_EndDate"].read().values)
+        xml.etree.ElementTree.SubElement(options, "start_date").text = str(
+            self.convert_to_przm_date(simulation_start, simulation_end))
+        xml.etree.ElementTree.SubElement(options, "end_date").text = str(
+            self.convert_to_przm_date(simulation_end, simulation_end))
+        xml.etree.ElementTree.SubElement(options, "temporary_output_path").text = temporary_output_path or self.inputs[
+            "Options_TemporaryOutputPath"].read().values
+        xml.etree.ElementTree.SubElement(options, "delete_temporary_grids").text = "1" if self.inputs[
+            "Options_DeleteTemporaryGrids"].read().values else "0"
+        xml.etree.ElementTree.SubElement(options, "TimeoutSecPRZM").text = str(
+            self.inputs["Options_TimeoutSecPrzm"].read().values)
+        # noinspection SpellCheckingInspection
+        xml.etree.ElementTree.SubElement(options, "reporting_threashold").text = str(
+            self.inputs["Options_ReportingThreshold"].read().values)
+        xml.etree.ElementTree.SubElement(options, "method_of_runoff_generation").text = {
+            "PRZM": "1", "FOCUS": "0"}[self.inputs["Options_MethodOfRunoffGeneration"].read().values]
+        xml.etree.ElementTree.SubElement(options, "delete_all_interim_results").text = "1" if self.inputs[
+            "Options_DeleteAllInterimResults"].read().values else "0"
+        # noinspection SpellCheckingInspection
+        xml.etree.ElementTree.SubElement(options, "show_extended_error_infos").text = "1" if self.inputs[
+            "Options_ShowExtendedErrorInformation"].read().values else "0"
+        # noinspection SpellCheckingInspection
+        xml.etree.ElementTree.SubElement(options, "use_presimulated_przm_results").text = "1" if self.inputs[
+            "Options_UsePreSimulatedPrzmResults"].read().values else "0"
+        xml.etree.ElementTree.SubElement(options, "use_one_przm_model_per_grid_cell").text = "1" if self.inputs[
+            "Options_UseOnePrzmModelPerGridCell"].read().values else "0"
+        xml.etree.ElementTree.SubElement(options, "use_vfs_mod").text = "1" if self.inputs[
+            "Options_UseVfsMod"].read().values else "0"
+        xml.etree.ElementTree.ElementTree(parameters).write(output_file, encoding="utf-8", xml_declaration=True)
+
+    def write_przm_weather_file(self, output_file, window=None):
+        """
+        Prepares the weather input.
+
+        Args:
+            output_file: The file path of the weather input.
+            window: A tuple of the first and the last date simulated by the module, or `None` to simulate the entire
+                period.
+
+        Returns:
+            Nothing.
+        """
+        offset = 0
+        start_date = self.inputs["Options_StartDate"].read().values
+        end_date = self.inputs["Options_EndDate"].read().values
+        if window:
+            offset = (window[0] - start_date).days
+            start_date, end_date = window
+        precipitation = self._inputs["Weather_Precipitation"].read()
+        et0 = self._inputs["Weather_ET0"].read()
+        temperature = self._inputs["Weather_Temperature"].read()
+        wind_speed = self._inputs["Weather_WindSpeed"].read()
+        radiation = self._inputs["Weather_SolarRadiation"].read()
+        weather_file = open(output_file, "w")
+        for i in range((end_date - start_date).days + 1):
+            date = start_date + datetime.timedelta(i)
+            mapped_date = self.convert_to_przm_date(date, end_date)
+            weather_file.write(" {:02d}{:02d}{:02d}{:>10.4f}{:>10.4f}{:>10.4f}{:>10.4f}{:>10.4f}\n".format(
+                mapped_date.month,
+                mapped_date.day,
+                mapped_date.year - 1900,
+                precipitation.values[offset + i] / 10,
+                et0.values[offset + i] / 10,
+                temperature.values[offset + i],
+                wind_speed.values[offset + i] * 100,
+                radiation.values[offset + i] / 41.84))
+        weather_file.close()
+
+    def write_field_parameters_file(self, output_file, selection):
+        """
+        Prepares the field parameters.
+
+        Args:
+            output_file: Te file path of the field parameters.
+            selection: A boolean array that indicates for each application whether it is simulated.
+
+        Returns:
+            Nothing.
+        """
+        applied_fields = self.inputs["Ppm_AppliedFields"].read().values[selection]
+        slope = self.inputs["Fields_Slope"].read()
+        soil_horizon_thicknesses = self.inputs["Fields_SoilHorizonThicknesses"].read()
+        soil_horizon_bulk_densities = self.inputs["Fields_SoilHorizonBulkDensities"].read()
+        soil_horizon_organic_material_contents = self.inputs["Fields_SoilHorizonOrganicMaterialContents"].read()
+        soil_horizon_sand_fractions = self.inputs["Fields_SoilHorizonSandFractions"].read()
+        soil_horizon_silt_fractions = self.inputs["Fields_SoilHorizonSiltFractions"].read()
+        fields = xml.etree.ElementTree.Element("fields")
+        field_ids = set(applied_fields)
+        for fieldId in field_ids:
+            field = xml.etree.ElementTree.SubElement(fields, "field", {"id": str(fieldId)})
+            xml.etree.ElementTree.SubElement(field, "slope").text = str(slope.values)
+            soil_horizons = xml.etree.ElementTree.SubElement(field, "soil_horizons")
+            for soilHorizonId in range(len(soil_horizon_thicknesses.values)):
+                soil_horizon = xml.etree.ElementTree.SubElement(soil_horizons,
+                                                                "soil_horizon",
+                                                                {"id": str(soilHorizonId + 1)})
+                xml.etree.ElementTree.SubElement(soil_horizon, "thickness").text = str(
+                    soil_horizon_thicknesses.values[soilHorizonId])
+                xml.etree.ElementTree.SubElement(soil_horizon, "BD").text = str(
+                    soil_horizon_bulk_densities.values[soilHorizonId])
+                xml.etree.ElementTree.SubElement(soil_horizon, "omc").text = str(
+                    soil_horizon_organic_material_contents.values[soilHorizonId])
+                xml.etree.ElementTree.SubElement(soil_horizon, "sand").text = str(
+                    soil_horizon_sand_fractions.values[soilHorizonId])
+                xml.etree.ElementTree.SubElement(soil_horizon, "silt").text = str(
+                    soil_horizon_silt_fractions.values[soilHorizonId])
+        xml.etree.ElementTree.ElementTree(fields).write(output_file, encoding="utf-8", xml_declaration=True)
+
+    def write_field_raster(self, output_file, selection):
+        """
+        Prepares the field raster.
+
+        Args:
+            output_file: The file path of the field raster.
+            selection: A boolean array that indicates for each application whether it is simulated.
+
+        Returns:
+            Nothing.
+        """
+        applied_fields = self.inputs["Ppm_AppliedFields"].read().values[selection]
+        extent = self.inputs["Fields_Extent"].read().values
+        crs = self.inputs["Fields_Crs"].read()
+        raster_cols = int(round(extent[1] - extent[0]))
+        raster_rows = int(round(extent[3] - extent[2]))
+        raster_driver = gdal.GetDriverByName("GTiff")
+        raster_data_set = raster_driver.Create(output_file, raster_cols, raster_rows, 1, 2, ["COMPRESS=LZW"])
+        raster_data_set.SetGeoTransform((extent[0], 1, 0, extent[3], 0, -1))
+        raster_band = raster_data_set.GetRasterBand(1)
+        raster_band.SetNoDataValue(65535)
+        raster_data_set.SetProjection(crs.values)
+        self.rasterize_fields(raster_data_set, set(applied_fields))
+        del raster_data_set
+
+    def field_raster(self, applied_fields, fill_value=0):
+        """
+        Rasterizes fields in memory in the same way as the field raster prepared for the module.
+
+        Args:
+            applied_fields: The identifiers of the fields to rasterize.
+            fill_value: The value of cells outside the fields.
+
+        Returns:
+            An array of field identifiers.
+        """
+        extent = self.inputs["Fields_Extent"].read().values
+        raster_cols = int(round(extent[1] - extent[0]))
+        raster_rows = int(round(extent[3] - extent[2]))
+        raster_data_set = gdal.GetDriverByName("MEM").Create("", raster_cols, raster_rows, 1, 2)
+        raster_data_set.SetGeoTransform((extent[0], 1, 0, extent[3], 0, -1))
+        raster_data_set.SetProjection(self.inputs["Fields_Crs"].read().values)
+        raster_data_set.GetRasterBand(1).Fill(fill_value)
+        self.rasterize_fields(raster_data_set, applied_fields)
+        return raster_data_set.GetRasterBand(1).ReadAsArray()
+
+    def rasterize_fields(self, raster_data_set, applied_fields):
+        """
+        Burns the identifiers of fields into a raster.
+
+        Args:
+            raster_data_set: The raster data set to burn the fields into.
+            applied_fields: The identifiers of the fields to burn.
+
+        Returns:
+            Nothing.
+        """
+        field_geometries = self.inputs["Fields_Geometries"].read()
+        feature_ids = self.inputs["Fields_Ids"].read()
+        crs = self.inputs["Fields_Crs"].read()
+        in_field_margin = self.inputs["Fields_InFieldMargin"].read().values
+        spatial_reference = osr.SpatialReference()
+        spatial_reference.ImportFromWkt(crs.values)
+        ogr_driver = ogr.GetDriverByName("MEMORY")
+        ogr_data_set = ogr_driver.CreateDataSource("memory")
+        ogr_layer = ogr_data_set.CreateLayer("filtered", spatial_reference, ogr.wkbPolygon)
+        ogr_layer.CreateField(ogr.FieldDefn("Id", ogr.OFTInteger))
+        ogr_layer_definition = ogr_layer.GetLayerDefn()
+        for i in range(len(feature_ids.values)):
+            if feature_ids.values[i] in applied_fields:
+                applied_field = ogr.Feature(ogr_layer_definition)
+                applied_field.SetGeometry(ogr.CreateGeometryFromWkb(field_geometries.values[i]).Buffer(
+                    -in_field_margin))
+                applied_field.SetField("Id", feature_ids.values[i])
+                ogr_layer.CreateFeature(applied_field)
+        gdal.RasterizeLayer(raster_data_set, [1], ogr_layer, burn_values=[0], options=["ATTRIBUTE=Id"])
+
+    def write_cropping_statistics(self, output_file, selection):
+        """
+        Prepares the cropping statistic.
+
+        Args:
+            output_file: The file path of the cropping statistic.
+            selection: A boolean array that indicates for each application whether it is simulated.
+
+        Returns:
+            Nothing.
+        """
+        applied_fields_input = self.inputs["Ppm_AppliedFields"].read().values[selection]
+        cropping_statistics = xml.etree.ElementTree.Element("CroppingStatistic")
+        applied_fields = set(applied_fields_input)
+        for appliedField in applied_fields:
+            cropping = xml.etree.ElementTree.SubElement(cropping_statistics, "Cropping")
+            xml.etree.ElementTree.SubElement(cropping, "Field").text = str(appliedField)
+            xml.etree.ElementTree.SubElement(cropping, "DateFrom").text = "1900-01-01"
+            xml.etree.ElementTree.SubElement(cropping, "DateTo").text = "1999-12-31"
+            xml.etree.ElementTree.SubElement(cropping, "Crop").text = "Cereals,Winter"
+        xml.etree.ElementTree.ElementTree(cropping_statistics).write(output_file,
+                                                                     encoding="utf-8",
+                                                                     xml_declaration=True)
+
+    def write_ppp_repository(self, output_file):
+        """
+        Prepares the PPP repository.
+
+        Args:
+            output_file: The file path of the PPP repository.
+
+        Returns:
+            Nothing.
+        """
+        ppp_repository = xml.etree.ElementTree.Element("PppRepository")
+        ppp = xml.etree.ElementTree.SubElement(ppp_repository, "PPP")
+        xml.etree.ElementTree.SubElement(ppp, "Name").text = "PPP"
+        active_ingredients = xml.etree.ElementTree.SubElement(ppp, "ActiveIngredients")
+        active_ingredient = xml.etree.ElementTree.SubElement(active_ingredients, "ActiveIngredient")
+        xml.etree.ElementTree.SubElement(active_ingredient, "Name").text = self.inputs["SubstanceName"].read().values
+        xml.etree.ElementTree.SubElement(active_ingredient, "MassFraction").text = "1"
+        xml.etree.ElementTree.ElementTree(ppp_repository).write(output_file, encoding="utf-8", xml_declaration=True)
+
+    def write_ppm_calendar(self, output_file, applied_areas_path, spatial_ids, selection, window=None):
+        """
+        Prepares the PPM Calendar.
+
+        Args:
+            output_file: The file path of the PPM calendar.
+            applied_areas_path: The file path to the applied geometries.
+            spatial_ids: Spatial identifiers of unique spatial extents of applications.
+            selection: A boolean array that indicates for each application whether it is simulated.
+            window: A tuple of the first and the last date simulated by the module, or `None` to simulate the entire
+                period.
+
+        Returns:
+            Nothing.
+        """
+        applied_fields = self.inputs["Ppm_AppliedFields"].read().values
+        application_dates = self.inputs["Ppm_ApplicationDates"].read().values
+        application_rates = self.inputs["Ppm_ApplicationRates"].read().values
+        simulation_end = window[1] if window else self.inputs["Options_EndDate"].read().values
+        ppm_calendar = xml.etree.ElementTree.Element("PpmCalendar")
+        for i in np.flatnonzero(selection):
+            spray_application_element = xml.etree.ElementTree.SubElement(ppm_calendar, "SprayApplication")
+            xml.etree.ElementTree.SubElement(spray_application_element, "Date").text = str(
+                self.convert_to_przm_date(datetime.date.fromordinal(application_dates[i]), simulation_end))
+            xml.etree.ElementTree.SubElement(spray_application_element, "Field").text = str(applied_fields[i])
+            xml.etree.ElementTree.SubElement(spray_application_element, "PPP").text = "PPP"
+            xml.etree.ElementTree.SubElement(spray_application_element,
+                                             "ApplicationRate").text = str(application_rates[i])
+            xml.etree.ElementTree.SubElement(spray_application_element, "ApplicationExtent").text = os.path.join(
+                applied_areas_path, str(spatial_ids[i]).replace("-", "a") + ".tif")
+        xml.etree.ElementTree.ElementTree(ppm_calendar).write(output_file, encoding="utf-8", xml_declaration=True)
+
+    def write_crop_parameters(self, output_file):
+        """
+        Prepares the crop parameters.
+
+        Args:
+            output_file: The file path of the crop parameters.
+
+        Returns:
+            Nothing.
+        """
+        crops = xml.etree.ElementTree.Element("crops")
+        pan_evaporation_factors = self.inputs["CropParameters_PanEvaporationFactors"].read().values
+        canopy_interceptions = self.inputs["CropParameters_CanopyInterceptions"].read().values
+        maximum_coverages = self.inputs["CropParameters_MaximumCoverages"].read().values
+        maximum_heights = self.inputs["CropParameters_MaximumHeights"].read().values
+        maximum_rooting_depths = self.inputs["CropParameters_MaximumRootingDepths"].read().values
+        fallows = self.inputs["CropParameters_Fallows"].read().values
+        cropping = self.inputs["CropParameters_Cropping"].read().values
+        residues = self.inputs["CropParameters_Residues"].read().values
+        emerging_dates = self.inputs["CropParameters_EmergenceDates"].read().values
+        maturation_dates = self.inputs["CropParameters_MaturationDates"].read().values
+        harvest_dates = self.inputs["CropParameters_HarvestDates"].read().values
+        fallow_dates = self.inputs["CropParameters_FallowDates"].read().values
+        water_mitigations = self.inputs["CropParameters_WaterMitigations"].read().values
+        sediment_mitigations = self.inputs["CropParameters_SedimentMitigations"].read().values
+        vfs_mod_lookup_tables = self.inputs["CropParameters_VfsModLookupTables"].read().values
+        for i, crop_name in enumerate(self.inputs["CropParameters_Crops"].read().values):
+            crop = xml.etree.ElementTree.SubElement(crops, "crop", {"name": crop_name})
+            # noinspection SpellCheckingInspection
+            xml.etree.ElementTree.SubElement(crop, "pan_evap_factor").text = str(pan_evaporation_factors[i])
+            xml.etree.ElementTree.SubElement(crop, "canopy_interception").text = str(canopy_interceptions[i])
+            xml.etree.ElementTree.SubElement(crop, "maximum_coverage").text = str(maximum_coverages[i])
+            xml.etree.ElementTree.SubElement(crop, "maximum_height").text = str(maximum_heights[i])
+            xml.etree.ElementTree.SubElement(crop, "maximum_rooting_depth").text = str(maximum_rooting_depths[i])
+            xml.etree.ElementTree.SubElement(crop, "USLEC_fallow").text = str(fallows[i])
+            xml.etree.ElementTree.SubElement(crop, "USLEC_cropping").text = str(cropping[i])
+            xml.etree.ElementTree.SubElement(crop, "USLEC_residue").text = str(residues[i])
+            xml.etree.ElementTree.SubElement(crop, "emergence_date").text = emerging_dates[i]
+            xml.etree.ElementTree.SubElement(crop, "maturation_date").text = maturation_dates[i]
+            xml.etree.ElementTree.SubElement(crop, "harvest_date").text = harvest_dates[i]
+            xml.etree.ElementTree.SubElement(crop, "fallow_date").text = fallow_dates[i]
+            xml.etree.ElementTree.SubElement(crop, "water_mitigation").text = str(water_mitigations[i])
+            xml.etree.ElementTree.SubElement(crop, "sediment_mitigation").text = str(sediment_mitigations[i])
+            xml.etree.ElementTree.SubElement(crop, "VFS_Mod_lookup_table").text = vfs_mod_lookup_tables[i]
+        xml.etree.ElementTree.ElementTree(crops).write(output_file, encoding="utf-8", xml_declaration=True)
+
+    def write_applied_area_raster(self, output_path, named_geometries):
+        """
+        Prepares the applied areas.
+
+        Args:
+            output_path: The file path of the applied area raster.
+            named_geometries: A dictionary of named geometries to write as raster.
+
+        Returns:
+            Nothing.
+        """
+        os.makedirs(output_path, exist_ok=True)
+        extent = self.inputs["Fields_Extent"].read().values
+        crs = self.inputs["Fields_Crs"].read()
+        spatial_reference = osr.SpatialReference()
+        spatial_reference.ImportFromWkt(crs.values)
+        ogr_driver = ogr.GetDriverByName("MEMORY")
+        raster_cols = int(round(extent[1] - extent[0]))
+        raster_rows = int(round(extent[3] - extent[2]))
+        raster_driver = gdal.GetDriverByName("GTiff")
+        for i, applied_geometry in named_geometries.items():
+            ogr_data_set = ogr_driver.CreateDataSource("memory")
+            ogr_layer = ogr_data_set.CreateLayer("filtered", spatial_reference, ogr.wkbPolygon)
+            ogr_layer_definition = ogr_layer.GetLayerDefn()
+            applied_field = ogr.Feature(ogr_layer_definition)
+            applied_field.SetGeometry(ogr.CreateGeometryFromWkb(applied_geometry))
+            ogr_layer.CreateFeature(applied_field)
+            raster_data_set = raster_driver.Create(
+                os.path.join(output_path, str(i).replace("-", "a") + ".tif"),
+                raster_cols, raster_rows,
+                1,
+                1,
+                ["COMPRESS=LZW"]
+            )
+            raster_data_set.SetGeoTransform((extent[0], 1, 0, extent[3], 0, -1))
+            raster_band = raster_data_set.GetRasterBand(1)
+            raster_band.SetNoDataValue(0)
+            raster_data_set.SetProjection(crs.values)
+            gdal.RasterizeLayer(raster_data_set, [1], ogr_layer, burn_values=[1])
+            del raster_data_set
+
+    def collect_spatial_application_info(self, selection):
+        """
+        Collects information about the spatial extents of applied areas.
+
+        Args:
+            selection: A boolean array that indicates for each application whether it is simulated.
+
+        Returns:
+            A tuple containing a hash for each base geometry and a dictionary with the geometry per hash of the
+            simulated applications.
+        """
+        applied_geometries = self.inputs["Ppm_AppliedAreas"].read().values
+        hashes = [0] * len(applied_geometries)
+        unique_geometries = {}
+        for i, applied_geometry in enumerate(applied_geometries):
+            hash_code = hash(applied_geometry)
+            hashes[i] = hash_code
+            if selection[i]:
+                unique_geometries[hash_code] = applied_geometry
+        return hashes, unique_geometries
+
+
+class ProgressMonitor:
+    """
+    Tracks the progress of a module run from its console output and the growth of its output folder.
+    """
+    # Console output of the module that indicates a completed field
+    FIELD_COMPLETED = re.compile(r"field\D*?(\d+).*?(finished|completed|done)", re.IGNORECASE)
+
+    def __init__(self, stage, przm_folder, total_fields, interval, stall_time):
+        """
+        Initializes a ProgressMonitor.
+
+        Args:
+            stage: The name of the monitored module stage.
+            przm_folder: The output folder of the module.
+            total_fields: The number of fields that the module simulates.
+            interval: The minimum time in seconds between two progress reports.
+            stall_time: The time in seconds without progress after which a stall is reported, or 0 to disable.
+        """
+        self._stage = stage
+        self._przm_folder = przm_folder
+        self._total_fields = total_fields
+        self._interval = interval
+        self._stall_time = stall_time
+        self._start = time.monotonic()
+        self._last_report = self._start
+        self._last_progress = self._start
+        self._stall_reported = False
+        self._fields_reported = set()
+        self._lines = 0
+        self._state = (0, 0, 0)
+
+    def parse(self, line):
+        """
+        Accounts a line of console output of the module.
+
+        Args:
+            line: The line of console output.
+
+        Returns:
+            Nothing.
+        """
+        self._lines += 1
+        match = self.FIELD_COMPLETED.search(line)
+        if match:
+            self._fields_reported.add(match.group(1))
+
+    def scan(self):
+        """
+        Scans the module output folder for field folders and exposure rasters. During the HydroFilter stage, only
+        fields with an output folder are counted, as the field folders of all fields already exist after the PRZM
+        stage. During the PRZM stage, only field folders that contain results are counted.
+
+        Returns:
+            A tuple of the number of processed fields and the number of exposure rasters.
+        """
+        fields = 0
+        rasters = 0
+        with os.scandir(self._przm_folder) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                output = os.path.join(entry.path, "output")
+                if os.path.isdir(output):
+                    fields += self._stage == "HydroFilter"
+                    rasters += sum(1 for name in os.listdir(output) if name.endswith(".tif"))
+                if self._stage == "PRZM":
+                    with os.scandir(entry.path) as field_entries:
+                        fields += any(field_entry.is_file() for field_entry in field_entries)
+        return fields, rasters
+
+    def poll(self, final=False):
+        """
+        Reports the progress of the module if the report interval elapsed.
+
+        Args:
+            final: Specifies whether the monitored module run finished.
+
+        Returns:
+            A list of tuples of message level and message.
+        """
+        now = time.monotonic()
+        if not final and now - self._last_report < self._interval:
+            return []
+        self._last_report = now
+        messages = []
+        folders, rasters = self.scan()
+        fields = min(max(len(self._fields_reported), folders), self._total_fields)
+        state = (self._lines, fields, rasters)
+        if state != self._state:
+            self._state = state
+            self._last_progress = now
+            self._stall_reported = False
+        elapsed = now - self._start
+        message = "{} progress: {}/{} fields, {} exposure rasters, {:.0f}s elapsed, {:.2f} fields/min, " \
+                  "{:.2f} rasters/s".format(self._stage, fields, self._total_fields, rasters, elapsed,
+                                            fields / elapsed * 60 if elapsed > 0 else 0,
+                                            rasters / elapsed if elapsed > 0 else 0)
+        if 0 < fields < self._total_fields and not final:
+            message += ", ETA {:.0f}s".format(elapsed / fields * (self._total_fields - fields))
+        messages.append((3, message))
+        if self._stall_time > 0 and not final and not self._stall_reported and \
+                now - self._last_progress >= self._stall_time:
+            self._stall_reported = True
+            messages.append((2, "{} shows no progress for {:.0f}s, the module run might be stalled".format(
+                self._stage, now - self._last_progress)))
+        return messages
+
+
+class DiskUsage:
+    """
+    Tracks the disk space that a run occupies in its own directories against an optional budget. The directories are
+    only measured once a stage completed, and stages are not started while the run exceeds its budget.
+    """
+
+    def __init__(self, paths, budget):
+        """
+        Initializes a DiskUsage.
+
+        Args:
+            paths: The directories that only the run writes files to.
+            budget: The disk space in bytes that the run may occupy, or 0 for no limit.
+        """
+        self._paths = tuple(dict.fromkeys(os.path.abspath(path) for path in paths if path))
+        self._budget = budget
+        self.current = self.size()
+        self._stage_start = self.current
+        self.peak = self.current
+
+    def size(self):
+        """
+        Determines the disk space currently occupied by the directories of the run. Files that are hard-linked
+        several times are counted once.
+
+        Returns:
+            The occupied disk space in bytes.
+        """
+        files = {}
+        directories = [path for path in self._paths if os.path.isdir(path)]
+        while directories:
+            try:
+                with os.scandir(directories.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                directories.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                stat = entry.stat(follow_symlinks=False)
+                                files[(stat.st_dev, stat.st_ino)] = stat.st_size
+                        except FileNotFoundError:
+                            # files may be deleted concurrently by the module
+                            pass
+            except FileNotFoundError:
+                pass
+        return sum(files.values())
+
+    def account(self, stage):
+        """
+        Measures the disk space written by a completed stage of the run and updates the peak usage.
+
+        Args:
+            stage: The name of the completed stage.
+
+        Returns:
+            A list of tuples of message level and message, which warns if the budget is exceeded.
+        """
+        self.current = self.size()
+        self.peak = max(self.peak, self.current)
+        messages = [(3, "{} changed the disk usage by {:+.1f} MB to {:.1f} MB{}".format(
+            stage,
+            (self.current - self._stage_start) / 2 ** 20,
+            self.current / 2 ** 20,
+            " of {:.0f} MB budget".format(self._budget / 2 ** 20) if self._budget > 0 else ""))]
+        if 0 < self._budget < self.current:
+            messages.append((2, "The run occupies {:.1f} MB and exceeds its disk budget of {:.0f} MB".format(
+                self.current / 2 ** 20, self._budget / 2 ** 20)))
+        self._stage_start = self.current
+        return messages
+
+    def free_space_missing(self):
+        """
+        Determines how much free space the scratch volume lacks for the remaining budget of the run, based on the
+        disk usage measured after the last completed stage.
+
+        Returns:
+            The missing free space in bytes, or 0 if the volume has enough free space or no budget is set.
+        """
+        if self._budget == 0:
+            return 0
+        free_space = shutil.disk_usage(next(path for path in self._paths if os.path.isdir(path))).free
+        return max(self._budget - self.current - free_space, 0)
+
+    def enforce(self, stage):
+        """
+        Ensures that a stage can start within the budget of the run.
+
+        Args:
+            stage: The name of the stage that is about to start.
+
+        Returns:
+            Nothing.
+        """
+        if 0 < self._budget < self.current:
+            raise Exception("Not starting {} because the run occupies {:.1f} MB and exceeds its disk budget of {:.0f} "
+                            "MB".format(stage, self.current / 2 ** 20, self._budget / 2 ** 20))
+        missing = self.free_space_missing()
+        if missing > 0:
+            raise Exception("Not starting {} because the scratch volume lacks {:.0f} MB of free space for the "
+                            "remaining disk budget of the run".format(stage, missing / 2 ** 20))
+
+
+class RunManifest:
+    """
+    Records the completed stages of a run within its processing path, allowing to resume an interrupted run.
+    """
+
+    def __init__(self, manifest_file, fingerprint, stages=(), merged_days=(), maximum=(0, None)):
+        """
+        Initializes a RunManifest.
+
+        Args:
+            manifest_file: The file path of the manifest.
+            fingerprint: The fingerprint of the inputs of the run.
+            stages: The names of the stages that already completed.
+            merged_days: The days that were already merged into the output.
+            maximum: The maximum merged value and its position.
+        """
+        self._manifest_file = manifest_file
+        self._merged_days_file = os.path.splitext(manifest_file)[0] + "_merged_days.txt"
+        self.fingerprint = fingerprint
+        self.stages = list(stages)
+        self.merged_days = set(merged_days)
+        self.maximum = tuple(maximum)
+        self._save()
+
+    @classmethod
+    def load(cls, manifest_file):
+        """
+        Loads a previously written manifest.
+
+        Args:
+            manifest_file: The file path of the manifest.
+
+        Returns:
+            The loaded manifest.
+        """
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+        merged_days_file = os.path.splitext(manifest_file)[0] + "_merged_days.txt"
+        merged_days = []
+        if os.path.exists(merged_days_file):
+            with open(merged_days_file) as f:
+                # a batch whose line is incomplete was not entirely recorded and is merged again
+                merged_days = [int(day) for line in f.read().split("\n")[:-1] for day in line.split()]
+        return cls(
+            manifest_file, manifest["fingerprint"], manifest["stages"], merged_days, manifest.get("maximum", (0, None)))
+
+    def completed(self, stage):
+        """
+        Checks whether a stage already completed.
+
+        Args:
+            stage: The name of the stage.
+
+        Returns:
+            A boolean indicating whether the stage completed.
+        """
+        return stage in self.stages
+
+    def complete(self, stage):
+        """
+        Records the completion of a stage. Stages that are completed again, e.g., when staged module inputs are
+        re-created by a resumed run, are recorded once.
+
+        Args:
+            stage: The name of the stage.
+
+        Returns:
+            Nothing.
+        """
+        if stage not in self.stages:
+            self.stages.append(stage)
+            self._save()
+
+    def update_maximum(self, value, position):
+        """
+        Records the maximum merged value if it exceeds the previous maximum.
+
+        Args:
+            value: The maximum value of a merged batch.
+            position: The position of the value in the output.
+
+        Returns:
+            Nothing.
+        """
+        if value > self.maximum[0]:
+            self.maximum = (value, position)
+            self._save()
+
+    def merge(self, days):
+        """
+        Records that a batch of days was merged into the output. Days are appended to a separate log to keep the
+        costs of recording independent of the number of already merged days. The days of a batch are written as a
+        single line, so that an interrupted run records either all or none of them.
+
+        Args:
+            days: The indices of the merged days.
+
+        Returns:
+            Nothing.
+        """
+        self.merged_days.update(days)
+        with open(self._merged_days_file, "a") as f:
+            f.write(" ".join(str(day) for day in sorted(days)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _save(self):
+        """
+        Atomically writes the manifest.
+
+        Returns:
+            Nothing.
+        """
+        temporary_file = self._manifest_file + ".tmp"
+        with open(temporary_file, "w") as f:
+            json.dump({"fingerprint": self.fingerprint, "stages": self.stages, "maximum": self.maximum}, f, indent=2)
+        os.replace(temporary_file, self._manifest_file)
+
+
+def update_fingerprint(fingerprint, value):
+    """
+    Updates a hash with an input value.
+
+    Args:
+        fingerprint: The hash object to update.
+        value: The value to hash, which may be a scalar, a string, bytes, a date, an array or a nested sequence.
+
+    Returns:
+        Nothing.
+    """
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        fingerprint.update("{}{}".format(value.dtype, value.shape).encode())
+        fingerprint.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple, np.ndarray)):
+        fingerprint.update("[{}]".format(len(value)).encode())
+        for element in value:
+            update_fingerprint(fingerprint, element)
+    elif isinstance(value, bytes):
+        fingerprint.update(value)
+    else:
+        fingerprint.update(repr(value).encode())
+
+
+# Row and column offsets of the downstream cell per flow direction in ESRI encoding
+FLOW_DIRECTIONS = {1: (0, 1), 2: (1, 1), 4: (1, 0), 8: (1, -1), 16: (0, -1), 32: (-1, -1), 64: (-1, 0), 128: (-1, 1)}
+
+
+def reaching_fields(field_raster, flow_directions, fields):
+    """
+    Determines the fields from which run-off can reach a cell within the landscape that is not part of a treated
+    field. Run-off is followed along the flow directions across treated cells by pointer doubling, so that all flow
+    paths are resolved in a logarithmic number of vectorized steps. Flow paths that leave the landscape or end in a
+    loop of treated cells do not reach any cell. Cells with undefined flow directions are conservatively considered to
+    pass run-off to an untreated cell.
+
+    Args:
+        field_raster: A raster of field identifiers.
+        flow_directions: A raster of flow directions in ESRI encoding that is aligned with the field raster.
+        fields: The identifiers of the treated fields.
+
+    Returns:
+        The set of identifiers of fields whose run-off can reach an untreated cell.
+    """
+    rows, cols = field_raster.shape
+    cells = np.flatnonzero(np.isin(field_raster, list(fields)))
+    if cells.size == 0:
+        return set()
+    # the last two nodes stand for leaving the landscape and reaching an untreated cell
+    leaving, reaching = cells.size, cells.size + 1
+    pointer = np.full(cells.size + 2, reaching, np.int64)
+    pointer[leaving] = leaving
+    cell_rows, cell_cols = np.divmod(cells, cols)
+    cell_directions = flow_directions.ravel()[cells]
+    for direction, (row_offset, col_offset) in FLOW_DIRECTIONS.items():
+        flowing = np.flatnonzero(cell_directions == direction)
+        target_rows = cell_rows[flowing] + row_offset
+        target_cols = cell_cols[flowing] + col_offset
+        inside = (target_rows >= 0) & (target_rows < rows) & (target_cols >= 0) & (target_cols < cols)
+        targets = target_rows * cols + target_cols
+        positions = np.minimum(np.searchsorted(cells, targets), cells.size - 1)
+        pointer[flowing] = np.where(inside, np.where(cells[positions] == targets, positions, reaching), leaving)
+    for _ in range(math.ceil(math.log2(pointer.size))):
+        doubled = pointer[pointer]
+        if np.array_equal(doubled, pointer):
+            break
+        pointer = doubled
+    return set(field_raster.ravel()[cells[pointer[:cells.size] == reaching]].tolist())
+
+
+def upstream_cells(cells, flow_directions):
+    """
+    Determines all cells whose flow path passes any of the given cells. The flow paths are traced upstream from the
+    given cells, so that the effort depends on the number of upstream cells only. Cells with undefined flow
+    directions are considered to pass run-off to all of their neighbors.
+
+    Args:
+        cells: A boolean raster of the cells to trace.
+        flow_directions: A raster of flow directions in ESRI encoding that is aligned with the cells.
+
+    Returns:
+        A boolean raster of the given cells and all cells upstream of them.
+    """
+    rows, cols = cells.shape
+    upstream = cells.copy()
+    undefined = ~np.isin(flow_directions, list(FLOW_DIRECTIONS))
+    frontier = np.flatnonzero(cells)
+    while frontier.size > 0:
+        frontier_rows, frontier_cols = np.divmod(frontier, cols)
+        sources = []
+        for direction, (row_offset, col_offset) in FLOW_DIRECTIONS.items():
+            source_rows = frontier_rows - row_offset
+            source_cols = frontier_cols - col_offset
+            inside = (source_rows >= 0) & (source_rows < rows) & (source_cols >= 0) & (source_cols < cols)
+            source_rows, source_cols = source_rows[inside], source_cols[inside]
+            flowing = (flow_directions[source_rows, source_cols] == direction) | undefined[source_rows, source_cols]
+            sources.append(source_rows[flowing] * cols + source_cols[flowing])
+        frontier = np.unique(np.concatenate(sources))
+        frontier = frontier[~upstream.ravel()[frontier]]
+        upstream.ravel()[frontier] = True
+    return upstream
+
+
+def link_or_copy(source, destination):
+    """
+    Hard-links a file, or copies it if the file system does not support linking it.
+
+    Args:
+        source: The file path of the source file.
+        destination: The file path of the destination file.
+
+    Returns:
+        Nothing.
+    """
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def year_block_folder(work_unit, przm_folder):
+    """
+    Determines the folder into which the outputs of a year block are gathered.
+
+    Args:
+        work_unit: The work unit of the year block.
+        przm_folder: The output folder of the module.
+
+    Returns:
+        The folder path of the year block.
+    """
+    return os.path.join(przm_folder, os.path.basename(os.path.dirname(work_unit.output_folder)))
+
+
+def aggregate_blocks(values, resolution, out=None):
+    """
+    Aggregates square blocks of cells to coarser cells by averaging them. Cells beyond the edges of the values are
+    considered zero, so that the mass represented by the values is conserved.
+
+    Args:
+        values: A two-dimensional array of values per area.
+        resolution: The edge length of the blocks in cells.
+        out: An optional array of the aggregated shape to hold the result.
+
+    Returns:
+        The aggregated values.
+    """
+    rows, cols = -(-values.shape[0] // resolution), -(-values.shape[1] // resolution)
+    if values.shape != (rows * resolution, cols * resolution):
+        padded = np.zeros((rows * resolution, cols * resolution), values.dtype)
+        padded[:values.shape[0], :values.shape[1]] = values
+        values = padded
+    out = np.sum(values.reshape(rows, resolution, cols, resolution), (1, 3), out=out)
+    out *= 1 / resolution ** 2
+    return out
+
+
+@contextlib.asynccontextmanager
+async def unlimited_slot():
+    """
+    Acquires a slot without limit, which stands in for an omitted semaphore. Unlike `contextlib.nullcontext`, it
+    supports asynchronous use before Python 3.10.
+
+    Returns:
+        A generator that yields once.
+    """
+    yield
+
+
+async def run_components(components, module_slots=1, stage_slots=1):
+    """
+    Runs several RunOffPrzm components concurrently. While the module executables of one component run, other
+    components prepare their module inputs or merge their module outputs. Components acquire the limited slots in the
+    order in which they are passed.
+
+    Args:
+        components: The components to run.
+        module_slots: The maximum number of concurrently running module executables.
+        stage_slots: The maximum number of concurrent preparation and merging stages.
+
+    Returns:
+        Nothing.
+    """
+    module_semaphore = asyncio.Semaphore(module_slots)
+    stage_semaphore = asyncio.Semaphore(stage_slots)
+    await asyncio.gather(*(component.run_async(module_semaphore, stage_semaphore) for component in components))
+
+
+RunState = collections.namedtuple("RunState", (
+    "processing_path",
+    "input_path",
+    "przm_folder",
+    "przm_config",
+    "merge_plan",
+    "manifest",
+    "simulated",
+    "reused_fields",
+    "fingerprints",
+    "disk_usage",
+    "work_units"
+))
+
+
+WorkUnit = collections.namedtuple("WorkUnit", (
+    "name",
+    "input_path",
+    "output_folder",
+    "temporary_output_path",
+    "log_file",
+    "commands",
+    "window",
+    "warm_up_days",
+    "reference",
+    "fields"
+))
+
+
+MergePlan = collections.namedtuple(
+    "MergePlan", ("shape", "chunks", "tile_rows", "tile_cols", "buffer_days", "resolution"))
+
+
+class DailySummary:
+    """
+    Accumulates per-day statistics of the exposure while it is merged tile by tile.
+    """
+    # The area of an exposure cell at full resolution in hectares
+    CELL_AREA = 1e-4
+
+    def __init__(self, summary_file, shape, resolution=1):
+        """
+        Initializes a DailySummary.
+
+        Args:
+            summary_file: The file path in which the summary is persisted for resumed runs.
+            shape: The shape of the exposure.
+            resolution: The edge length of the exposure cells in meters.
+        """
+        self._summary_file = summary_file
+        self._cell_area = self.CELL_AREA * resolution ** 2
+        self.mass = np.zeros(shape[2], np.float64)
+        self.unencoded_mass = np.zeros(shape[2], np.float64)
+        self.maximum = np.zeros(shape[2], np.float32)
+        self.cells = np.zeros(shape[2], np.int64)
+        self.first_row = np.full(shape[2], shape[0], np.int32)
+        self.last_row = np.full(shape[2], -1, np.int32)
+        self.first_col = np.full(shape[2], shape[1], np.int32)
+        self.last_col = np.full(shape[2], -1, np.int32)
+
+    def update(self, exposure, row, col, first_day):
+        """
+        Accounts a merged tile of the exposure.
+
+        Args:
+            exposure: The merged exposure of the tile for a batch of days.
+            row: The first row of the tile.
+            col: The first column of the tile.
+            first_day: The first day of the batch.
+
+        Returns:
+            Nothing.
+        """
+        days = slice(first_day, first_day + exposure.shape[2])
+        self.mass[days] += exposure.sum((0, 1), np.float64) * self._cell_area
+        np.maximum(self.maximum[days], exposure.max((0, 1)), out=self.maximum[days])
+        exposed = exposure > 0
+        self.cells[days] += exposed.sum((0, 1))
+        bounds = ((1, row, self.first_row, self.last_row), (0, col, self.first_col, self.last_col))
+        for axis, offset, first, last in bounds:
+            exposed_lines = exposed.any(axis)
+            any_exposed = exposed_lines.any(0)
+            first_line = np.argmax(exposed_lines, 0) + offset
+            last_line = exposed_lines.shape[0] - 1 - np.argmax(exposed_lines[::-1], 0) + offset
+            first[days] = np.where(any_exposed, np.minimum(first[days], first_line), first[days])
+            last[days] = np.where(any_exposed, np.maximum(last[days], last_line), last[days])
+
+    def account_unencoded(self, exposure, first_day):
+        """
+        Accounts the deposited mass of a merged tile before it is encoded for storage. The tile itself is accounted
+        by the `update` method after encoding.
+
+        Args:
+            exposure: The merged exposure of the tile for a batch of days.
+            first_day: The first day of the batch.
+
+        Returns:
+            Nothing.
+        """
+        self.unencoded_mass[first_day:first_day + exposure.shape[2]] += exposure.sum(
+            (0, 1), np.float64) * self._cell_area
+
+    def extent(self):
+        """
+        Gets the bounding boxes of exposed cells.
+
+        Returns:
+            An array of first row, last row plus one, first column and last column plus one per day.
+        """
+        extent = np.stack((self.first_row, self.last_row + 1, self.first_col, self.last_col + 1), 1)
+        extent[self.cells == 0] = 0
+        return extent
+
+    def save(self):
+        """
+        Persists the summary.
+
+        Returns:
+            Nothing.
+        """
+        with open(self._summary_file + ".tmp", "wb") as f:
+            np.savez(f, **{name: values for name, values in vars(self).items() if not name.startswith("_")})
+        os.replace(self._summary_file + ".tmp", self._summary_file)
+
+    def load(self, merged_days):
+        """
+        Loads a previously persisted summary. Only the statistics of merged days are loaded, as the summary may
+        already account days that an interrupted run did not record as merged and that are, therefore, merged again.
+
+        Args:
+            merged_days: The days that were recorded as merged.
+
+        Returns:
+            Nothing.
+        """
+        if os.path.exists(self._summary_file):
+            merged = np.zeros(self.mass.size, bool)
+            merged[list(merged_days)] = True
+            with np.load(self._summary_file) as summary:
+                for name in summary.files:
+                    getattr(self, name)[merged] = summary[name][merged]
+
+
+class StorageEncoding:
+    """
+    Encodes exposure for storage by dropping values below a threshold and optionally quantizing the remaining values
+    as logarithmic 16-bit codes.
+    """
+    # The range of values in g/ha that quantized exposure can represent
+    QUANTIZATION_RANGE = (1e-6, 1e6)
+
+    def __init__(self, threshold, quantization):
+        """
+        Initializes a StorageEncoding.
+
+        Args:
+            threshold: The value below which exposure is stored as zero.
+            quantization: The quantization of stored values, either `none` or `log_uint16`.
+        """
+        self.threshold = threshold
+        self.quantized = quantization == "log_uint16"
+        self.offset = math.log(max(threshold, self.QUANTIZATION_RANGE[0]))
+        # code 0 represents no exposure, the remaining codes cover the quantization range
+        self.scale = (math.log(self.QUANTIZATION_RANGE[1]) - self.offset) / (np.iinfo(np.uint16).max - 1)
+
+    @property
+    def relative_error(self):
+        """
+        The maximum relative error of a quantized value.
+        """
+        return math.exp(self.scale / 2) - 1
+
+    def encode(self, exposure):
+        """
+        Encodes exposure for storage. Values below the threshold are set to zero in place, and quantized values are
+        replaced in place by the values that their codes represent, so that the exposure reflects the stored values
+        afterwards.
+
+        Args:
+            exposure: The exposure to encode.
+
+        Returns:
+            The values to store.
+        """
+        if self.quantized:
+            exposure[exposure < math.exp(self.offset)] = 0
+            exposed = exposure > 0
+            codes = np.zeros(exposure.shape, np.uint16)
+            codes[exposed] = np.clip(
+                np.rint((np.log(exposure[exposed]) - self.offset) / self.scale) + 1, 1, np.iinfo(np.uint16).max)
+            exposure[exposed] = self.decode(codes[exposed])
+            return codes
+        if self.threshold > 0:
+            exposure[exposure < self.threshold] = 0
+        return exposure
+
+    def decode(self, codes):
+        """
+        Decodes stored codes into exposure values.
+
+        Args:
+            codes: The stored codes.
+
+        Returns:
+            The exposure values.
+        """
+        return np.where(codes > 0, np.exp(self.offset + (codes.astype(np.float64) - 1) * self.scale), 0).astype(
+            np.float32)
+
+
+class ModuleOutputIndex:
+    """
+    A typed index of the exposure rasters written by the module. Each entry holds the field and day of a raster and
+    the window of the raster that contains exposure. The windows can be consolidated into a single archive of
+    compressed chunks, which then replaces the rasters.
+    """
+    # The data type of index entries
+    ENTRY = np.dtype([
+        ("field", np.int64),
+        ("day", np.int32),
+        ("row", np.int32),
+        ("col", np.int32),
+        ("rows", np.int32),
+        ("cols", np.int32),
+        ("mass", np.float64),
+        ("offset", np.int64),
+        ("size", np.int64)
+    ])
+    # The file name pattern of exposure rasters, which end with the day relative to the first simulated date
+    EXPOSURE_RASTER = re.compile(r"(\d{5})\.tif$")
+    # The number of cells up to which rows of a raster are read at once while indexing, unless a single block of the
+    # raster is larger
+    READ_CELLS = 2 ** 20
+
+    def __init__(self, entries, paths, archive_file=None):
+        """
+        Initializes a ModuleOutputIndex.
+
+        Args:
+            entries: An array of index entries.
+            paths: An array of the file paths of the indexed rasters.
+            archive_file: The file path of the archive that holds the windows, or `None` to read them from the rasters.
+        """
+        order = np.argsort(entries["day"], kind="stable")
+        self.entries = entries[order]
+        self.paths = paths[order]
+        self.archive_file = archive_file
+        self._archive = None
+        self._archive_lock = threading.Lock()
+
+    @classmethod
+    def build(cls, output_folders, archive_file=None):
+        """
+        Indexes the exposure rasters within output folders by reading each raster once in strips of blocks, so that
+        the memory needed does not depend on the size of the landscape. Windows with exposure are read a second
+        time if they are consolidated into an archive.
+
+        Args:
+            output_folders: A list of tuples of the field identifier and the output folder of the field. Folders that
+                do not exist are skipped.
+            archive_file: The file path of an archive into which the windows are consolidated, or `None`.
+
+        Returns:
+            The index.
+        """
+        entries = []
+        paths = []
+        with open(archive_file, "wb") if archive_file else contextlib.nullcontext() as archive:
+            for field, output_folder in output_folders:
+                try:
+                    names = sorted(os.listdir(output_folder))
+                except FileNotFoundError:
+                    continue
+                for name in names:
+                    match = cls.EXPOSURE_RASTER.search(name)
+                    if not match:
+                        continue
+                    path = os.path.join(output_folder, name)
+                    exposure_raster = gdal.Open(path, 0)
+                    band = exposure_raster.GetRasterBand(1)
+                    rows, cols = band.YSize, band.XSize
+                    block_rows = band.GetBlockSize()[1]
+                    strip_rows = min(max(cls.READ_CELLS // (cols * block_rows), 1) * block_rows, rows)
+                    buffer = np.empty(strip_rows * cols, np.float32)
+                    exposed_rows = None
+                    exposed_cols = np.zeros(cols, bool)
+                    mass = 0.
+                    for row in range(0, rows, strip_rows):
+                        strip = cls.read_strip(band, buffer, row, min(strip_rows, rows - row), 0, cols)
+                        strip_exposed_rows = np.flatnonzero(strip.any(1))
+                        if strip_exposed_rows.size > 0:
+                            exposed_rows = (
+                                row + strip_exposed_rows[0] if exposed_rows is None else exposed_rows[0],
+                                row + strip_exposed_rows[-1] + 1
+                            )
+                        exposed_cols |= strip.any(0)
+                        mass += strip.sum(dtype=np.float64)
+                    window = (0, 0, 0, 0)
+                    if exposed_rows is not None:
+                        exposed_cols = np.flatnonzero(exposed_cols)
+                        window = (
+                            exposed_rows[0],
+                            exposed_cols[0],
+                            exposed_rows[1] - exposed_rows[0],
+                            exposed_cols[-1] + 1 - exposed_cols[0]
+                        )
+                    offset, size = 0, 0
+                    if archive:
+                        offset = archive.tell()
+                        compressor = zlib.compressobj()
+                        for row in range(window[0], window[0] + window[2], strip_rows):
+                            archive.write(compressor.compress(cls.read_strip(
+                                band, buffer, row, min(strip_rows, window[0] + window[2] - row), window[1],
+                                window[3])))
+                        archive.write(compressor.flush())
+                        size = archive.tell() - offset
+                    del band, exposure_raster
+                    entries.append((
+                        int(field),
+                        int(match.group(1)),
+                        *window,
+                        mass * DailySummary.CELL_AREA,
+                        offset,
+                        size
+                    ))
+                    paths.append(path)
+        return cls(np.array(entries, cls.ENTRY), np.array(paths, str), archive_file)
+
+    @staticmethod
+    def read_strip(band, buffer, row, rows, col, cols):
+        """
+        Reads a window of a raster band into the start of a buffer and clips negative values to zero in place.
+
+        Args:
+            band: The raster band.
+            buffer: A flat array that can hold the window.
+            row: The first row of the window.
+            rows: The number of rows of the window.
+            col: The first column of the window.
+            cols: The number of columns of the window.
+
+        Returns:
+            The values of the window as a view of the buffer.
+        """
+        strip = buffer[:rows * cols].reshape(rows, cols)
+        band.ReadAsArray(int(col), int(row), int(cols), int(rows), buf_obj=strip)
+        return np.maximum(strip, 0, out=strip)
+
+    def save(self, index_file):
+        """
+        Persists the index.
+
+        Args:
+            index_file: The file path of the index.
+
+        Returns:
+            Nothing.
+        """
+        with open(index_file, "wb") as f:
+            np.savez(f, entries=self.entries, paths=self.paths, archive_file=np.array(self.archive_file or ""))
+
+    @classmethod
+    def load(cls, index_file):
+        """
+        Loads a persisted index.
+
+        Args:
+            index_file: The file path of the index.
+
+        Returns:
+            The index.
+        """
+        with np.load(index_file) as index:
+            return cls(index["entries"], index["paths"], str(index["archive_file"]) or None)
+
+    def days(self):
+        """
+        Gets the days for which the module wrote exposure rasters.
+
+        Returns:
+            A sorted list of days relative to the first simulated date.
+        """
+        return [int(day) for day in np.unique(self.entries["day"])]
+
+    def daily_mass(self, days):
+        """
+        Calculates the daily mass deposited according to the indexed rasters.
+
+        Args:
+            days: The number of simulated days.
+
+        Returns:
+            An array of the deposited mass in grams per day.
+        """
+        return np.bincount(self.entries["day"], self.entries["mass"], days)
+
+    def read_day(self, day, window=None):
+        """
+        Reads the exposure of all rasters of a day.
+
+        Args:
+            day: The day relative to the first simulated date.
+            window: An optional tuple of the first row, the end row, the first column and the end column to which
+                the values are restricted.
+
+        Returns:
+            A generator of tuples of the index entry, the values and the row and column of the first value for each
+            raster with exposure within the window.
+        """
+        first, last = np.searchsorted(self.entries["day"], (day, day + 1))
+        for i in range(first, last):
+            entry = self.entries[i]
+            first_row, end_row = entry["row"], entry["row"] + entry["rows"]
+            first_col, end_col = entry["col"], entry["col"] + entry["cols"]
+            if window:
+                first_row, end_row = max(first_row, window[0]), min(end_row, window[1])
+                first_col, end_col = max(first_col, window[2]), min(end_col, window[3])
+            if first_row >= end_row or first_col >= end_col:
+                continue
+            if self.archive_file:
+                with self._archive_lock:
+                    if self._archive is None:
+                        self._archive = open(self.archive_file, "rb")
+                    self._archive.seek(entry["offset"])
+                    chunk = self._archive.read(entry["size"])
+                values = np.frombuffer(zlib.decompress(chunk), np.float32).reshape(entry["rows"], entry["cols"])[
+                    first_row - entry["row"]:end_row - entry["row"], first_col - entry["col"]:end_col - entry["col"]]
+            else:
+                exposure_raster = gdal.Open(self.paths[i], 0)
+                values = exposure_raster.GetRasterBand(1).ReadAsArray(
+                    int(first_col), int(first_row), int(end_col - first_col), int(end_row - first_row))
+                np.maximum(values, 0, out=values)
+                del exposure_raster
+            yield entry, values, int(first_row), int(first_col)
+
+    def remove_rasters(self, days=None):
+        """
+        Deletes indexed rasters.
+
+        Args:
+            days: The days whose rasters are deleted, or `None` to delete all rasters.
+
+        Returns:
+            Nothing.
+        """
+        paths = self.paths if days is None else self.paths[np.isin(self.entries["day"], list(days))]
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class ContributionStore:
+    """
+    A sparse store of the contributions of individual fields to the exposure per day. Each record holds the window of
+    a module output raster that contains non-zero values. The windows are additionally kept in an R*Tree, so that the
+    contributions to a cell are found without scanning all records.
+    """
+    def __init__(self, database_file):
+        """
+        Initializes a ContributionStore.
+
+        Args:
+            database_file: The file path of the database. The database is created if it does not exist.
+        """
+        self._connection = sqlite3.connect(database_file)
+        indexed = self._connection.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'contribution_windows'").fetchone()[0]
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS contributions (
+                id INTEGER PRIMARY KEY,
+                field INTEGER NOT NULL,
+                day INTEGER NOT NULL,
+                row INTEGER NOT NULL,
+                col INTEGER NOT NULL,
+                rows INTEGER NOT NULL,
+                cols INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS contributions_field ON contributions (field, day);
+            CREATE INDEX IF NOT EXISTS contributions_day ON contributions (day);
+            CREATE VIRTUAL TABLE IF NOT EXISTS contribution_windows USING rtree_i32(
+                id, first_row, last_row, first_col, last_col);
+        """)
+        if not indexed:
+            # contributions recorded by previous versions are indexed once
+            self._connection.execute("""
+                INSERT INTO contribution_windows
+                SELECT rowid, row, row + rows - 1, col, col + cols - 1 FROM contributions""")
+            self._connection.commit()
+
+    def add(self, field, day, row, col, values):
+        """
+        Records the contribution of a field within a window of the exposure. Only the bounding box of the non-zero
+        values is stored.
+
+        Args:
+            field: The identifier of the field.
+            day: The day of the contribution relative to the first simulated date.
+            row: The row of the first value.
+            col: The column of the first value.
+            values: A two-dimensional array of contributed exposure.
+
+        Returns:
+            Nothing.
+        """
+        exposed_rows = np.flatnonzero(values.any(1))
+        if exposed_rows.size == 0:
+            return
+        exposed_cols = np.flatnonzero(values.any(0))
+        window = values[exposed_rows[0]:exposed_rows[-1] + 1, exposed_cols[0]:exposed_cols[-1] + 1]
+        first_row = int(row + exposed_rows[0])
+        first_col = int(col + exposed_cols[0])
+        cursor = self._connection.execute(
+            "INSERT INTO contributions (field, day, row, col, rows, cols, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                int(field),
+                int(day),
+                first_row,
+                first_col,
+                window.shape[0],
+                window.shape[1],
+                zlib.compress(np.ascontiguousarray(window, np.float32).tobytes())
+            )
+        )
+        self._connection.execute(
+            "INSERT INTO contribution_windows VALUES (?, ?, ?, ?, ?)",
+            (cursor.lastrowid, first_row, first_row + window.shape[0] - 1, first_col, first_col + window.shape[1] - 1)
+        )
+
+    def discard(self, days):
+        """
+        Removes all contributions of the given days.
+
+        Args:
+            days: The days relative to the first simulated date.
+
+        Returns:
+            Nothing.
+        """
+        days = [(int(day),) for day in days]
+        self._connection.executemany(
+            "DELETE FROM contribution_windows WHERE id IN (SELECT rowid FROM contributions WHERE day = ?)", days)
+        self._connection.executemany("DELETE FROM contributions WHERE day = ?", days)
+
+    def commit(self):
+        """
+        Persists all recorded contributions.
+
+        Returns:
+            Nothing.
+        """
+        self._connection.commit()
+
+    def close(self):
+        """
+        Persists all recorded contributions and closes the store.
+
+        Returns:
+            Nothing.
+        """
+        self._connection.commit()
+        self._connection.close()
+
+    def fields(self):
+        """
+        Gets the fields that contribute to the exposure.
+
+        Returns:
+            A sorted list of field identifiers.
+        """
+        return [field for field, in self._connection.execute("SELECT DISTINCT field FROM contributions ORDER BY 1")]
+
+    def field_contributions(self, field, day=None):
+        """
+        Gets the contributions of a field.
+
+        Args:
+            field: The identifier of the field.
+            day: The day to restrict the contributions to, or None for all days.
+
+        Returns:
+            A list of tuples of day, first row, first column and contributed values.
+        """
+        query = "SELECT day, row, col, rows, cols, data FROM contributions WHERE field = ?"
+        parameters = (int(field),)
+        if day is not None:
+            query += " AND day = ?"
+            parameters += (int(day),)
+        return [
+            (day, row, col, self._decode(rows, cols, data))
+            for day, row, col, rows, cols, data in self._connection.execute(query + " ORDER BY day", parameters)
+        ]
+
+    def cell_contributions(self, row, col, day=None):
+        """
+        Gets the contributions of all fields to a cell.
+
+        Args:
+            row: The row of the cell.
+            col: The column of the cell.
+            day: The day to restrict the contributions to, or None for all days.
+
+        Returns:
+            A list of tuples of field, day and contributed value.
+        """
+        query = """
+            SELECT field, day, row, col, cols, data FROM contribution_windows
+            JOIN contributions ON contributions.rowid = contribution_windows.id
+            WHERE first_row <= ? AND last_row >= ? AND first_col <= ? AND last_col >= ?"""
+        parameters = (int(row), int(row), int(col), int(col))
+        if day is not None:
+            query += " AND day = ?"
+            parameters += (int(day),)
+        contributions = []
+        for field, contribution_day, first_row, first_col, cols, data in self._connection.execute(query, parameters):
+            value = float(np.frombuffer(zlib.decompress(data), np.float32)[(row - first_row) * cols + col - first_col])
+            if value > 0:
+                contributions.append((field, contribution_day, value))
+        return sorted(contributions, key=lambda contribution: contribution[:2])
+
+    def recombine(self, day, shape, factors=None):
+        """
+        Recombines the exposure of a day from the contributions of individual fields.
+
+        Args:
+            day: The day relative to the first simulated date.
+            shape: The number of rows and columns of the exposure.
+            factors: An optional dictionary of factors per field by which the contributions of the field are scaled,
+                e.g., to consider field-level mitigation. Fields that are not listed contribute unscaled.
+
+        Returns:
+            The exposure of the day.
+        """
+        exposure = np.zeros(shape, np.float32)
+        for field, row, col, rows, cols, data in self._connection.execute(
+                "SELECT field, row, col, rows, cols, data FROM contributions WHERE day = ?", (int(day),)):
+            factor = 1 if factors is None else factors.get(field, 1)
+            exposure[row:row + rows, col:col + cols] += self._decode(rows, cols, data) * np.float32(factor)
+        return exposure
+
+    @staticmethod
+    def _decode(rows, cols, data):
+        """
+        Decodes the values of a stored contribution.
+
+        Args:
+            rows: The number of rows of the contribution.
+            cols: The number of columns of the contribution.
+            data: The compressed values.
+
+        Returns:
+            The values of the contribution.
+        """
+        return np.frombuffer(zlib.decompress(data), np.float32).reshape(rows, cols)
+
+
+class WorkQueue:
+    """
+    A queue of work units in a SQLite database from which worker processes claim and execute work units. Workers
+    regularly renew their claim while they execute a work unit, so that work units of crashed workers are claimed
+    again. A queue on a shared file system serves workers on several nodes if the file system supports SQLite
+    locking.
+    """
+    # The time in seconds after which a worker renews its claim of a work unit
+    HEARTBEAT_INTERVAL = 30
+    # The time in seconds without renewed claim after which a work unit can be claimed by another worker
+    STALE_TIME = 120
+
+    def __init__(self, database_file):
+        """
+        Initializes a WorkQueue.
+
+        Args:
+            database_file: The file path of the database. The database is created if it does not exist.
+        """
+        self.database_file = database_file
+        self._connection = sqlite3.connect(database_file, timeout=60, isolation_level=None)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS work_units (
+                name TEXT PRIMARY KEY,
+                commands TEXT NOT NULL,
+                working_directory TEXT NOT NULL,
+                log_file TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker TEXT,
+                heartbeat REAL,
+                return_code INTEGER,
+                submitted REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS work_units_status ON work_units (status, submitted);
+        """)
+
+    def submit(self, work_units):
+        """
+        Adds work units to the queue. Work units that are already queued are reset unless a worker executes them.
+
+        Args:
+            work_units: The work units to add.
+
+        Returns:
+            Nothing.
+        """
+        now = time.time()
+        with self._transaction():
+            self._connection.executemany(
+                """
+                INSERT INTO work_units (name, commands, working_directory, log_file, status, submitted)
+                VALUES (?, ?, ?, ?, 'pending', ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    commands = excluded.commands,
+                    working_directory = excluded.working_directory,
+                    log_file = excluded.log_file,
+                    status = 'pending',
+                    worker = NULL,
+                    heartbeat = NULL,
+                    return_code = NULL,
+                    submitted = excluded.submitted
+                WHERE status != 'running'
+                """,
+                [
+                    (
+                        work_unit.name,
+                        json.dumps(work_unit.commands),
+                        os.path.dirname(work_unit.log_file),
+                        work_unit.log_file,
+                        now
+                    )
+                    for work_unit in work_units
+                ]
+            )
+
+    def statuses(self, names):
+        """
+        Gets the statuses of queued work units.
+
+        Args:
+            names: The names of the work units.
+
+        Returns:
+            A dictionary of a tuple of the status and the last return code per name of a queued work unit.
+        """
+        names = list(names)
+        statuses = {}
+        for i in range(0, len(names), 500):
+            batch = names[i:i + 500]
+            for name, status, return_code in self._connection.execute(
+                    "SELECT name, status, return_code FROM work_units WHERE name IN ({})".format(
+                        ", ".join("?" * len(batch))),
+                    batch):
+                statuses[name] = (status, return_code)
+        return statuses
 
-    def write_przm_weather_file(self, output_file):
+    def claim(self, worker):
         """
-        Prepares the weather input.
+        Claims the next pending work unit or a work unit of a stale worker.
 
         Args:
-            output_file: The file path of the weather input.
+            worker: The name of the claiming worker.
 
         Returns:
-            Nothing.
+            A tuple of the name, the command lines, the working directory and the log file of the claimed work unit or
+            `None` if there is no work unit to claim.
         """
-        start_date = self.inputs["Options_StartDate"].read().values
-        end_date = self.inputs["Options_EndDate"].read().values
-        precipitation = self._inputs["Weather_Precipitation"].read()
-        et0 = self._inputs["Weather_ET0"].read()
-        temperature = self._inputs["Weather_Temperature"].read()
-        wind_speed = self._inputs["Weather_WindSpeed"].read()
-        radiation = self._inputs["Weather_SolarRadiation"].read()
-        weather_file = open(output_file, "w")
-        for i in range((end_date - start_date).days + 1):
-            date = start_date + datetime.timedelta(i)
-            mapped_date = self.convert_to_przm_date(date, end_date)
-            weather_file.write(" {:02d}{:02d}{:02d}{:>10.4f}{:>10.4f}{:>10.4f}{:>10.4f}{:>10.4f}\n".format(
-                mapped_date.month,
-                mapped_date.day,
-                mapped_date.year - 1900,
-                precipitation.values[i] / 10,
-                et0.values[i] / 10,
-                temperature.values[i],
-                wind_speed.values[i] * 100,
-                radiation.values[i] / 41.84))
-        weather_file.close()
+        now = time.time()
+        with self._transaction():
+            row = self._connection.execute(
+                """
+                SELECT name, commands, working_directory, log_file FROM work_units
+                WHERE status = 'pending' OR (status = 'running' AND heartbeat < ?)
+                ORDER BY submitted, name LIMIT 1
+                """,
+                (now - self.STALE_TIME,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE work_units SET status = 'running', worker = ?, heartbeat = ? WHERE name = ?",
+                (worker, now, row[0])
+            )
+        return row[0], json.loads(row[1]), row[2], row[3]
 
-    def write_field_parameters_file(self, output_file):
+    def renew(self, name, worker):
         """
-        Prepares the field parameters.
+        Renews the claim of a worker on a work unit.
 
         Args:
-            output_file: Te file path of the field parameters.
+            name: The name of the work unit.
+            worker: The name of the worker.
 
         Returns:
             Nothing.
         """
-        applied_fields = self.inputs["Ppm_AppliedFields"].read().values
-        slope = self.inputs["Fields_Slope"].read()
-        soil_horizon_thicknesses = self.inputs["Fields_SoilHorizonThicknesses"].read()
-        soil_horizon_bulk_densities = self.inputs["Fields_SoilHorizonBulkDensities"].read()
-        soil_horizon_organic_material_contents = self.inputs["Fields_SoilHorizonOrganicMaterialContents"].read()
-        soil_horizon_sand_fractions = self.inputs["Fields_SoilHorizonSandFractions"].read()
-        soil_horizon_silt_fractions = self.inputs["Fields_SoilHorizonSiltFractions"].read()
-        fields = xml.etree.ElementTree.Element("fields")
-        field_ids = set(applied_fields)
-        for fieldId in field_ids:
-            field = xml.etree.ElementTree.SubElement(fields, "field", {"id": str(fieldId)})
-            xml.etree.ElementTree.SubElement(field, "slope").text = str(slope.values)
-            soil_horizons = xml.etree.ElementTree.SubElement(field, "soil_horizons")
-            for soilHorizonId in range(len(soil_horizon_thicknesses.values)):
-                soil_horizon = xml.etree.ElementTree.SubElement(soil_horizons,
-                                                                "soil_horizon",
-                                                                {"id": str(soilHorizonId + 1)})
-                xml.etree.ElementTree.SubElement(soil_horizon, "thickness").text = str(
-                    soil_horizon_thicknesses.values[soilHorizonId])
-                xml.etree.ElementTree.SubElement(soil_horizon, "BD").text = str(
-                    soil_horizon_bulk_densities.values[soilHorizonId])
-                xml.etree.ElementTree.SubElement(soil_horizon, "omc").text = str(
-                    soil_horizon_organic_material_contents.values[soilHorizonId])
-                xml.etree.ElementTree.SubElement(soil_horizon, "sand").text = str(
-                    soil_horizon_sand_fractions.values[soilHorizonId])
-                xml.etree.ElementTree.SubElement(soil_horizon, "silt").text = str(
-                    soil_horizon_silt_fractions.values[soilHorizonId])
-        xml.etree.ElementTree.ElementTree(fields).write(output_file, encoding="utf-8", xml_declaration=True)
+        self._connection.execute(
+            "UPDATE work_units SET heartbeat = ? WHERE name = ? AND worker = ?", (time.time(), name, worker))
 
-    def write_field_raster(self, output_file):
+    def finish(self, name, worker, return_code):
         """
-        Prepares the field raster.
+        Records that a worker finished executing a work unit.
 
         Args:
-            output_file: The file path of the field raster.
+            name: The name of the work unit.
+            worker: The name of the worker.
+            return_code: The return code of the last command line of the work unit.
 
         Returns:
             Nothing.
         """
-        applied_fields = self.inputs["Ppm_AppliedFields"].read().values
-        field_geometries = self.inputs["Fields_Geometries"].read()
-        feature_ids = self.inputs["Fields_Ids"].read()
-        extent = self.inputs["Fields_Extent"].read().values
-        crs = self.inputs["Fields_Crs"].read()
-        in_field_margin = self.inputs["Fields_InFieldMargin"].read().values
-        spatial_reference = osr.SpatialReference()
-        spatial_reference.ImportFromWkt(crs.values)
-        applied_fields = set(applied_fields)
-        ogr_driver = ogr.GetDriverByName("MEMORY")
-        ogr_data_set = ogr_driver.CreateDataSource("memory")
-        ogr_layer = ogr_data_set.CreateLayer("filtered", spatial_reference, ogr.wkbPolygon)
-        ogr_layer.CreateField(ogr.FieldDefn("Id", ogr.OFTInteger))
-        ogr_layer_definition = ogr_layer.GetLayerDefn()
-        for i in range(len(feature_ids.values)):
-            if feature_ids.values[i] in applied_fields:
-                applied_field = ogr.Feature(ogr_layer_definition)
-                applied_field.SetGeometry(ogr.CreateGeometryFromWkb(field_geometries.values[i]).Buffer(
-                    -in_field_margin))
-                applied_field.SetField("Id", feature_ids.values[i])
-                ogr_layer.CreateFeature(applied_field)
-        raster_cols = int(round(extent[1] - extent[0]))
-        raster_rows = int(round(extent[3] - extent[2]))
-        raster_driver = gdal.GetDriverByName("GTiff")
-        raster_data_set = raster_driver.Create(output_file, raster_cols, raster_rows, 1, 2, ["COMPRESS=LZW"])
-        raster_data_set.SetGeoTransform((extent[0], 1, 0, extent[3], 0, -1))
-        raster_band = raster_data_set.GetRasterBand(1)
-        raster_band.SetNoDataValue(65535)
-        raster_data_set.SetProjection(crs.values)
-        gdal.RasterizeLayer(raster_data_set, [1], ogr_layer, burn_values=[0], options=["ATTRIBUTE=Id"])
-        del raster_data_set
+        self._connection.execute(
+            "UPDATE work_units SET status = 'done', return_code = ? WHERE name = ? AND worker = ?",
+            (return_code, name, worker)
+        )
 
-    def write_cropping_statistics(self, output_file):
+    def close(self):
         """
-        Prepares the cropping statistic.
-
-        Args:
-            output_file: The file path of the cropping statistic.
+        Closes the database.
 
         Returns:
             Nothing.
         """
-        applied_fields_input = self.inputs["Ppm_AppliedFields"].read().values
-        cropping_statistics = xml.etree.ElementTree.Element("CroppingStatistic")
-        applied_fields = set(applied_fields_input)
-        for appliedField in applied_fields:
-            cropping = xml.etree.ElementTree.SubElement(cropping_statistics, "Cropping")
-            xml.etree.ElementTree.SubElement(cropping, "Field").text = str(appliedField)
-            xml.etree.ElementTree.SubElement(cropping, "DateFrom").text = "1900-01-01"
-            xml.etree.ElementTree.SubElement(cropping, "DateTo").text = "1999-12-31"
-            xml.etree.ElementTree.SubElement(cropping, "Crop").text = "Cereals,Winter"
-        xml.etree.ElementTree.ElementTree(cropping_statistics).write(output_file,
-                                                                     encoding="utf-8",
-                                                                     xml_declaration=True)
+        self._connection.close()
 
-    def write_ppp_repository(self, output_file):
+    @contextlib.contextmanager
+    def _transaction(self):
         """
-        Prepares the PPP repository.
+        Runs statements in a transaction that holds the write lock of the database from its start.
+
+        Returns:
+            A context manager of the transaction.
+        """
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+
+def run_worker(database_file, exit_when_empty=False, poll_interval=5):
+    """
+    Executes work units of a work queue until the queue holds no more work or, if the worker does not exit when the
+    queue is empty, forever. The console output of a work unit is appended to its log file.
+
+    Args:
+        database_file: The file path of the work queue database.
+        exit_when_empty: Specifies whether the worker exits if there is no work unit to claim.
+        poll_interval: The time in seconds between two attempts to claim a work unit.
+
+    Returns:
+        Nothing.
+    """
+    work_queue = WorkQueue(database_file)
+    worker = "{}:{}".format(socket.gethostname(), os.getpid())
+    while True:
+        work_unit = work_queue.claim(worker)
+        if work_unit is None:
+            if exit_when_empty:
+                break
+            time.sleep(poll_interval)
+            continue
+        name, commands, working_directory, log_file = work_unit
+        return_code = None
+        with open(log_file, "a") as log:
+            for command in commands:
+                process = subprocess.Popen(command, cwd=working_directory, stdout=log, stderr=subprocess.STDOUT)
+                while True:
+                    try:
+                        return_code = process.wait(WorkQueue.HEARTBEAT_INTERVAL)
+                        break
+                    except subprocess.TimeoutExpired:
+                        work_queue.renew(name, worker)
+                if return_code != 0:
+                    # later command lines depend on the outputs of the failed one
+                    break
+        # the outcome of a work unit is judged by the component from the outputs of the module
+        work_queue.finish(name, worker, return_code)
+    work_queue.close()
+
+
+class OptionalInput(base.Input):
+    """
+    An input that provides a default value as long as no provider is connected to it, so that existing model
+    compositions run without setting the input.
+    """
+
+    def __init__(self, name, attributes, default_observer, default, description=None):
+        """
+        Initializes an OptionalInput.
 
         Args:
-            output_file: The file path of the PPP repository.
+            name: The name of the input.
+            attributes: The attributes of the input.
+            default_observer: The default observer of the input.
+            default: A tuple of the default value and its physical unit.
+            description: The description of the input, which is completed by the default value.
+        """
+        value, unit = default
+        super(OptionalInput, self).__init__(
+            name,
+            attributes,
+            default_observer,
+            description="{}\nThe input is optional and defaults to {}.".format(
+                description, "`{}`{}".format(value, " " + unit if unit else "") if value != "" else "an empty string")
+        )
+        self.default = base.Values(value, None, unit=unit, scales="global")
+
+    def read(self, **keywords):
+        """
+        Reads the values of the input.
+
+        Args:
+            **keywords: The keyword arguments of the value retrieval.
 
         Returns:
-            Nothing.
+            The values of the connected provider, or the default value if no provider is connected.
         """
-        ppp_repository = xml.etree.ElementTree.Element("PppRepository")
-        ppp = xml.etree.ElementTree.SubElement(ppp_repository, "PPP")
-        xml.etree.ElementTree.SubElement(ppp, "Name").text = "PPP"
-        active_ingredients = xml.etree.ElementTree.SubElement(ppp, "ActiveIngredients")
-        active_ingredient = xml.etree.ElementTree.SubElement(active_ingredients, "ActiveIngredient")
-        xml.etree.ElementTree.SubElement(active_ingredient, "Name").text = self.inputs["SubstanceName"].read().values
-        xml.etree.ElementTree.SubElement(active_ingredient, "MassFraction").text = "1"
-        xml.etree.ElementTree.ElementTree(ppp_repository).write(output_file, encoding="utf-8", xml_declaration=True)
+        if self.provider is None:
+            return self.default
+        return super(OptionalInput, self).read(**keywords)
+
+
+class ExposureOutput(base.Output):
+    """
+    An output whose values are calculated by a lazy source, if one is attached, and written to the store when they are
+    first read.
+    """
 
-    def write_ppm_calendar(self, output_file, applied_areas_path, spatial_ids):
+    def __init__(self, *args, **keywords):
         """
-        Prepares the PPM Calendar.
+        Initializes an ExposureOutput.
 
         Args:
-            output_file: The file path of the PPM calendar.
-            applied_areas_path: The file path to the applied geometries.
-            spatial_ids: Spatial identifiers of unique spatial extents of applications.
+            *args: The positional arguments of the base output.
+            **keywords: The keyword arguments of the base output.
+        """
+        super(ExposureOutput, self).__init__(*args, **keywords)
+        self.lazy_source = None
+
+    def get_values(self, *args, **keywords):
+        """
+        Gets the values of the output. If a lazy source is attached, the chunks that contain the requested values are
+        calculated and stored first, and the values are then retrieved from the store.
+
+        Args:
+            *args: The positional arguments of the value retrieval, which are not supported with a lazy source.
+            **keywords: The keyword arguments of the value retrieval.
 
         Returns:
-            Nothing.
+            The requested values.
         """
-        applied_fields = self.inputs["Ppm_AppliedFields"].read().values
-        application_dates = self.inputs["Ppm_ApplicationDates"].read().values
-        application_rates = self.inputs["Ppm_ApplicationRates"].read().values
-        simulation_end = self.inputs["Options_EndDate"].read().values
-        ppm_calendar = xml.etree.ElementTree.Element("PpmCalendar")
-        for i in range(len(applied_fields)):
-            spray_application_element = xml.etree.ElementTree.SubElement(ppm_calendar, "SprayApplication")
-            xml.etree.ElementTree.SubElement(spray_application_element, "Date").text = str(
-                self.convert_to_przm_date(datetime.date.fromordinal(application_dates[i]), simulation_end))
-            xml.etree.ElementTree.SubElement(spray_application_element, "Field").text = str(applied_fields[i])
-            xml.etree.ElementTree.SubElement(spray_application_element, "PPP").text = "PPP"
-            xml.etree.ElementTree.SubElement(spray_application_element,
-                                             "ApplicationRate").text = str(application_rates[i])
-            xml.etree.ElementTree.SubElement(spray_application_element, "ApplicationExtent").text = os.path.join(
-                applied_areas_path, str(spatial_ids[i]).replace("-", "a") + ".tif")
-        xml.etree.ElementTree.ElementTree(ppm_calendar).write(output_file, encoding="utf-8", xml_declaration=True)
+        if self.lazy_source is not None:
+            if args:
+                raise TypeError("Values of a lazily calculated Exposure can only be requested by keyword arguments")
+            self.lazy_source.store_chunks(self, keywords.get("slices"))
+        return super(ExposureOutput, self).get_values(*args, **keywords)
 
-    def write_crop_parameters(self, output_file):
+
+class LazyExposure:
+    """
+    Calculates exposure from the module output rasters on demand, keeping recently read days in a cache.
+    """
+
+    def __init__(self, output_index, shape, cache_days, resolution=1, chunks=None):
         """
-        Prepares the crop parameters.
+        Initializes a LazyExposure.
 
         Args:
-            output_file: The file path of the crop parameters.
+            output_index: The index of the module outputs.
+            shape: The shape of the exposure.
+            cache_days: The maximum number of days kept in the cache.
+            resolution: The edge length of the exposure cells in meters.
+            chunks: The chunk shape of the stored exposure or `None` to store all values at once.
+        """
+        self._index = output_index
+        self._days = set(output_index.days())
+        self._shape = shape
+        self._resolution = resolution
+        self._cache_days = cache_days
+        self._cache = collections.OrderedDict()
+        self._chunks = tuple(min(chunk, size) for chunk, size in zip(chunks or shape, shape))
+        self._stored_chunks = set()
+        self._maximum = 0.
+
+    def get_day(self, day):
+        """
+        Gets the exposure of a single day.
+
+        Args:
+            day: The index of the day.
 
         Returns:
-            Nothing.
+            The exposure of the day or `None` if there is no exposure at that day.
         """
-        crops = xml.etree.ElementTree.Element("crops")
-        pan_evaporation_factors = self.inputs["CropParameters_PanEvaporationFactors"].read().values
-        canopy_interceptions = self.inputs["CropParameters_CanopyInterceptions"].read().values
-        maximum_coverages = self.inputs["CropParameters_MaximumCoverages"].read().values
-        maximum_heights = self.inputs["CropParameters_MaximumHeights"].read().values
-        maximum_rooting_depths = self.inputs["CropParameters_MaximumRootingDepths"].read().values
-        fallows = self.inputs["CropParameters_Fallows"].read().values
-        cropping = self.inputs["CropParameters_Cropping"].read().values
-        residues = self.inputs["CropParameters_Residues"].read().values
-        emerging_dates = self.inputs["CropParameters_EmergenceDates"].read().values
-        maturation_dates = self.inputs["CropParameters_MaturationDates"].read().values
-        harvest_dates = self.inputs["CropParameters_HarvestDates"].read().values
-        fallow_dates = self.inputs["CropParameters_FallowDates"].read().values
-        water_mitigations = self.inputs["CropParameters_WaterMitigations"].read().values
-        sediment_mitigations = self.inputs["CropParameters_SedimentMitigations"].read().values
-        vfs_mod_lookup_tables = self.inputs["CropParameters_VfsModLookupTables"].read().values
-        for i, crop_name in enumerate(self.inputs["CropParameters_Crops"].read().values):
-            crop = xml.etree.ElementTree.SubElement(crops, "crop", {"name": crop_name})
-            # noinspection SpellCheckingInspection
-            xml.etree.ElementTree.SubElement(crop, "pan_evap_factor").text = str(pan_evaporation_factors[i])
-            xml.etree.ElementTree.SubElement(crop, "canopy_interception").text = str(canopy_interceptions[i])
-            xml.etree.ElementTree.SubElement(crop, "maximum_coverage").text = str(maximum_coverages[i])
-            xml.etree.ElementTree.SubElement(crop, "maximum_height").text = str(maximum_heights[i])
-            xml.etree.ElementTree.SubElement(crop, "maximum_rooting_depth").text = str(maximum_rooting_depths[i])
-            xml.etree.ElementTree.SubElement(crop, "USLEC_fallow").text = str(fallows[i])
-            xml.etree.ElementTree.SubElement(crop, "USLEC_cropping").text = str(cropping[i])
-            xml.etree.ElementTree.SubElement(crop, "USLEC_residue").text = str(residues[i])
-            xml.etree.ElementTree.SubElement(crop, "emergence_date").text = emerging_dates[i]
-            xml.etree.ElementTree.SubElement(crop, "maturation_date").text = maturation_dates[i]
-            xml.etree.ElementTree.SubElement(crop, "harvest_date").text = harvest_dates[i]
-            xml.etree.ElementTree.SubElement(crop, "fallow_date").text = fallow_dates[i]
-            xml.etree.ElementTree.SubElement(crop, "water_mitigation").text = str(water_mitigations[i])
-            xml.etree.ElementTree.SubElement(crop, "sediment_mitigation").text = str(sediment_mitigations[i])
-            xml.etree.ElementTree.SubElement(crop, "VFS_Mod_lookup_table").text = vfs_mod_lookup_tables[i]
-        xml.etree.ElementTree.ElementTree(crops).write(output_file, encoding="utf-8", xml_declaration=True)
+        if day not in self._days:
+            return None
+        if day in self._cache:
+            self._cache.move_to_end(day)
+            return self._cache[day]
+        # each module output is aggregated on its own, so that the day is never held at full resolution
+        exposure = np.zeros(self._shape[:2], np.float32)
+        resolution = self._resolution
+        for _, values, first_row, first_col in self._index.read_day(day):
+            if resolution > 1:
+                # the values are aligned to the aggregated cells they fall into
+                block = np.zeros(
+                    (first_row % resolution + values.shape[0], first_col % resolution + values.shape[1]), np.float32)
+                block[first_row % resolution:, first_col % resolution:] = values
+                values = aggregate_blocks(block, resolution)
+            row, col = first_row // resolution, first_col // resolution
+            exposure[row:row + values.shape[0], col:col + values.shape[1]] += values
+        if self._cache_days > 0:
+            self._cache[day] = exposure
+            if len(self._cache) > self._cache_days:
+                self._cache.popitem(False)
+        return exposure
 
-    def write_applied_area_raster(self, output_path, named_geometries):
+    def get_values(self, slices=None):
         """
-        Prepares the applied areas.
+        Gets exposure values.
 
         Args:
-            output_path: The file path of the applied area raster.
-            named_geometries: A dictionary of named geometries to write as raster.
+            slices: A tuple of slices along the y-, x- and time-axis or `None` to get all values.
 
         Returns:
-            Nothing.
+            The requested exposure values.
         """
-        os.makedirs(output_path)
-        extent = self.inputs["Fields_Extent"].read().values
-        crs = self.inputs["Fields_Crs"].read()
-        spatial_reference = osr.SpatialReference()
-        spatial_reference.ImportFromWkt(crs.values)
-        ogr_driver = ogr.GetDriverByName("MEMORY")
-        raster_cols = int(round(extent[1] - extent[0]))
-        raster_rows = int(round(extent[3] - extent[2]))
-        raster_driver = gdal.GetDriverByName("GTiff")
-        for i, applied_geometry in named_geometries.items():
-            ogr_data_set = ogr_driver.CreateDataSource("memory")
-            ogr_layer = ogr_data_set.CreateLayer("filtered", spatial_reference, ogr.wkbPolygon)
-            ogr_layer_definition = ogr_layer.GetLayerDefn()
-            applied_field = ogr.Feature(ogr_layer_definition)
-            applied_field.SetGeometry(ogr.CreateGeometryFromWkb(applied_geometry))
-            ogr_layer.CreateFeature(applied_field)
-            raster_data_set = raster_driver.Create(
-                os.path.join(output_path, str(i).replace("-", "a") + ".tif"),
-                raster_cols, raster_rows,
-                1,
-                1,
-                ["COMPRESS=LZW"]
-            )
-            raster_data_set.SetGeoTransform((extent[0], 1, 0, extent[3], 0, -1))
-            raster_band = raster_data_set.GetRasterBand(1)
-            raster_band.SetNoDataValue(0)
-            raster_data_set.SetProjection(crs.values)
-            gdal.RasterizeLayer(raster_data_set, [1], ogr_layer, burn_values=[1])
-            del raster_data_set
+        slices = tuple(slice(None) for _ in self._shape) if slices is None else slices
+        days = range(self._shape[2])[slices[2]]
+        rows = range(self._shape[0])[slices[0]]
+        cols = range(self._shape[1])[slices[1]]
+        values = np.zeros((len(rows), len(cols), len(days)), np.float32)
+        for i, day in enumerate(days):
+            exposure = self.get_day(day)
+            if exposure is not None:
+                values[:, :, i] = exposure[slices[0], slices[1]]
+        return values
 
-    def collect_spatial_application_info(self):
+    def store_chunks(self, output, slices=None):
         """
-        Collects information about the spatial extents of applied areas.
+        Calculates the chunks that contain the requested values and writes them to the output, unless they were
+        already stored. Chunks without exposed days are left empty. A chunk that raises the maximum of the stored
+        values is written with `calculate_max`, so that the store reports the maximum of all stored values.
+
+        Args:
+            output: The output to which the chunks are written.
+            slices: A tuple of slices along the y-, x- and time-axis or `None` to store all chunks.
 
         Returns:
-            A tuple containing a hash for each base geometry and a dictionary with the geometry per hash.
+            Nothing.
         """
-        applied_geometries = self.inputs["Ppm_AppliedAreas"].read().values
-        hashes = [0] * len(applied_geometries)
-        unique_geometries = {}
-        for i, applied_geometry in enumerate(applied_geometries):
-            hash_code = hash(applied_geometry)
-            hashes[i] = hash_code
-            unique_geometries[hash_code] = applied_geometry
-        return hashes, unique_geometries
+        slices = tuple(slice(None) for _ in self._shape) if slices is None else slices
+        ranges = [range(size)[axis_slice] for size, axis_slice in zip(self._shape, slices)]
+        if any(len(axis_range) == 0 for axis_range in ranges):
+            return
+        chunk_ranges = [
+            range(min(axis_range) // chunk, max(axis_range) // chunk + 1)
+            for axis_range, chunk in zip(ranges, self._chunks)
+        ]
+        for chunk_row in chunk_ranges[0]:
+            for chunk_col in chunk_ranges[1]:
+                for chunk_day in chunk_ranges[2]:
+                    if (chunk_row, chunk_col, chunk_day) in self._stored_chunks:
+                        continue
+                    chunk_slices = tuple(
+                        slice(i * chunk, min((i + 1) * chunk, size))
+                        for i, chunk, size in zip((chunk_row, chunk_col, chunk_day), self._chunks, self._shape)
+                    )
+                    if not self._days.intersection(range(chunk_slices[2].start, chunk_slices[2].stop)):
+                        self._stored_chunks.add((chunk_row, chunk_col, chunk_day))
+                        continue
+                    values = self.get_values(chunk_slices)
+                    maximum = float(values.max())
+                    output.set_values(
+                        values, slices=chunk_slices, create=False, calculate_max=maximum > self._maximum)
+                    self._maximum = max(self._maximum, maximum)
+                    self._stored_chunks.add((chunk_row, chunk_col, chunk_day))
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Executes work units of RunOffPrzm components.")
+    argument_parser.add_argument("work_queue", help="the file path of the work queue database")
+    argument_parser.add_argument(
+        "--exit-when-empty", action="store_true", help="exit once there is no work unit left to claim")
+    argument_parser.add_argument(
+        "--poll-interval", type=float, default=5, help="the time in seconds between attempts to claim work")
+    arguments = argument_parser.parse_args()
+    run_worker(arguments.work_queue, arguments.exit_when_empty, arguments.poll_interval)
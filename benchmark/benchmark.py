@@ -0,0 +1,427 @@
+"""
+Script for benchmarking the Python side of the RunOffPrzm component.
+
+The benchmark generates synthetic landscapes of configurable size, runs the component on them with a stand-in for the
+module executables (see `stand_in_module.py`) and times the individual stages of `RunOffPrzm.run`. It also times
+importing the component and constructing components in a fresh interpreter, as done by drivers that create a component
+per Monte Carlo run. Timings are compared against a baseline to catch performance regressions. Baselines depend on the
+machine and are therefore not part of the repository; store one with `--save-baseline` before changing the code. Unless
+disabled, the default landscape is also run as work units through two local workers, whose results have to match the
+run in a single process, and a work unit of a crashed worker has to be claimed again. The script has to be run within a
+Landscape Model environment, i.e., with the Landscape Model core on the Python path, like `document.py`.
+
+Usage:
+    python benchmark.py [--sweep fields|extent|days|applications] [--startup-components 1000] [--save-baseline]
+        [--tolerance 0.25] [--no-work-queue]
+"""
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from osgeo import gdal, ogr, osr
+import base
+import observer
+import stores
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import RunOffPrzm  # noqa: E402
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+STAND_IN = os.path.join(os.path.dirname(__file__), "stand_in_module.py")
+
+# The default landscape, varied by one parameter per sweep
+DEFAULT_CASE = {"fields": 50, "extent": 1000, "days": 365, "applications": 2}
+SWEEPS = {
+    "fields": [10, 50, 200],
+    "extent": [500, 1000, 2000],
+    "days": [365, 1461, 3653],
+    "applications": [1, 2, 4]
+}
+# The inputs of the case that runs the default landscape as work units through local workers
+WORK_QUEUE_OPTIONS = {"Options_WorkUnits": 4, "Options_LocalWorkers": 2}
+STAGES = ("preprocessing", "module", "output index", "merge", "output write")
+# The script that times the startup of the component in a fresh interpreter
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import RunOffPrzm
+imported = time.perf_counter()
+for i in range(int(sys.argv[1])):
+    RunOffPrzm.RunOffPrzm("RunOffPrzm", None, None)
+constructed = time.perf_counter()
+print(json.dumps({
+    "import": imported - start, "construction": constructed - imported, "gdal loaded": "osgeo" in sys.modules}))
+"""
+
+
+class StageTimer:
+    """
+    Accumulates the wall-clock time spent in the stages of a component run.
+    """
+
+    def __init__(self):
+        """
+        Initializes a StageTimer.
+        """
+        self.timings = {stage: 0. for stage in STAGES}
+
+    def wrap(self, stage, function):
+        """
+        Wraps a function so that its execution time is accounted to a stage.
+
+        Args:
+            stage: The name of the stage.
+            function: The function to wrap.
+
+        Returns:
+            The wrapped function.
+        """
+        def timed(*args, **keywords):
+            start = time.perf_counter()
+            try:
+                return function(*args, **keywords)
+            finally:
+                self.timings[stage] += time.perf_counter() - start
+        return timed
+
+
+def create_landscape(path, fields, extent, days, applications):
+    """
+    Creates the inputs of a synthetic landscape.
+
+    Args:
+        path: The folder in which to place the flow grid of the landscape.
+        fields: The number of fields in the landscape.
+        extent: The length of the square landscape in meters.
+        days: The number of simulated days.
+        applications: The number of applications per field.
+
+    Returns:
+        A dictionary of input values, physical units and scales per input name.
+    """
+    random = np.random.default_rng(0)
+    spatial_reference = osr.SpatialReference()
+    spatial_reference.ImportFromEPSG(32632)
+    crs = spatial_reference.ExportToWkt()
+    x_min, y_min = 400000., 5600000.
+    flow_grid = os.path.join(path, "flow.tif")
+    data_set = gdal.GetDriverByName("GTiff").Create(flow_grid, extent, extent, 1, 1, ["COMPRESS=LZW"])
+    data_set.SetGeoTransform((x_min, 1, 0, y_min + extent, 0, -1))
+    data_set.SetProjection(crs)
+    data_set.GetRasterBand(1).Fill(4)
+    del data_set
+    per_row = int(np.ceil(np.sqrt(fields)))
+    cell = extent / per_row
+    geometries = []
+    for i in range(fields):
+        left = x_min + (i % per_row) * cell + cell * .1
+        top = y_min + extent - (i // per_row) * cell - cell * .1
+        ring = ogr.Geometry(ogr.wkbLinearRing)
+        for x, y in ((left, top), (left + cell * .6, top), (left + cell * .6, top - cell * .5), (left, top - cell * .5),
+                     (left, top)):
+            ring.AddPoint_2D(x, y)
+        polygon = ogr.Geometry(ogr.wkbPolygon)
+        polygon.AddGeometry(ring)
+        geometries.append(bytes(polygon.ExportToWkb()))
+    start_date = datetime.date(2000, 1, 1)
+    end_date = start_date + datetime.timedelta(days - 1)
+    applied_fields = np.repeat(np.arange(1, fields + 1), applications)
+    application_dates = start_date.toordinal() + random.integers(0, days, applied_fields.size)
+    weather = {
+        "Weather_Precipitation": random.exponential(2, days) * (random.random(days) < .4),
+        "Weather_ET0": random.random(days) * 4,
+        "Weather_Temperature": 10 + 10 * np.sin(np.arange(days) / 365 * 2 * np.pi),
+        "Weather_WindSpeed": random.random(days) * 5,
+        "Weather_SolarRadiation": random.random(days) * 20000
+    }
+    crops = ["Cereals,Winter", "OffCrop"]
+    inputs = {
+        "ProcessingPath": (os.path.join(path, "processing"), None, "global"),
+        "Model_AdsorptionMethod": ("aged", None, "global"),
+        "Model_SoilTemperatureSimulation": (True, None, "global"),
+        "SubstanceName": ("CMP_A", None, "global"),
+        "Substance_PlantUptakeFactor": (0., "1/d", "global"),
+        "Substance_PesticideDissipationRateOfFoliage": (10., "1/d", "global"),
+        "Substance_FoliarWashOffCoefficient": (.5, "1/cm", "global"),
+        "Substance_HenryConstant": (.03, "1", "global"),
+        "Substance_VapourPressure": (.0001, "mPa", "global"),
+        "Substance_MolecularWeight": (304., "g/mol", "global"),
+        "Substance_WaterSolubility": (60., "mg/L", "global"),
+        "Substance_TemperatureAtWhichMeasured": (293., "K", "global"),
+        "Substance_FreundlichExponent": (1., "1", "global"),
+        "Substance_ReferenceMoistureForDT50Soil": (100., "%", "global"),
+        "Substance_SoilDT50": (20., "d", "global"),
+        "Substance_KocSoil": (100., "cm³/g", "global"),
+        "SprayApplication_PrzmApplicationMethod": ("soil", None, "global"),
+        "SprayApplication_IncorporationDepth": (4., "cm", "global"),
+        "Options_StartDate": (start_date, None, "global"),
+        "Options_EndDate": (end_date, None, "global"),
+        "Options_TemporaryOutputPath": (os.path.join(path, "tmp"), None, "global"),
+        "Options_DeleteTemporaryGrids": (True, None, "global"),
+        "Options_TimeoutSecPrzm": (100, "s", "global"),
+        "Options_ReportingThreshold": (.001, "mg", "global"),
+        "Options_DeleteAllInterimResults": (True, None, "global"),
+        "Fields_Slope": (3., "%", "global"),
+        "Fields_SoilHorizonThicknesses": ([30., 30., 40.], "cm", "other/soil_horizon"),
+        "Fields_SoilHorizonBulkDensities": ([1.35, 1.45, 1.48], "g/cm³", "other/soil_horizon"),
+        "Fields_SoilHorizonOrganicMaterialContents": ([1.2, .3, .1], "%", "other/soil_horizon"),
+        "Fields_SoilHorizonSandFractions": ([5., 6., 5.], "%", "other/soil_horizon"),
+        "Fields_SoilHorizonSiltFractions": ([82., 83., 84.], "%", "other/soil_horizon"),
+        "Fields_Geometries": (geometries, None, "space/base_geometry"),
+        "Fields_Ids": (list(range(1, fields + 1)), None, "space/base_geometry"),
+        "Fields_Crs": (crs, None, "global"),
+        "Fields_Extent": ((x_min, x_min + extent, y_min, y_min + extent), "metre", "space/extent"),
+        "Fields_FlowGrid": (flow_grid, None, "global"),
+        "Fields_InFieldMargin": (0., "m", "global"),
+        "Ppm_AppliedFields": (applied_fields, None, "other/application"),
+        "Ppm_ApplicationDates": (application_dates, None, "other/application"),
+        "Ppm_ApplicationRates": (np.full(applied_fields.size, 100.), "g/ha", "other/application"),
+        "Ppm_AppliedAreas": ([geometries[i - 1] for i in applied_fields], None, "other/application"),
+        "Options_ShowExtendedErrorInformation": (False, None, "global"),
+        "Options_MethodOfRunoffGeneration": ("PRZM", None, "global"),
+        "Options_UsePreSimulatedPrzmResults": (False, None, "global"),
+        "Options_UseOnePrzmModelPerGridCell": (False, None, "global"),
+        "Options_UseVfsMod": (False, None, "global"),
+        "CropParameters_Crops": (crops, None, "other/crop"),
+        "CropParameters_PanEvaporationFactors": ([.84, .84], "1", "other/crop"),
+        "CropParameters_CanopyInterceptions": ([.15, .15], "cm", "other/crop"),
+        "CropParameters_MaximumCoverages": ([90, 90], "%", "other/crop"),
+        "CropParameters_MaximumHeights": ([110, 110], "cm", "other/crop"),
+        "CropParameters_MaximumRootingDepths": ([130, 130], "cm", "other/crop"),
+        "CropParameters_Fallows": ([.9, .9], "1", "other/crop"),
+        "CropParameters_Cropping": ([.2, .2], "1", "other/crop"),
+        "CropParameters_Residues": ([.4, .4], "1", "other/crop"),
+        "CropParameters_EmergenceDates": (["12-11", "12-11"], None, "other/crop"),
+        "CropParameters_MaturationDates": (["10-06", "10-06"], None, "other/crop"),
+        "CropParameters_HarvestDates": (["31-07", "31-07"], None, "other/crop"),
+        "CropParameters_FallowDates": (["01-11", "01-11"], None, "other/crop"),
+        "CropParameters_WaterMitigations": ([0., -.086], "1", "other/crop"),
+        "CropParameters_SedimentMitigations": ([0., -.153], "1", "other/crop"),
+        "CropParameters_VfsModLookupTables": (["none", "none"], None, "other/crop"),
+        "Options_ProgressInterval": (10, "s", "global"),
+        "Options_StallWarningTime": (0, "s", "global"),
+        "Options_ResumeRun": (False, None, "global"),
+        "Options_ExposureChunking": ("maps", None, "global"),
+        "Options_ExposureChunkDays": (32, "d", "global"),
+        "Options_MergeMemoryLimit": (512, "MB", "global"),
+        "Options_LazyExposure": (False, None, "global"),
+        "Options_LazyCacheDays": (16, "d", "global"),
+        "Options_PreScreenApplications": (False, None, "global"),
+        "Options_PreScreenPrecipitationThreshold": (1.0, "mm/d", "global"),
+        "Options_PruneUnreachableFields": (False, None, "global"),
+        "Options_PreviousRun": ("", None, "global"),
+        "Options_ContributionStore": (False, None, "global"),
+        "Options_OutputResolution": (1, "m", "global"),
+        "Options_ExposureThreshold": (0.0, "g/ha", "global"),
+        "Options_ExposureQuantization": ("none", None, "global"),
+        "Options_StagingPath": ("", None, "global"),
+        "Options_DiskBudget": (0, "MB", "global"),
+        "Options_DeleteMergedRasters": (False, None, "global"),
+        "Options_WorkUnits": (0, None, "global"),
+        "Options_WorkQueue": ("", None, "global"),
+        "Options_LocalWorkers": (0, None, "global"),
+        "Options_YearBlockLength": (0, "a", "global"),
+        "Options_YearBlockWarmUp": (0, "d", "global"),
+        "Options_YearBlockValidation": (False, None, "global"),
+        "Options_RepackModuleOutput": (False, None, "global"),
+        "Options_ScratchCubePath": ("", None, "global")
+    }
+    weather_units = {
+        "Weather_Precipitation": "mm/d",
+        "Weather_ET0": "mm/d",
+        "Weather_Temperature": "°C",
+        "Weather_WindSpeed": "m/s",
+        "Weather_SolarRadiation": "kJ/(m²*d)"
+    }
+    for name, values in weather.items():
+        inputs[name] = (values, weather_units[name], "time/day")
+    return inputs
+
+
+def run_case(case, options=None):
+    """
+    Runs the component on a synthetic landscape and times its stages.
+
+    Args:
+        case: A dictionary of landscape parameters.
+        options: An optional dictionary of input values that override the inputs of the landscape.
+
+    Returns:
+        A tuple of a dictionary of execution times in seconds per stage and the deposited mass per day.
+    """
+    with tempfile.TemporaryDirectory() as path:
+        default_observer = observer.ConsoleObserver()
+        component = RunOffPrzm.RunOffPrzm(
+            "RunOffPrzm",
+            default_observer,
+            stores.InMemoryStore(),
+            ((sys.executable, STAND_IN, "przm"), (sys.executable, STAND_IN, "hydrofilter"))
+        )
+        inputs = create_landscape(path, **case)
+        for name, values in (options or {}).items():
+            inputs[name] = (values,) + inputs[name][1:]
+        for name, (values, unit, scales) in inputs.items():
+            component.inputs[name] = base.Values(values, None, unit=unit, scales=scales)
+        timer = StageTimer()
+        component.write_module_inputs = timer.wrap("preprocessing", component.write_module_inputs)
+        component.run_module = timer.wrap("module", component.run_module)
+        component.run_work_units = timer.wrap("module", component.run_work_units)
+        component.index_module_output = timer.wrap("output index", component.index_module_output)
+        component.write_exposure = timer.wrap("merge", component.write_exposure)
+        exposure = component.outputs["Exposure"]
+        exposure.set_values = timer.wrap("output write", exposure.set_values)
+        component.run()
+        daily_mass = component.outputs["DailyDepositedMass"].read().values
+    timer.timings["merge"] -= timer.timings["output write"]
+    return timer.timings, daily_mass
+
+
+def check_stale_claims():
+    """
+    Checks that a work unit claimed by a worker that stopped renewing its claim is executed by another worker once the
+    claim is stale, but not before.
+
+    Returns:
+        A list of regression descriptions.
+    """
+    regressions = []
+    with tempfile.TemporaryDirectory() as path:
+        marker = os.path.join(path, "executed.txt")
+        work_unit = RunOffPrzm.WorkUnit(
+            "stale claim",
+            path,
+            path,
+            path,
+            os.path.join(path, "work_unit.log"),
+            ((sys.executable, "-c", "open('executed.txt', 'w').close()"),),
+            None,
+            0,
+            False,
+            ()
+        )
+        work_queue = RunOffPrzm.WorkQueue(os.path.join(path, "work_queue.sqlite"))
+        work_queue.submit([work_unit])
+        work_queue.claim("crashed worker")
+        RunOffPrzm.run_worker(work_queue.database_file, exit_when_empty=True)
+        if os.path.exists(marker):
+            regressions.append("work queue: a work unit claimed by a live worker was executed again")
+        stale_time = RunOffPrzm.WorkQueue.STALE_TIME
+        RunOffPrzm.WorkQueue.STALE_TIME = 0
+        try:
+            RunOffPrzm.run_worker(work_queue.database_file, exit_when_empty=True)
+        finally:
+            RunOffPrzm.WorkQueue.STALE_TIME = stale_time
+        if not os.path.exists(marker) or work_queue.statuses([work_unit.name])[work_unit.name] != ("done", 0):
+            regressions.append("work queue: a work unit of a crashed worker was not claimed again")
+        work_queue.close()
+    return regressions
+
+
+def measure_startup(components):
+    """
+    Times importing the component module and constructing components in a fresh interpreter.
+
+    Args:
+        components: The number of components to construct.
+
+    Returns:
+        A dictionary of execution times in seconds for the import and the construction of all components, and whether
+        the import or construction loaded GDAL.
+    """
+    result = subprocess.run(
+        (sys.executable, "-c", STARTUP_SCRIPT, str(components)),
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        capture_output=True,
+        check=True,
+        text=True
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def compare(results, baseline, tolerance, minimum_difference=.05):
+    """
+    Compares benchmark results against a baseline.
+
+    Args:
+        results: The execution times per stage and case.
+        baseline: The baseline execution times per stage and case.
+        tolerance: The relative slow-down that is tolerated.
+        minimum_difference: The absolute slow-down in seconds below which differences are ignored.
+
+    Returns:
+        A list of regression descriptions.
+    """
+    regressions = []
+    for case, timings in results.items():
+        for stage, seconds in timings.items():
+            reference = baseline.get(case, {}).get(stage)
+            if reference is not None and seconds > reference * (1 + tolerance) and \
+                    seconds - reference > minimum_difference:
+                regressions.append(f"{case} / {stage}: {seconds:.3f}s (baseline {reference:.3f}s)")
+    return regressions
+
+
+def main():
+    """
+    Runs the benchmark from the command line.
+
+    Returns:
+        The exit code of the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sweep", choices=SWEEPS, nargs="*", default=list(SWEEPS))
+    parser.add_argument(
+        "--startup-components", type=int, default=1000, help="number of components constructed in the startup case")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as new baseline")
+    parser.add_argument("--tolerance", type=float, default=.25, help="tolerated relative slow-down")
+    parser.add_argument(
+        "--no-work-queue", action="store_true", help="skip running the default landscape through local workers")
+    args = parser.parse_args()
+    results = {}
+    regressions = []
+    startup = measure_startup(args.startup_components)
+    gdal_loaded = startup.pop("gdal loaded")
+    results[f"startup, components={args.startup_components}"] = startup
+    print(f"startup: import {startup['import']:.3f}s, construction {startup['construction']:.3f}s "
+          f"({startup['construction'] / args.startup_components * 1000:.3f}ms per component)")
+    if gdal_loaded:
+        regressions.append("constructing components loaded GDAL")
+    for sweep in args.sweep:
+        for value in SWEEPS[sweep]:
+            case = dict(DEFAULT_CASE, **{sweep: value})
+            name = ", ".join(f"{key}={value}" for key, value in case.items())
+            if name not in results:
+                results[name] = run_case(case)[0]
+                print(name + ": " + ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in results[name].items()))
+    if not args.no_work_queue:
+        name = ", ".join(f"{key}={value}" for key, value in dict(DEFAULT_CASE, **WORK_QUEUE_OPTIONS).items())
+        _, serial_mass = run_case(DEFAULT_CASE)
+        results[name], work_queue_mass = run_case(DEFAULT_CASE, WORK_QUEUE_OPTIONS)
+        print(name + ": " + ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in results[name].items()))
+        if not np.allclose(work_queue_mass, serial_mass):
+            regressions.append("work queue: the deposited mass differs from the run in a single process")
+        regressions += check_stale_claims()
+    for regression in regressions:
+        print("Regression: " + regression)
+    if args.save_baseline:
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(results, f, indent=2)
+        return 1 if regressions else 0
+    if not os.path.exists(BASELINE_FILE):
+        print(f"No baseline stored in {BASELINE_FILE}, skipping the comparison of timings; "
+              "run with --save-baseline to store one")
+        return 1 if regressions else 0
+    with open(BASELINE_FILE) as f:
+        timing_regressions = compare(results, json.load(f), args.tolerance)
+    for regression in timing_regressions:
+        print("Regression: " + regression)
+    return 1 if regressions or timing_regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
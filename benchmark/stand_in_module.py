@@ -0,0 +1,151 @@
+"""
+Stand-in for the PRZM_Runoff and HydroFilter_Runoff executables of the RunOffPrzm module.
+
+The stand-in reads the module parameterization prepared by the `RunOffPrzm` component and writes output in the layout
+of the actual module: a folder per applied field, sparse per-day exposure rasters in its `output` sub-folder, a module
+log next to the field folders and a `successful.txt` once the HydroFilter stage completed. It does not simulate any
+physical process and exists solely to benchmark the Python side of the component on systems that cannot run the module
+executables.
+
+Usage:
+    python stand_in_module.py przm|hydrofilter -ifile parameters.xml output_folder
+"""
+import datetime
+import os
+import sys
+import xml.etree.ElementTree
+import numpy as np
+from osgeo import gdal
+
+
+# The probability of a day with run-off after an application, decreasing with the time since application
+RUN_OFF_PROBABILITY = float(os.environ.get("STAND_IN_RUN_OFF_PROBABILITY", "0.2"))
+# The number of days after an application during which run-off may occur
+RUN_OFF_HORIZON = int(os.environ.get("STAND_IN_RUN_OFF_HORIZON", "60"))
+# The maximum distance in meters that run-off travels downslope of a field
+RUN_OFF_DISTANCE = int(os.environ.get("STAND_IN_RUN_OFF_DISTANCE", "30"))
+
+
+def read_parameters(parameter_file):
+    """
+    Reads the relevant parts of the module parameterization.
+
+    Args:
+        parameter_file: The file path of the module parameterization.
+
+    Returns:
+        A tuple of the simulation start date, the simulation end date, the file path of the field raster and a
+        dictionary of application dates per field.
+    """
+    parameters = xml.etree.ElementTree.parse(parameter_file).getroot()
+    start_date = datetime.date.fromisoformat(parameters.find("options/start_date").text)
+    end_date = datetime.date.fromisoformat(parameters.find("options/end_date").text)
+    field_raster = parameters.find("landscape/field_discretisation").text
+    applications = {}
+    ppm_calendar = xml.etree.ElementTree.parse(parameters.find("cropping/ppm_calendar").text).getroot()
+    for application in ppm_calendar.iter("SprayApplication"):
+        field = int(application.find("Field").text)
+        applications.setdefault(field, []).append(datetime.date.fromisoformat(application.find("Date").text))
+    return start_date, end_date, field_raster, applications
+
+
+def run_off_days(field, application_dates, start_date, end_date):
+    """
+    Draws the days with run-off of a field.
+
+    Args:
+        field: The identifier of the field.
+        application_dates: The dates of applications onto the field.
+        start_date: The first simulated date.
+        end_date: The last simulated date.
+
+    Returns:
+        A sorted list of day indices relative to the first simulated date.
+    """
+    random = np.random.default_rng(field)
+    simulation_length = (end_date - start_date).days + 1
+    days = set()
+    for application_date in application_dates:
+        first_day = (application_date - start_date).days
+        horizon = np.arange(RUN_OFF_HORIZON)
+        occurrences = random.random(RUN_OFF_HORIZON) < RUN_OFF_PROBABILITY * np.exp(-horizon / 20)
+        days.update(int(d) for d in first_day + horizon[occurrences] if 0 <= d < simulation_length)
+    return sorted(days)
+
+
+def simulate_przm(parameter_file, output_folder):
+    """
+    Mimics the PRZM stage by writing a run-off series per applied field and a module log.
+
+    Args:
+        parameter_file: The file path of the module parameterization.
+        output_folder: The output folder of the module.
+
+    Returns:
+        Nothing.
+    """
+    start_date, end_date, _, applications = read_parameters(parameter_file)
+    os.makedirs(output_folder, exist_ok=True)
+    with open(os.path.join(output_folder, "przm.log"), "w") as f:
+        f.write(f"PRZM simulation of {len(applications)} fields\n")
+    for i, (field, application_dates) in enumerate(sorted(applications.items())):
+        field_folder = os.path.join(output_folder, str(field))
+        os.makedirs(field_folder, exist_ok=True)
+        with open(os.path.join(field_folder, "runoff.txt"), "w") as f:
+            f.writelines(f"{day}\n" for day in run_off_days(field, application_dates, start_date, end_date))
+        print(f"PRZM field {field} finished ({i + 1}/{len(applications)})", flush=True)
+
+
+def simulate_hydro_filter(parameter_file, output_folder):
+    """
+    Mimics the HydroFilter stage by writing a sparse exposure raster per field and day with run-off.
+
+    Args:
+        parameter_file: The file path of the module parameterization.
+        output_folder: The output folder of the module.
+
+    Returns:
+        Nothing.
+    """
+    _, _, field_raster, applications = read_parameters(parameter_file)
+    fields_data_set = gdal.Open(field_raster)
+    fields = fields_data_set.GetRasterBand(1).ReadAsArray()
+    geo_transform = fields_data_set.GetGeoTransform()
+    projection = fields_data_set.GetProjection()
+    rows, cols = fields.shape
+    driver = gdal.GetDriverByName("GTiff")
+    for i, field in enumerate(sorted(applications)):
+        field_folder = os.path.join(output_folder, str(field))
+        field_output = os.path.join(field_folder, "output")
+        os.makedirs(field_output, exist_ok=True)
+        field_rows, field_cols = np.nonzero(fields == field)
+        if field_rows.size == 0:
+            continue
+        first_row = field_rows.max() + 1
+        last_row = min(first_row + RUN_OFF_DISTANCE, rows)
+        first_col = field_cols.min()
+        last_col = field_cols.max() + 1
+        with open(os.path.join(field_folder, "runoff.txt")) as f:
+            days = [int(line) for line in f]
+        random = np.random.default_rng(field)
+        for day in days:
+            data_set = driver.Create(
+                os.path.join(field_output, f"exposure_{day:05d}.tif"), cols, rows, 1, 6, ["COMPRESS=DEFLATE"])
+            data_set.SetGeoTransform(geo_transform)
+            data_set.SetProjection(projection)
+            band = data_set.GetRasterBand(1)
+            if first_row < last_row:
+                distance = np.arange(last_row - first_row, dtype=np.float32)[:, np.newaxis]
+                values = random.random((last_row - first_row, last_col - first_col), dtype=np.float32)
+                band.WriteArray(values * np.exp(-distance / 5) * 10, int(first_col), int(first_row))
+            del data_set
+        data_set = driver.Create(os.path.join(field_output, f"field_{field}_f_grd.tif"), 1, 1, 1, 6)
+        del data_set
+        print(f"HydroFilter field {field} finished ({i + 1}/{len(applications)})", flush=True)
+    with open(os.path.join(output_folder, "successful.txt"), "w") as f:
+        f.write("successful")
+
+
+if __name__ == "__main__":
+    stage, _, parameters_file, module_output_folder = sys.argv[1:5]
+    {"przm": simulate_przm, "hydrofilter": simulate_hydro_filter}[stage](parameters_file, module_output_folder)
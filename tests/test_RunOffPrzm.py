@@ -0,0 +1,304 @@
+"""
+Unit tests for the RunOffPrzm component.
+
+The tests cover the parts of the component that do not require the module executables or GDAL, like the planning of
+merges, the storage encoding, resumed runs, the work queue and the tracing of flow paths. They have to be run
+within a Landscape Model environment, i.e., with the Landscape Model core on the Python path, like `document.py`.
+
+Usage:
+    python -m unittest discover tests
+"""
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+import base
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import RunOffPrzm  # noqa: E402
+
+
+def create_component(**inputs):
+    """
+    Creates a component with the given input values.
+
+    Args:
+        **inputs: A tuple of the values, the physical unit and the scales per input name.
+
+    Returns:
+        The component.
+    """
+    component = RunOffPrzm.RunOffPrzm("RunOffPrzm", None, None)
+    for name, (values, unit, scales) in inputs.items():
+        component.inputs[name] = base.Values(values, None, unit=unit, scales=scales)
+    return component
+
+
+class TestPlanMerge(unittest.TestCase):
+    """
+    Tests the planning of memory-bounded merges.
+    """
+
+    @staticmethod
+    def plan(extent, days, memory_limit, chunking="maps", resolution=1, daily_maps=False):
+        """
+        Plans the merge of a square landscape.
+
+        Args:
+            extent: The length of the landscape in meters.
+            days: The number of simulated days.
+            memory_limit: The memory limit of the merge in MB.
+            chunking: The chunk layout of the exposure.
+            resolution: The output resolution in meters.
+            daily_maps: Specifies whether each chunk spans the entire landscape, regardless of the chunk sizes that
+                the Landscape Model core chooses.
+
+        Returns:
+            The merge plan.
+        """
+        start_date = datetime.date(2000, 1, 1)
+        component = create_component(
+            Options_StartDate=(start_date, None, "global"),
+            Options_EndDate=(start_date + datetime.timedelta(days - 1), None, "global"),
+            Fields_Extent=((400000., 400000. + extent, 5600000., 5600000. + extent), "metre", "space/extent"),
+            Options_OutputResolution=(resolution, "m", "global"),
+            Options_ExposureChunking=(chunking, None, "global"),
+            Options_ExposureChunkDays=(32, "d", "global"),
+            Options_MergeMemoryLimit=(memory_limit, "MB", "global"),
+            Options_ExposureQuantization=("none", None, "global")
+        )
+        if daily_maps:
+            component.exposure_chunks = lambda shape: (shape[0], shape[1], 1)
+        return component.plan_merge()
+
+    def assert_within_limit(self, plan, memory_limit):
+        """
+        Asserts that the buffers of a merge plan fit into the memory limit.
+
+        Args:
+            plan: The merge plan.
+            memory_limit: The memory limit of the merge in MB.
+
+        Returns:
+            Nothing.
+        """
+        read_depth = plan.resolution ** 2 + (1 if plan.resolution > 1 else 0)
+        self.assertLessEqual(
+            plan.tile_rows * plan.tile_cols * (plan.buffer_days + read_depth) * 4, memory_limit * 2 ** 20)
+        self.assertGreaterEqual(plan.buffer_days, 1)
+
+    def test_whole_landscape_fits(self):
+        plan = self.plan(1000, 365, 512)
+        self.assertEqual((plan.tile_rows, plan.tile_cols), plan.shape[:2])
+        self.assertEqual(plan.buffer_days % plan.chunks[2], 0)
+        self.assert_within_limit(plan, 512)
+
+    def test_memory_limits(self):
+        buffered_cells = []
+        for memory_limit in (16, 64, 256, 1024):
+            plan = self.plan(2000, 3653, memory_limit, "tiles")
+            self.assert_within_limit(plan, memory_limit)
+            if plan.tile_rows < plan.shape[0]:
+                self.assertEqual(plan.tile_rows % min(plan.chunks[0], plan.shape[0]), 0)
+            if plan.tile_cols < plan.shape[1]:
+                self.assertEqual(plan.tile_cols % min(plan.chunks[1], plan.shape[1]), 0)
+            buffered_cells.append(plan.tile_rows * plan.tile_cols * plan.buffer_days)
+        self.assertEqual(buffered_cells, sorted(buffered_cells))
+
+    def test_aggregated_output(self):
+        plan = self.plan(5000, 365, 64, resolution=5)
+        self.assertEqual(plan.shape[:2], (1000, 1000))
+        self.assert_within_limit(plan, 64)
+
+    def test_large_landscape(self):
+        for daily_maps in (False, True):
+            for memory_limit in (1, 64, 512):
+                plan = self.plan(20000, 365, memory_limit, daily_maps=daily_maps)
+                self.assert_within_limit(plan, memory_limit)
+                self.assertLess(plan.tile_rows * plan.tile_cols, plan.shape[0] * plan.shape[1])
+                if plan.tile_rows < min(plan.chunks[0], plan.shape[0]) or \
+                        plan.tile_cols < min(plan.chunks[1], plan.shape[1]):
+                    # tiles within a chunk are staged, so each batch has to span the days of a chunk
+                    self.assertEqual(plan.buffer_days, min(plan.chunks[2], plan.shape[2]))
+                elif daily_maps:
+                    self.fail("a daily map of a large landscape does not fit into {} MB".format(memory_limit))
+
+
+class TestOptionalInputs(unittest.TestCase):
+    """
+    Tests the defaults of the optional inputs.
+    """
+
+    def test_defaults(self):
+        component = create_component()
+        for name, _, _, *default in RunOffPrzm.RunOffPrzm.INPUTS:
+            if default:
+                self.assertEqual(component.inputs[name].read().values, default[0][0], name)
+
+    def test_connected_input(self):
+        component = create_component(Options_OutputResolution=(5, "m", "global"))
+        self.assertEqual(component.inputs["Options_OutputResolution"].read().values, 5)
+        self.assertEqual(component.inputs["Options_LocalWorkers"].read().values, 1)
+
+
+class TestStorageEncoding(unittest.TestCase):
+    """
+    Tests the encoding of stored exposure.
+    """
+
+    def test_threshold(self):
+        exposure = np.array([0, 1e-4, 1e-3, 1], np.float32)
+        stored = RunOffPrzm.StorageEncoding(1e-3, "none").encode(exposure)
+        np.testing.assert_array_equal(stored, np.array([0, 0, 1e-3, 1], np.float32))
+
+    def test_round_trip(self):
+        encoding = RunOffPrzm.StorageEncoding(0, "log_uint16")
+        values = np.geomspace(*encoding.QUANTIZATION_RANGE, 10001).astype(np.float32)
+        exposure = values.copy()
+        codes = encoding.encode(exposure)
+        self.assertEqual(codes.dtype, np.uint16)
+        np.testing.assert_array_equal(encoding.decode(codes), exposure)
+        self.assertLessEqual(np.max(np.abs(exposure / values - 1)), encoding.relative_error + 1e-6)
+        self.assertLess(encoding.relative_error, 1e-3)
+
+    def test_range(self):
+        encoding = RunOffPrzm.StorageEncoding(0, "log_uint16")
+        exposure = np.array([0, 1e-7, 1e6, 1e7], np.float32)
+        codes = encoding.encode(exposure)
+        np.testing.assert_array_equal(codes, [0, 0, np.iinfo(np.uint16).max, np.iinfo(np.uint16).max])
+        np.testing.assert_allclose(exposure, [0, 0, 1e6, 1e6], rtol=1e-6)
+
+
+class TestRunManifest(unittest.TestCase):
+    """
+    Tests the recording of completed stages for resumed runs.
+    """
+
+    def test_resume_after_partial_batch(self):
+        with tempfile.TemporaryDirectory() as path:
+            manifest_file = os.path.join(path, "manifest.json")
+            manifest = RunOffPrzm.RunManifest(manifest_file, "fingerprint")
+            manifest.complete("module")
+            manifest.complete("module")
+            manifest.merge([2, 0, 1])
+            manifest.merge([3])
+            manifest.update_maximum(5., (1, 2, 3))
+            with open(os.path.splitext(manifest_file)[0] + "_merged_days.txt", "a") as f:
+                # a batch that was interrupted while it was recorded
+                f.write("4 5")
+            resumed = RunOffPrzm.RunManifest.load(manifest_file)
+            self.assertEqual(resumed.fingerprint, "fingerprint")
+            self.assertEqual(resumed.stages, ["module"])
+            self.assertTrue(resumed.completed("module"))
+            self.assertFalse(resumed.completed("merge"))
+            self.assertEqual(resumed.merged_days, {0, 1, 2, 3})
+            self.assertEqual(resumed.maximum, (5., [1, 2, 3]))
+
+
+class TestWorkQueue(unittest.TestCase):
+    """
+    Tests the execution of work units through a work queue.
+    """
+
+    @staticmethod
+    def submit(path, commands):
+        """
+        Submits a work unit that runs Python commands in a directory.
+
+        Args:
+            path: The working directory of the work unit.
+            commands: The Python statements to run as separate command lines.
+
+        Returns:
+            The work queue and the name of the work unit.
+        """
+        work_unit = RunOffPrzm.WorkUnit(
+            "work unit",
+            path,
+            path,
+            path,
+            os.path.join(path, "work_unit.log"),
+            tuple((sys.executable, "-c", command) for command in commands),
+            None,
+            0,
+            False,
+            ()
+        )
+        work_queue = RunOffPrzm.WorkQueue(os.path.join(path, "work_queue.sqlite"))
+        work_queue.submit([work_unit])
+        return work_queue, work_unit.name
+
+    def test_stale_claim(self):
+        with tempfile.TemporaryDirectory() as path:
+            work_queue, name = self.submit(path, ("open('executed.txt', 'w').close()",))
+            self.assertIsNotNone(work_queue.claim("crashed worker"))
+            RunOffPrzm.run_worker(work_queue.database_file, exit_when_empty=True)
+            self.assertFalse(os.path.exists(os.path.join(path, "executed.txt")))
+            self.assertEqual(work_queue.statuses([name]), {name: ("running", None)})
+            with unittest.mock.patch.object(RunOffPrzm.WorkQueue, "STALE_TIME", -1):
+                RunOffPrzm.run_worker(work_queue.database_file, exit_when_empty=True)
+            self.assertTrue(os.path.exists(os.path.join(path, "executed.txt")))
+            self.assertEqual(work_queue.statuses([name]), {name: ("done", 0)})
+            work_queue.close()
+
+    def test_resubmit(self):
+        with tempfile.TemporaryDirectory() as path:
+            work_queue, name = self.submit(path, ("pass",))
+            RunOffPrzm.run_worker(work_queue.database_file, exit_when_empty=True)
+            self.submit(path, ("pass",))[0].close()
+            self.assertEqual(work_queue.statuses([name]), {name: ("pending", None)})
+            work_queue.close()
+
+    def test_failed_command(self):
+        with tempfile.TemporaryDirectory() as path:
+            work_queue, name = self.submit(path, ("raise SystemExit(3)", "open('executed.txt', 'w').close()"))
+            RunOffPrzm.run_worker(work_queue.database_file, exit_when_empty=True)
+            self.assertFalse(os.path.exists(os.path.join(path, "executed.txt")))
+            self.assertEqual(work_queue.statuses([name]), {name: ("done", 3)})
+            work_queue.close()
+
+
+class TestReachingFields(unittest.TestCase):
+    """
+    Tests the tracing of run-off along flow directions.
+    """
+
+    def test_reaching_fields(self):
+        # field 1 drains east into field 2, which drains into untreated cells, field 3 leaves the landscape and
+        # fields 4 and 5 drain into each other
+        field_raster = np.array([
+            [1, 2, 0, 3],
+            [4, 5, 0, 0]
+        ])
+        flow_directions = np.array([
+            [1, 1, 1, 1],
+            [1, 16, 4, 4]
+        ])
+        self.assertEqual(RunOffPrzm.reaching_fields(field_raster, flow_directions, {1, 2, 3, 4, 5}), {1, 2})
+        self.assertEqual(RunOffPrzm.reaching_fields(field_raster, flow_directions, {1}), {1})
+        self.assertEqual(RunOffPrzm.reaching_fields(field_raster, flow_directions, {6}), set())
+
+    def test_undefined_flow_direction(self):
+        field_raster = np.array([[1, 2]])
+        self.assertEqual(RunOffPrzm.reaching_fields(field_raster, np.array([[1, 255]]), {1, 2}), {1, 2})
+
+    def test_upstream_cells(self):
+        flow_directions = np.array([
+            [1, 1, 4],
+            [1, 1, 4],
+            [4, 4, 4]
+        ])
+        cells = np.zeros((3, 3), bool)
+        cells[1, 2] = True
+        np.testing.assert_array_equal(RunOffPrzm.upstream_cells(cells, flow_directions), [
+            [True, True, True],
+            [True, True, True],
+            [False, False, False]
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()